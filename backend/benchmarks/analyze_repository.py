@@ -0,0 +1,257 @@
+"""End-to-end `/repo/analyze-repository` benchmark against local fake upstreams.
+
+    cd backend && python -m benchmarks.analyze_repository [--scenarios small,medium] \\
+        [--requests 20] [--concurrency 4] [--latency 0.02] [--error-rate 0.01] [--json out.json]
+
+Starts fake GitHub, npm, PyPI and OSV servers (benchmarks.fake_upstreams), then for each
+scenario runs the API in a fresh uvicorn process pointed at them, with its own SQLite
+database. Reports p50/p99 latency, requests/sec, upstream calls and the API's peak RSS
+(summed over worker processes with `--workers`).
+
+By default every request analyzes a new repository name, so stored analyses and the
+response cache miss while the registry cache warms up as it would in production;
+`--warm` repeats one repository instead. Registry throttles are the production defaults
+and usually dominate large scenarios; lift them with e.g. `--env NPM_RATE_LIMIT=1000`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_upstreams import OWNER, PROFILES, FakeUpstreams, Faults, SyntheticRepo
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, int(round(q / 100 * len(samples))) - 1))]
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Sum of high-water resident sets of a running process and its workers (Linux /proc)"""
+    total = None
+    for process in _process_tree(pid):
+        try:
+            with open(f"/proc/{process}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        total = (total or 0.0) + int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    return total
+
+
+class APIServer:
+    """The API under test, in its own process so its memory and CPU are measured alone"""
+
+    def __init__(self, env: Dict[str, str], workdir: str, workers: int = 1):
+        self.workers = workers
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **os.environ,
+            **env,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/bench.db",
+            "WORKERS": str(workers),
+        }
+        self.process: Optional[subprocess.Popen] = None
+
+    async def __aenter__(self) -> "APIServer":
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "src.main:app",
+                "--host", "127.0.0.1", "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=self.env,
+        )
+        async with httpx.AsyncClient() as client:
+            deadline = time.monotonic() + 60
+            while True:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"API exited with status {self.process.returncode}")
+                try:
+                    if (await client.get(f"{self.url}/health")).status_code == 200:
+                        return self
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("API did not become healthy within 60s")
+                await asyncio.sleep(0.1)
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+async def run_load(
+    url: str, profile: str, requests: int, concurrency: int, warm: bool, options: Dict[str, bool]
+) -> Tuple[List[float], Counter, float]:
+    """Issue `requests` analyses from `concurrency` clients; returns latencies, statuses and wall time"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(requests))
+    timeout = httpx.Timeout(600.0, connect=10.0)
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for i in counter:
+            repo = f"{profile}-0" if warm else f"{profile}-{i}"
+            payload = {"repo_url": f"https://github.com/{OWNER}/{repo}", **options}
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{url}/repo/analyze-repository", json=payload)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=concurrency)) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return sorted(latencies), statuses, time.perf_counter() - start
+
+
+async def run_scenario(
+    upstreams: FakeUpstreams, profile: str, args: argparse.Namespace, env: Dict[str, str]
+) -> Dict[str, Any]:
+    options = {"include_dev_dependencies": not args.no_dev, "check_vulnerabilities": not args.no_vulns}
+    with tempfile.TemporaryDirectory(prefix="releaseradar-bench-") as workdir:
+        async with APIServer(env, workdir, args.workers) as api:
+            upstreams.stats.reset()
+            latencies, statuses, elapsed = await run_load(api.url, profile, args.requests, args.concurrency, args.warm, options)
+            rss = peak_rss_mb(api.process.pid)
+    if rss is None:
+        # Not Linux: the largest terminated child so far (KiB on Linux, bytes on macOS)
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        rss = maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    return {
+        "scenario": profile,
+        "dependencies_per_repo": upstreams.repos[profile].profile.total_dependencies,
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "statuses": dict(statuses),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "mean_ms": (statistics.mean(latencies) if latencies else 0.0) * 1000,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": rss,
+        "upstream": upstreams.stats.snapshot(),
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(
+        f"\n== {result['scenario']} ({result['dependencies_per_repo']} dependencies/repo, "
+        f"{result['requests']} requests, concurrency {result['concurrency']}, {result['workers']} worker(s))"
+    )
+    print(f"  statuses   {result['statuses']}")
+    print(
+        f"  latency    p50 {result['p50_ms']:.0f}ms  p99 {result['p99_ms']:.0f}ms  "
+        f"max {result['max_ms']:.0f}ms  mean {result['mean_ms']:.0f}ms"
+    )
+    print(f"  throughput {result['rps']:.2f} req/s")
+    print(f"  peak RSS   {result['peak_rss_mb']:.0f}MB")
+    upstream = result["upstream"]
+    print(f"  upstream   {upstream['total']} calls")
+    for name, count in upstream["calls"].items():
+        print(f"    {name:<24}{count:>8}")
+    failures = {name: count for name, count in upstream["statuses"].items() if not name.endswith((" 200", " 302", " 304"))}
+    if failures:
+        print(f"  upstream non-2xx {failures}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in PROFILES]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s) {unknown}; choose from {list(PROFILES)}")
+
+    print(f"Generating {', '.join(scenarios)} repositories (scale {args.scale})...")
+    repos = {name: SyntheticRepo.generate(PROFILES[name].scaled(args.scale)) for name in scenarios}
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.retry_after)
+    upstreams = FakeUpstreams(repos, {"*": faults})
+    upstreams.start()
+
+    env = {
+        **upstreams.env(),
+        # The fakes emulate the anonymous REST API; keep server tokens from switching to GraphQL
+        "GITHUB_TOKEN": "",
+        "GITHUB_TOKENS": "",
+        "GITHUB_GRAPHQL_ENABLED": "0",
+        "OSV_MODE": "api",
+    }
+    for setting in args.env:
+        key, _, value = setting.partition("=")
+        env[key] = value
+
+    results = []
+    try:
+        for name in scenarios:
+            result = await run_scenario(upstreams, name, args, env)
+            print_result(result)
+            results.append(result)
+    finally:
+        upstreams.stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="small,medium,large,monorepo", help=f"Comma-separated, from {', '.join(PROFILES)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="Repository size multiplier")
+    parser.add_argument("--requests", type=int, default=20, help="Analyses per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients")
+    parser.add_argument("--workers", type=int, default=1, help="API worker processes (WORKERS)")
+    parser.add_argument("--warm", action="store_true", help="Analyze the same repository every time")
+    parser.add_argument("--no-dev", action="store_true", help="Exclude dev dependencies")
+    parser.add_argument("--no-vulns", action="store_true", help="Skip vulnerability checks")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every upstream response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform extra upstream delay, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream responses that are 503s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of upstream responses that are 429s")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra API setting (repeatable)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    asyncio.run(main(parser.parse_args()))
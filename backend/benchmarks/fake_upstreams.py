@@ -0,0 +1,472 @@
+"""Local stand-ins for GitHub REST, npm, PyPI and OSV, serving synthetic repositories.
+
+Each upstream is a small Starlette app on its own loopback port, so the API under test
+keeps one connection pool per host exactly as in production. Every response can be
+delayed, failed or rate limited at configurable rates, and every call is counted.
+
+Repositories are generated from a `RepoProfile`; any repository named `<profile>-<n>`
+serves that profile's files, so a benchmark can request fresh repositories (cold stored
+analyses and response cache) without generating their content again.
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import io
+import json
+import random
+import socket
+import tarfile
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.routing import Route
+
+from benchmarks.parse_manifests import package_lock
+
+OWNER = "bench"
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+# ---------------------------
+# Synthetic repositories
+# ---------------------------
+@dataclass
+class RepoProfile:
+    """Shape of a synthetic repository; dependency names are drawn from shared package universes"""
+
+    name: str
+    workspaces: int = 1  # package.json files (the root one included)
+    npm_per_workspace: int = 30
+    lock_packages: int = 0  # Entries in the root package-lock.json; 0 for no lockfile
+    python_services: int = 1  # requirements.txt files
+    pypi_per_service: int = 15
+    npm_universe: int = 2000
+    pypi_universe: int = 500
+
+    @property
+    def total_dependencies(self) -> int:
+        return (
+            self.workspaces * self.npm_per_workspace
+            + self.lock_packages
+            + self.python_services * self.pypi_per_service
+        )
+
+    def scaled(self, scale: float) -> "RepoProfile":
+        def size(value: int) -> int:
+            return max(1, int(value * scale)) if value else 0
+
+        return RepoProfile(
+            self.name,
+            workspaces=size(self.workspaces),
+            npm_per_workspace=size(self.npm_per_workspace),
+            lock_packages=size(self.lock_packages),
+            python_services=size(self.python_services),
+            pypi_per_service=size(self.pypi_per_service),
+            npm_universe=size(self.npm_universe),
+            pypi_universe=size(self.pypi_universe),
+        )
+
+
+PROFILES: Dict[str, RepoProfile] = {
+    profile.name: profile
+    for profile in [
+        RepoProfile("small"),
+        RepoProfile("medium", workspaces=4, npm_per_workspace=60, lock_packages=2000, python_services=3, pypi_per_service=40),
+        RepoProfile("large", workspaces=20, npm_per_workspace=50, lock_packages=10000, python_services=5, pypi_per_service=40),
+        # ~50k dependencies: 250 workspaces, a 39k-entry lockfile and 20 Python services
+        RepoProfile(
+            "monorepo",
+            workspaces=250,
+            npm_per_workspace=40,
+            lock_packages=39000,
+            python_services=20,
+            pypi_per_service=50,
+            npm_universe=4000,
+            pypi_universe=1000,
+        ),
+    ]
+}
+
+
+def _digest(name: str) -> int:
+    return zlib.crc32(name.encode())
+
+
+def latest_version(name: str) -> str:
+    """Deterministic latest release; synthetic manifests pin 1.x, so most packages are outdated"""
+    return f"{1 + _digest(name) % 3}.{_digest(name) % 7}.0"
+
+
+def advisories_for(name: str) -> List[str]:
+    """About one package in 25 has a known advisory"""
+    return [f"GHSA-bench-{_digest(name) % 100000:05d}"] if _digest(name) % 25 == 0 else []
+
+
+def generate_files(profile: RepoProfile, seed: int = 0) -> Dict[str, str]:
+    rng = random.Random(f"{profile.name}:{seed}")
+    files: Dict[str, str] = {"README.md": f"# {profile.name}\n", "src/index.js": "module.exports = {}\n"}
+    for w in range(profile.workspaces):
+        path = "package.json" if w == 0 else f"packages/ws{w}/package.json"
+        names = rng.sample(range(profile.npm_universe), min(profile.npm_per_workspace, profile.npm_universe))
+        split = len(names) * 3 // 4
+        files[path] = json.dumps({
+            "name": f"ws{w}",
+            "version": "1.0.0",
+            "dependencies": {f"pkg{i}": f"^1.{i % 7}.0" for i in names[:split]},
+            "devDependencies": {f"pkg{i}": f"~1.{i % 7}.0" for i in names[split:]},
+        }, indent=2)
+    if profile.lock_packages:
+        files["package-lock.json"] = package_lock(profile.lock_packages)
+    for s in range(profile.python_services):
+        path = "requirements.txt" if s == 0 else f"services/svc{s}/requirements.txt"
+        names = rng.sample(range(profile.pypi_universe), min(profile.pypi_per_service, profile.pypi_universe))
+        files[path] = "".join(f"py-pkg{i}=={1 + i % 3}.{i % 5}.0\n" for i in names)
+    # Vendored copies must be skipped by manifest discovery
+    files["node_modules/left-pad/package.json"] = json.dumps({"name": "left-pad", "dependencies": {"pkg1": "1.0.0"}})
+    return files
+
+
+def git_blob_sha(content: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+@dataclass
+class SyntheticRepo:
+    profile: RepoProfile
+    files: Dict[str, bytes]
+    blobs: Dict[str, bytes] = field(default_factory=dict)  # sha -> content
+    tree: List[Dict[str, Any]] = field(default_factory=list)
+    _tarball: Optional[bytes] = field(default=None, repr=False)
+
+    @classmethod
+    def generate(cls, profile: RepoProfile, seed: int = 0) -> "SyntheticRepo":
+        files = {path: content.encode() for path, content in generate_files(profile, seed).items()}
+        repo = cls(profile, files)
+        directories = set()
+        for path, content in files.items():
+            sha = git_blob_sha(content)
+            repo.blobs[sha] = content
+            repo.tree.append({"path": path, "mode": "100644", "type": "blob", "sha": sha, "size": len(content)})
+            parts = path.split("/")[:-1]
+            directories.update("/".join(parts[:i + 1]) for i in range(len(parts)))
+        repo.tree.extend({"path": d, "mode": "040000", "type": "tree", "sha": git_blob_sha(d.encode())} for d in sorted(directories))
+        return repo
+
+    def tarball(self) -> bytes:
+        """The files as a gzipped pax archive under one top-level directory, like GitHub's"""
+        if self._tarball is None:
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as archive:
+                for path, content in self.files.items():
+                    info = tarfile.TarInfo(f"{OWNER}-{self.profile.name}/{path}")
+                    info.size = len(content)
+                    archive.addfile(info, io.BytesIO(content))
+            self._tarball = gzip.compress(buffer.getvalue(), compresslevel=6)
+        return self._tarball
+
+
+# ---------------------------
+# Fault injection and accounting
+# ---------------------------
+@dataclass
+class Faults:
+    latency: float = 0.0  # Seconds added to every response
+    jitter: float = 0.0  # Uniform extra delay in [0, jitter)
+    error_rate: float = 0.0  # Fraction of responses replaced by a 503
+    rate_limit_rate: float = 0.0  # Fraction of responses replaced by a 429 with Retry-After
+    retry_after: int = 1
+
+
+class UpstreamStats:
+    """Calls per (service, endpoint) and responses per (service, status); thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.statuses: Counter = Counter()
+
+    def record(self, service: str, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.calls[(service, endpoint)] += 1
+            self.statuses[(service, status)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": {f"{service} {endpoint}": count for (service, endpoint), count in sorted(self.calls.items())},
+                "statuses": {f"{service} {status}": count for (service, status), count in sorted(self.statuses.items())},
+                "total": sum(self.calls.values()),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.statuses.clear()
+
+
+class FakeUpstreams:
+    """Runs the fake GitHub, npm, PyPI and OSV servers on a background thread"""
+
+    def __init__(self, repos: Dict[str, SyntheticRepo], faults: Optional[Dict[str, Faults]] = None):
+        self.repos = repos
+        # Per-service faults; "*" applies to services without an entry
+        self.faults = faults or {}
+        self.stats = UpstreamStats()
+        self.urls: Dict[str, str] = {}
+        self._servers: List[uvicorn.Server] = []
+        self._thread: Optional[threading.Thread] = None
+        self._rng = random.Random(0)
+
+    def env(self) -> Dict[str, str]:
+        """Settings pointing the API at these servers"""
+        return {
+            "GITHUB_API_URL": self.urls["github"],
+            "NPM_REGISTRY_URL": self.urls["npm"],
+            "PYPI_URL": self.urls["pypi"],
+            "OSV_API_URL": self.urls["osv"],
+        }
+
+    def start(self) -> None:
+        apps = {
+            "github": self._github_app(),
+            "npm": self._npm_app(),
+            "pypi": self._pypi_app(),
+            "osv": self._osv_app(),
+        }
+        sockets = {}
+        for service, app in apps.items():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("127.0.0.1", 0))
+            sockets[service] = sock
+            self.urls[service] = f"http://127.0.0.1:{sock.getsockname()[1]}"
+            config = uvicorn.Config(app, log_level="warning", access_log=False, lifespan="off", backlog=2048)
+            self._servers.append(uvicorn.Server(config))
+
+        async def serve() -> None:
+            await asyncio.gather(*(server.serve(sockets=[sock]) for server, sock in zip(self._servers, sockets.values())))
+
+        self._thread = threading.Thread(target=asyncio.run, args=(serve(),), name="fake-upstreams", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not all(server.started for server in self._servers):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake upstreams did not start")
+            time.sleep(0.02)
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    # ---------------------------
+    # Request plumbing
+    # ---------------------------
+    def _route(self, service: str, endpoint: str, path: str, handler: Handler, methods: Tuple[str, ...] = ("GET",)) -> Route:
+        async def endpoint_handler(request: Request) -> Response:
+            faults = self.faults.get(service) or self.faults.get("*") or Faults()
+            delay = faults.latency + (self._rng.uniform(0, faults.jitter) if faults.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            roll = self._rng.random()
+            if roll < faults.rate_limit_rate:
+                response = self._rate_limited(service, faults)
+            elif roll < faults.rate_limit_rate + faults.error_rate:
+                response = JSONResponse({"message": "Injected failure"}, status_code=503)
+            else:
+                response = await handler(request)
+            self.stats.record(service, endpoint, response.status_code)
+            return response
+
+        return Route(path, endpoint_handler, methods=list(methods))
+
+    def _rate_limited(self, service: str, faults: Faults) -> Response:
+        headers = {"Retry-After": str(faults.retry_after)}
+        if service == "github":
+            reset = int(time.time()) + faults.retry_after
+            headers.update({"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+        return JSONResponse({"message": "API rate limit exceeded"}, status_code=429, headers=headers)
+
+    def _repo(self, request: Request) -> Optional[SyntheticRepo]:
+        if request.path_params["owner"] != OWNER:
+            return None
+        return self.repos.get(request.path_params["repo"].rsplit("-", 1)[0])
+
+    @staticmethod
+    def _conditional(request: Request, payload: Any) -> Response:
+        """GitHub-style ETags: a matching If-None-Match is answered with an empty 304"""
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    # ---------------------------
+    # GitHub REST
+    # ---------------------------
+    def _github_app(self) -> Starlette:
+        not_found = JSONResponse({"message": "Not Found"}, status_code=404)
+
+        async def repository(request: Request) -> Response:
+            repo = self._repo(request)
+            if repo is None:
+                return not_found
+            name = request.path_params["repo"]
+            return self._conditional(request, {
+                "id": _digest(name),
+                "name": name,
+                "full_name": f"{OWNER}/{name}",
+                "owner": {"login": OWNER, "html_url": f"https://github.com/{OWNER}"},
+                "html_url": f"https://github.com/{OWNER}/{name}",
+                "description": f"Synthetic {repo.profile.name} repository",
+                "private": False,
+                "fork": False,
+                "default_branch": "main",
+                "stargazers_count": 42,
+                "forks_count": 7,
+                "open_issues_count": 3,
+                "topics": ["benchmark"],
+            })
+
+        async def languages(request: Request) -> Response:
+            if self._repo(request) is None:
+                return not_found
+            return self._conditional(request, {"JavaScript": 120000, "Python": 40000})
+
+        async def tree(request: Request) -> Response:
+            repo = self._repo(request)
+            if repo is None:
+                return not_found
+            return self._conditional(request, {"sha": git_blob_sha(request.path_params["ref"].encode()), "tree": repo.tree, "truncated": False})
+
+        async def blob(request: Request) -> Response:
+            repo = self._repo(request)
+            content = repo.blobs.get(request.path_params["sha"]) if repo else None
+            if content is None:
+                return not_found
+            return JSONResponse({
+                "sha": request.path_params["sha"],
+                "size": len(content),
+                "encoding": "base64",
+                "content": base64.b64encode(content).decode(),
+            })
+
+        async def contents(request: Request) -> Response:
+            repo = self._repo(request)
+            content = repo.files.get(request.path_params["path"]) if repo else None
+            if content is None:
+                return not_found
+            return JSONResponse({
+                "path": request.path_params["path"],
+                "sha": git_blob_sha(content),
+                "encoding": "base64",
+                "content": base64.b64encode(content).decode(),
+            })
+
+        async def tarball(request: Request) -> Response:
+            if self._repo(request) is None:
+                return not_found
+            params = request.path_params
+            return RedirectResponse(f"/_codeload/{params['owner']}/{params['repo']}/tar.gz/{params['ref']}", status_code=302)
+
+        async def codeload(request: Request) -> Response:
+            repo = self._repo(request)
+            if repo is None:
+                return not_found
+            return Response(repo.tarball(), media_type="application/x-gzip")
+
+        async def owner_repos(request: Request) -> Response:
+            if request.path_params["owner"] != OWNER:
+                return not_found
+            return JSONResponse([
+                {"name": f"{profile}-0", "owner": {"login": OWNER}, "fork": False, "html_url": f"https://github.com/{OWNER}/{profile}-0"}
+                for profile in self.repos
+            ])
+
+        return Starlette(routes=[
+            self._route("github", "repo", "/repos/{owner}/{repo}", repository),
+            self._route("github", "languages", "/repos/{owner}/{repo}/languages", languages),
+            self._route("github", "tree", "/repos/{owner}/{repo}/git/trees/{ref:path}", tree),
+            self._route("github", "blob", "/repos/{owner}/{repo}/git/blobs/{sha}", blob),
+            self._route("github", "contents", "/repos/{owner}/{repo}/contents/{path:path}", contents),
+            self._route("github", "tarball", "/repos/{owner}/{repo}/tarball/{ref:path}", tarball),
+            self._route("github", "codeload", "/_codeload/{owner}/{repo}/tar.gz/{ref:path}", codeload),
+            self._route("github", "owner_repos", "/orgs/{owner}/repos", owner_repos),
+            self._route("github", "owner_repos", "/users/{owner}/repos", owner_repos),
+        ])
+
+    # ---------------------------
+    # Registries and OSV
+    # ---------------------------
+    def _npm_app(self) -> Starlette:
+        async def latest(request: Request) -> Response:
+            name = request.path_params["name"]
+            return JSONResponse({
+                "name": name,
+                "version": latest_version(name),
+                "description": f"Synthetic package {name}",
+                "homepage": f"https://example.com/{name}",
+            })
+
+        async def packument(request: Request) -> Response:
+            name = request.path_params["name"]
+            versions = {f"1.{i}.0": {"name": name, "version": f"1.{i}.0"} for i in range(7)}
+            return JSONResponse({"name": name, "dist-tags": {"latest": latest_version(name)}, "versions": versions})
+
+        return Starlette(routes=[
+            self._route("npm", "latest", "/{name:path}/latest", latest),
+            self._route("npm", "packument", "/{name:path}", packument),
+        ])
+
+    def _pypi_app(self) -> Starlette:
+        async def project(request: Request) -> Response:
+            name = request.path_params["name"]
+            return JSONResponse({"info": {
+                "name": name,
+                "version": latest_version(name),
+                "summary": f"Synthetic project {name}",
+                "home_page": f"https://example.com/{name}",
+            }})
+
+        return Starlette(routes=[self._route("pypi", "project", "/pypi/{name}/json", project)])
+
+    def _osv_app(self) -> Starlette:
+        async def querybatch(request: Request) -> Response:
+            queries = (await request.json()).get("queries", [])
+            results = []
+            for query in queries:
+                ids = advisories_for(query.get("package", {}).get("name", ""))
+                results.append({"vulns": [{"id": vuln_id, "modified": "2024-01-01T00:00:00Z"} for vuln_id in ids]} if ids else {})
+            return JSONResponse({"results": results})
+
+        async def query(request: Request) -> Response:
+            ids = advisories_for((await request.json()).get("package", {}).get("name", ""))
+            return JSONResponse({"vulns": [{"id": vuln_id} for vuln_id in ids]})
+
+        async def vuln(request: Request) -> Response:
+            vuln_id = request.path_params["id"]
+            return JSONResponse({
+                "id": vuln_id,
+                "summary": "Synthetic advisory",
+                "published": "2024-01-01T00:00:00Z",
+                "modified": "2024-01-01T00:00:00Z",
+                "database_specific": {"severity": ["LOW", "MODERATE", "HIGH", "CRITICAL"][_digest(vuln_id) % 4]},
+                "affected": [],
+                "references": [{"type": "ADVISORY", "url": f"https://osv.dev/vulnerability/{vuln_id}"}],
+            })
+
+        return Starlette(routes=[
+            self._route("osv", "querybatch", "/v1/querybatch", querybatch, methods=("POST",)),
+            self._route("osv", "query", "/v1/query", query, methods=("POST",)),
+            self._route("osv", "vuln", "/v1/vulns/{id}", vuln),
+        ])
@@ -0,0 +1,148 @@
+"""Manifest and lockfile parsing benchmark over large synthetic fixtures.
+
+    cd backend && python -m benchmarks.parse_manifests [--scale 1.0] [--repeat 5]
+
+Reports the median parse time of each fixture and the worst event-loop stall observed
+while all of them are parsed concurrently through the drivers' worker threads.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from src.utils.ecosystems import build_drivers
+from src.utils.http_client import HTTPClientPool
+from src.utils.lockfiles import LOCKFILES
+from src.utils.registry_cache import RegistryCache
+from src.utils.scheduler import RegistryScheduler
+
+
+def pom_xml(count: int) -> str:
+    managed = "".join(
+        f"<dependency><groupId>org.managed{i}</groupId><artifactId>lib{i}</artifactId><version>${{lib{i}.version}}</version></dependency>"
+        for i in range(count)
+    )
+    dependencies = "".join(
+        f"<dependency><groupId>org.managed{i}</groupId><artifactId>lib{i}</artifactId>"
+        f"<exclusions><exclusion><groupId>x</groupId><artifactId>y</artifactId></exclusion></exclusions></dependency>"
+        for i in range(count)
+    )
+    properties = "".join(f"<lib{i}.version>1.{i % 50}.0</lib{i}.version>" for i in range(count))
+    plugins = "".join(
+        f"<plugin><artifactId>plugin{i}</artifactId><configuration>{'<arg>-Xlint</arg>' * 20}</configuration></plugin>"
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0"?><project xmlns="http://maven.apache.org/POM/4.0.0">'
+        "<groupId>org.bench</groupId><artifactId>bench</artifactId><version>1.0.0</version>"
+        f"<properties>{properties}</properties>"
+        f"<dependencyManagement><dependencies>{managed}</dependencies></dependencyManagement>"
+        f"<dependencies>{dependencies}</dependencies>"
+        f"<build><plugins>{plugins}</plugins></build></project>"
+    )
+
+
+def cargo_toml(count: int) -> str:
+    lines = ['[package]', 'name = "bench"', 'version = "0.1.0"', 'edition = "2021"', "", "[dependencies]"]
+    lines += [f'crate{i} = {{ version = "1.{i % 30}", features = ["a", "b"] }}' for i in range(count)]
+    lines += ["", "[dev-dependencies]"] + [f'devcrate{i} = "0.{i % 9}"' for i in range(count // 4)]
+    return "\n".join(lines)
+
+
+def go_mod(count: int) -> str:
+    lines = ["module example.com/bench", "", "go 1.21", "", "require ("]
+    lines += [f"\texample.com/mod{i} v1.{i % 40}.0{' // indirect' if i % 3 else ''}" for i in range(count)]
+    lines += [")", ""] + [f"replace example.com/mod{i} => example.com/fork{i} v2.0.0" for i in range(0, count, 50)]
+    return "\n".join(lines)
+
+
+def package_lock(count: int) -> str:
+    packages = {"": {"dependencies": {f"pkg{i}": "*" for i in range(100)}}}
+    for i in range(count):
+        packages[f"node_modules/pkg{i}"] = {
+            "version": f"1.{i % 7}.0",
+            "dependencies": {f"pkg{(i * 7 + k) % count}": "*" for k in range(3)},
+        }
+    return json.dumps({"lockfileVersion": 3, "packages": packages})
+
+
+def yarn_lock(count: int) -> str:
+    blocks = ["# yarn lockfile v1"]
+    for i in range(count):
+        requires = "".join(f'\n    pkg{(i * 7 + k) % count} "^1.0.0"' for k in range(3))
+        blocks.append(f'pkg{i}@^1.0.0:\n  version "1.{i % 7}.0"\n  resolved "https://registry.yarnpkg.com/pkg{i}"\n  dependencies:{requires}')
+    return "\n\n".join(blocks) + "\n"
+
+
+def timed(func: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def max_loop_stall(jobs: List[Callable[[], "asyncio.Future"]], interval: float = 0.005) -> Tuple[float, float]:
+    """Run the jobs concurrently while a ticker measures how late the event loop wakes it"""
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stall = max(stall, time.perf_counter() - start - interval)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(job() for job in jobs))
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+async def main(scale: float, repeat: int) -> None:
+    pool = HTTPClientPool()
+    drivers = {
+        driver.manifest_files[0]: driver
+        for driver in build_drivers(pool, RegistryScheduler(), RegistryCache()).values()
+    }
+    count = int(5000 * scale)
+    manifests: Dict[str, str] = {
+        "pom.xml": pom_xml(count // 5),
+        "Cargo.toml": cargo_toml(count),
+        "go.mod": go_mod(count),
+    }
+    lockfiles: Dict[str, str] = {
+        "package-lock.json": package_lock(count * 10),
+        "yarn.lock": yarn_lock(count * 10),
+    }
+
+    print(f"{'fixture':<20}{'size':>10}{'entries':>10}{'median':>12}")
+    for filename, content in manifests.items():
+        driver = drivers[filename]
+        entries = len(driver.parse(filename, content))
+        seconds = timed(lambda: driver.parse(filename, content), repeat)
+        print(f"{filename:<20}{len(content) / 1e6:>8.1f}MB{entries:>10}{seconds * 1000:>10.1f}ms")
+    for filename, content in lockfiles.items():
+        graph = LOCKFILES[filename](content)
+        seconds = timed(lambda: LOCKFILES[filename](content).dependencies(), repeat)
+        print(f"{filename:<20}{len(content) / 1e6:>8.1f}MB{len(graph):>10}{seconds * 1000:>10.1f}ms")
+
+    jobs = [lambda f=f, c=c: drivers[f].parse_manifest(f, c) for f, c in manifests.items()]
+    elapsed, stall = await max_loop_stall(jobs)
+    print(f"\nconcurrent parse_manifest: {elapsed * 1000:.1f}ms total, worst event-loop stall {stall * 1000:.1f}ms")
+    await pool.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Fixture size multiplier")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per fixture")
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.repeat))
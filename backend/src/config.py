@@ -0,0 +1,188 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ---------------------------
+# Database
+# ---------------------------
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./repos.db")
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 30.0)
+# How long a write waits for another connection's write lock before failing (seconds)
+DB_BUSY_TIMEOUT = _env_float("DB_BUSY_TIMEOUT", 10.0)
+DB_CACHE_SIZE_KB = _env_int("DB_CACHE_SIZE_KB", 65536)
+# Rows per INSERT executemany when persisting large dependency sets
+DB_BULK_CHUNK = _env_int("DB_BULK_CHUNK", 5000)
+
+# ---------------------------
+# Upstream endpoints
+# ---------------------------
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL.rstrip('/')}/graphql")
+NPM_REGISTRY_URL = os.getenv("NPM_REGISTRY_URL", "https://registry.npmjs.org")
+PYPI_URL = os.getenv("PYPI_URL", "https://pypi.org")
+OSV_API_URL = os.getenv("OSV_API_URL", "https://api.osv.dev")
+GO_PROXY_URL = os.getenv("GO_PROXY_URL", "https://proxy.golang.org")
+MAVEN_SEARCH_URL = os.getenv("MAVEN_SEARCH_URL", "https://search.maven.org")
+CARGO_INDEX_URL = os.getenv("CARGO_INDEX_URL", "https://index.crates.io")
+PACKAGIST_URL = os.getenv("PACKAGIST_URL", "https://repo.packagist.org")
+RUBYGEMS_URL = os.getenv("RUBYGEMS_URL", "https://rubygems.org")
+
+# ---------------------------
+# HTTP client pool
+# ---------------------------
+HTTP_MAX_CONNECTIONS = _env_int("HTTP_MAX_CONNECTIONS", 100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+HTTP_KEEPALIVE_EXPIRY = _env_float("HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP_CONNECT_TIMEOUT = _env_float("HTTP_CONNECT_TIMEOUT", 5.0)
+HTTP_READ_TIMEOUT = _env_float("HTTP_READ_TIMEOUT", 15.0)
+HTTP_POOL_TIMEOUT = _env_float("HTTP_POOL_TIMEOUT", 10.0)
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", True)
+
+# ---------------------------
+# Registry metadata cache
+# ---------------------------
+REGISTRY_CACHE_TTL = _env_float("REGISTRY_CACHE_TTL", 3600.0)
+REGISTRY_CACHE_STALE_TTL = _env_float("REGISTRY_CACHE_STALE_TTL", 86400.0)
+REGISTRY_CACHE_MAX_ENTRIES = _env_int("REGISTRY_CACHE_MAX_ENTRIES", 10000)
+
+# ---------------------------
+# OSV
+# ---------------------------
+OSV_BATCH_SIZE = _env_int("OSV_BATCH_SIZE", 1000)  # querybatch accepts at most 1000 queries
+OSV_HYDRATE_CONCURRENCY = _env_int("OSV_HYDRATE_CONCURRENCY", 16)
+# Streaming analyses coalesce vulnerability checks arriving within this window (seconds)
+OSV_BATCH_WINDOW = _env_float("OSV_BATCH_WINDOW", 0.05)
+# "api" queries api.osv.dev; "mirror" answers from advisories ingested with
+# `python -m src.utils.osv_mirror ingest <dump.zip>` and makes no network calls
+OSV_MODE = os.getenv("OSV_MODE", "api").strip().lower()
+OSV_MIRROR_CACHE_ENTRIES = _env_int("OSV_MIRROR_CACHE_ENTRIES", 50000)
+
+# ---------------------------
+# Upstream scheduling
+# ---------------------------
+# Per-registry concurrency caps and sustained request rates (requests/second)
+REGISTRY_CONCURRENCY = {
+    "npm": _env_int("NPM_CONCURRENCY", 32),
+    "pip": _env_int("PYPI_CONCURRENCY", 16),
+    "osv": _env_int("OSV_CONCURRENCY", 8),
+    "go": _env_int("GO_PROXY_CONCURRENCY", 16),
+    "maven": _env_int("MAVEN_CONCURRENCY", 4),
+    "cargo": _env_int("CARGO_CONCURRENCY", 16),
+    "composer": _env_int("PACKAGIST_CONCURRENCY", 16),
+    "gem": _env_int("RUBYGEMS_CONCURRENCY", 8),
+}
+REGISTRY_RATE_LIMITS = {
+    "npm": _env_float("NPM_RATE_LIMIT", 50.0),
+    "pip": _env_float("PYPI_RATE_LIMIT", 25.0),
+    "osv": _env_float("OSV_RATE_LIMIT", 20.0),
+    "go": _env_float("GO_PROXY_RATE_LIMIT", 20.0),
+    "maven": _env_float("MAVEN_RATE_LIMIT", 5.0),
+    "cargo": _env_float("CARGO_RATE_LIMIT", 20.0),
+    "composer": _env_float("PACKAGIST_RATE_LIMIT", 20.0),
+    "gem": _env_float("RUBYGEMS_RATE_LIMIT", 10.0),
+}
+DEFAULT_REGISTRY_CONCURRENCY = _env_int("DEFAULT_REGISTRY_CONCURRENCY", 8)
+DEFAULT_REGISTRY_RATE_LIMIT = _env_float("DEFAULT_REGISTRY_RATE_LIMIT", 10.0)
+RETRY_MAX_ATTEMPTS = _env_int("RETRY_MAX_ATTEMPTS", 4)
+RETRY_BASE_DELAY = _env_float("RETRY_BASE_DELAY", 0.5)
+RETRY_MAX_DELAY = _env_float("RETRY_MAX_DELAY", 10.0)
+ANALYSIS_DEADLINE = _env_float("ANALYSIS_DEADLINE", 60.0)
+# Lookups against registries with multi-package endpoints are coalesced for this long
+REGISTRY_BATCH_WINDOW = _env_float("REGISTRY_BATCH_WINDOW", 0.02)
+MAVEN_BATCH_SIZE = _env_int("MAVEN_BATCH_SIZE", 20)
+
+# ---------------------------
+# GitHub
+# ---------------------------
+GITHUB_FETCH_CONCURRENCY = _env_int("GITHUB_FETCH_CONCURRENCY", 16)
+# Requests without their own token use GITHUB_TOKENS (comma-separated) and GITHUB_TOKEN;
+# once every token is rate limited, requests wait up to this long (seconds) for a reset
+GITHUB_RATE_LIMIT_MAX_WAIT = _env_float("GITHUB_RATE_LIMIT_MAX_WAIT", 300.0)
+# Repo, language and tree documents kept for If-None-Match revalidation; 304s are free
+GITHUB_ETAG_CACHE_ENTRIES = _env_int("GITHUB_ETAG_CACHE_ENTRIES", 2000)
+# With a token, repo metadata, languages and manifest blobs come from one GraphQL query;
+# GraphQL refuses anonymous requests, so token-less analyses always use REST
+GITHUB_GRAPHQL_ENABLED = _env_bool("GITHUB_GRAPHQL_ENABLED", True)
+# Concurrent snapshot requests (e.g. within a bulk analysis) share one query of up to this many repos
+GITHUB_GRAPHQL_BATCH_SIZE = _env_int("GITHUB_GRAPHQL_BATCH_SIZE", 10)
+GITHUB_GRAPHQL_BATCH_WINDOW = _env_float("GITHUB_GRAPHQL_BATCH_WINDOW", 0.02)
+# With more manifests than this to fetch, one streamed tarball of the ref replaces the
+# per-file blob calls (and GraphQL blob selections); 0 disables archive fetches
+GITHUB_ARCHIVE_THRESHOLD = _env_int("GITHUB_ARCHIVE_THRESHOLD", 25)
+# Archives are read no further than this many compressed bytes; files not reached by then
+# are fetched as blobs
+GITHUB_ARCHIVE_MAX_BYTES = _env_int("GITHUB_ARCHIVE_MAX_BYTES", 256 * 1024 * 1024)
+
+# ---------------------------
+# API response cache
+# ---------------------------
+# /repo/parse and /repo/analyze-repository responses are reused for this long (0 disables)
+RESPONSE_CACHE_TTL = _env_float("RESPONSE_CACHE_TTL", 300.0)
+RESPONSE_CACHE_MAX_ENTRIES = _env_int("RESPONSE_CACHE_MAX_ENTRIES", 1000)
+
+# ---------------------------
+# Stored analyses
+# ---------------------------
+# A stored analysis whose manifests are unchanged is reused while younger than this
+ANALYSIS_REUSE_TTL = _env_float("ANALYSIS_REUSE_TTL", REGISTRY_CACHE_TTL)
+
+# ---------------------------
+# Background analysis jobs
+# ---------------------------
+# Upper bound on concurrent heavy analyses per process
+ANALYSIS_JOB_WORKERS = _env_int("ANALYSIS_JOB_WORKERS", 2)
+# Repositories collected concurrently within one bulk analysis
+BULK_REPO_CONCURRENCY = _env_int("BULK_REPO_CONCURRENCY", 8)
+BULK_MAX_REPOSITORIES = _env_int("BULK_MAX_REPOSITORIES", 1000)
+
+# ---------------------------
+# GitHub push webhooks
+# ---------------------------
+# Secret configured on the webhook; deliveries without a matching X-Hub-Signature-256 are
+# rejected, and the endpoint is disabled while this is unset
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+# Pushes to the same branch within this window (seconds) are re-analyzed by one job
+WEBHOOK_COALESCE_WINDOW = _env_float("WEBHOOK_COALESCE_WINDOW", 10.0)
+
+# ---------------------------
+# Worker processes
+# ---------------------------
+# uvicorn worker processes started by `python -m src.main` (set it too when passing
+# --workers to uvicorn directly). With more than one, OSV answers and GitHub documents are
+# cached in SQLite for all workers, and registry/OSV lookups are single-flighted across them.
+WORKERS = _env_int("WORKERS", 1)
+SHARED_CACHE_ENABLED = _env_bool("SHARED_CACHE_ENABLED", WORKERS > 1)
+# A worker holding a lookup longer than this is presumed dead and others take over (seconds)
+SHARED_LEASE_TTL = _env_float("SHARED_LEASE_TTL", 30.0)
+# How often a worker waiting on another worker's lookup checks for its result (seconds)
+SHARED_LEASE_POLL_INTERVAL = _env_float("SHARED_LEASE_POLL_INTERVAL", 0.05)
+# Shared OSV answers (vulnerability IDs per package version, advisories) are reused this long
+OSV_CACHE_TTL = _env_float("OSV_CACHE_TTL", 3600.0)
+# Shared GitHub documents kept for If-None-Match revalidation
+GITHUB_SHARED_ETAG_TTL = _env_float("GITHUB_SHARED_ETAG_TTL", 86400.0)
+
+# ---------------------------
+# Metrics
+# ---------------------------
+# Prometheus text metrics at /metrics; instrumentation is a no-op when disabled
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", False)
+# Adds a Server-Timing header with per-stage durations to API responses (needs METRICS_ENABLED)
+SERVER_TIMING_ENABLED = _env_bool("SERVER_TIMING_ENABLED", False)
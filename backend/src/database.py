@@ -1,9 +1,91 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, literal
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./repos.db"
+from src import config
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = config.DATABASE_URL
+# The offline tooling (OSV mirror ingest) runs outside the event loop with the sync driver
+SYNC_DATABASE_URL = DATABASE_URL.replace("+aiosqlite", "")
+
+async_engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+engine = create_engine(SYNC_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 Base = declarative_base()
+
+
+def _configure_sqlite(dbapi_connection, _record) -> None:
+    """WAL lets readers proceed while a writer commits; NORMAL sync is durable across app crashes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT * 1000)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{config.DB_CACHE_SIZE_KB}")
+    cursor.close()
+
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+    event.listen(engine, "connect", _configure_sqlite)
+
+
+def _add_missing_columns(connection) -> None:
+    """Add columns declared on the models but absent from existing tables.
+
+    create_all never alters a table that already exists, so databases created before a
+    column was introduced would fail every query touching it. New columns are added as
+    nullable, with the model's scalar default (if any) filling existing rows.
+    """
+    inspector = inspect(connection)
+    dialect = connection.dialect
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {dialect.identifier_preparer.format_table(table)} ADD COLUMN "
+            ddl += f"{dialect.identifier_preparer.format_column(column)} {column.type.compile(dialect)}"
+            if column.default is not None and column.default.is_scalar:
+                value = literal(column.default.arg, column.type)
+                ddl += f" DEFAULT {value.compile(dialect=dialect, compile_kwargs={'literal_binds': True})}"
+            connection.exec_driver_sql(ddl)
+
+
+async def init_db() -> None:
+    """Create missing tables, columns and indexes (on existing tables included)"""
+    import src.models  # noqa: F401  Registers the tables on Base.metadata
+
+    def create(connection) -> None:
+        Base.metadata.create_all(connection)
+        _add_missing_columns(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    for attempt in range(3):
+        try:
+            async with async_engine.begin() as connection:
+                await connection.run_sync(create)
+            return
+        except OperationalError as e:
+            # Worker processes starting together race to create the same tables and columns
+            if ("already exists" not in str(e) and "duplicate column" not in str(e)) or attempt == 2:
+                raise
+
+
+async def close_db() -> None:
+    """Close pooled connections; aiosqlite keeps a thread per connection that would block interpreter exit"""
+    await async_engine.dispose()
@@ -1,15 +1,55 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import repo
-from .database import Base, engine
+from . import config
+from .routers import repo, webhooks
+from .database import close_db, init_db
+from .utils import metrics
+from .utils.analysis_store import AnalysisStore
+from .utils.github import GitHubETagCache
+from .utils.github_token import GitHubTokenPool
+from .utils.http_client import HTTPClientPool
+from .utils.jobs import JobQueue
+from .utils.osv_mirror import OSVMirror
+from .utils.registry_cache import RegistryCache
+from .utils.response_cache import ResponseCache
+from .utils.scheduler import RegistryScheduler
+from .utils.shared_cache import SharedCache
+from .utils.singleflight import SingleFlight
 import datetime
 from datetime import timezone
 
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create DB tables and indexes at startup rather than on import
+    await init_db()
+    # Shared, connection-pooled upstream clients for the lifetime of the app
+    app.state.http_pool = HTTPClientPool()
+    app.state.singleflight = SingleFlight()
+    # Lookup caches and single-flight shared across worker processes (when WORKERS > 1)
+    app.state.shared_cache = SharedCache()
+    await app.state.shared_cache.purge_expired()
+    app.state.registry_cache = RegistryCache(singleflight=app.state.singleflight, shared=app.state.shared_cache)
+    app.state.response_cache = ResponseCache(singleflight=app.state.singleflight)
+    app.state.github_etag_cache = GitHubETagCache(shared=app.state.shared_cache)
+    app.state.github_tokens = GitHubTokenPool.from_env()
+    app.state.scheduler = RegistryScheduler()
+    app.state.osv_mirror = OSVMirror() if config.OSV_MODE == "mirror" else None
+    app.state.analysis_store = AnalysisStore()
+    app.state.job_queue = JobQueue(app.state)
+    await app.state.job_queue.start()
+    try:
+        yield
+    finally:
+        await app.state.job_queue.stop()
+        await app.state.registry_cache.aclose()
+        await app.state.http_pool.aclose()
+        await close_db()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -18,10 +58,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend read ETags (to send back as If-None-Match) and stage timings
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+if metrics.ENABLED:
+    app.middleware("http")(metrics.track_requests)
+
 # Routers
 app.include_router(repo.router, prefix="/repo", tags=["Repositories"])
+app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
 
 @app.get("/")
 async def root():
@@ -29,11 +75,15 @@ async def root():
         "message": "Repository Dependency Security Analyzer API",
         "version": "1.0.0",
         "endpoints": {
-            "POST /analyze-repository": "Analyze repository dependencies for security issues"
+            "POST /analyze-repository": "Analyze repository dependencies for security issues",
+            "POST /analysis-jobs": "Queue an analysis in the background and poll /analysis-jobs/{job_id}",
+            "GET /github/rate-limit": "Remaining GitHub budget of the server's token pool",
+            "POST /webhooks/github": "GitHub push webhook (GITHUB_WEBHOOK_SECRET) refreshing stored analyses",
+            "GET /metrics": "Prometheus metrics (when METRICS_ENABLED is set)"
         },
         "authentication": {
             "github_token": "Optional - include as Bearer token for private repos and higher rate limits",
-            "environment_variable": "GITHUB_TOKEN can be set as environment variable"
+            "environment_variable": "Requests without a token use the pool of GITHUB_TOKENS (comma-separated) and GITHUB_TOKEN"
         }
     }
 
@@ -41,6 +91,22 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.datetime.now(timezone.utc).isoformat()}
 
+@app.get("/github/rate-limit")
+async def github_rate_limit():
+    return app.state.github_tokens.budget()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    if not metrics.ENABLED:
+        raise HTTPException(404, "Metrics are disabled; set METRICS_ENABLED=1")
+    budget = app.state.github_tokens.budget()
+    for resource, total in budget["totals"].items():
+        metrics.GITHUB_BUDGET.set(total["remaining"], resource=resource)
+        metrics.GITHUB_LIMIT.set(total["limit"], resource=resource)
+    metrics.GITHUB_WAITING.set(budget["waiting_requests"])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Worker processes need the app as an import string; run from the backend directory
+    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, workers=config.WORKERS)
\ No newline at end of file
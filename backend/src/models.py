@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -19,19 +19,131 @@ class Repo(Base):
     technologies = Column(String) 
     description = Column(String)
     tags = Column(String)
+    analysis_options = Column(String, nullable=True)
+    last_analysis = Column(Text, nullable=True)  # Serialized RepositoryAnalysisResponse
     
-    dependencies = relationship("Dependency", back_populates="repo")
+    dependencies = relationship("Dependency", back_populates="repo", cascade="all, delete-orphan")
+    manifests = relationship("Manifest", back_populates="repo", cascade="all, delete-orphan")
 
 
 class Dependency(Base):
     __tablename__ = "dependencies"
+    # Per-repo lookups and the delete-then-reinsert on re-analysis filter by repo_id first
+    __table_args__ = (
+        Index("ix_dependencies_repo_name", "repo_id", "name"),
+        Index("ix_dependencies_repo_manifest", "repo_id", "manifest_path"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     repo_id = Column(Integer, ForeignKey("repos.id"))
     name = Column(String, index=True)
     version = Column(String)
+    version_constraint = Column(String, nullable=True)
     latest_version = Column(String)
     author = Column(String, nullable=True)
     outdated = Column(Boolean, default=False)
+    dependency_type = Column(String)
+    is_dev = Column(Boolean, default=False)
+    is_transitive = Column(Boolean, default=False)
+    is_locked = Column(Boolean, default=False)  # Version pinned by a lockfile rather than read from a range
+    introduced_by = Column(String, nullable=True)
+    manifest_path = Column(String)
     
     repo = relationship("Repo", back_populates="dependencies")
+
+
+class Manifest(Base):
+    __tablename__ = "manifests"
+    __table_args__ = (UniqueConstraint("repo_id", "path", name="uq_manifest_repo_path"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    repo_id = Column(Integer, ForeignKey("repos.id"))
+    path = Column(String, nullable=False)
+    blob_sha = Column(String, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+    repo = relationship("Repo", back_populates="manifests")
+
+
+class RegistryMetadata(Base):
+    __tablename__ = "registry_metadata"
+    __table_args__ = (UniqueConstraint("ecosystem", "package", name="uq_registry_metadata_package"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    ecosystem = Column(String, nullable=False)
+    package = Column(String, nullable=False)
+    found = Column(Boolean, default=True)
+    latest_version = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    homepage = Column(String, nullable=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    fetched_at = Column(Float, nullable=False)  # Unix timestamp of last successful (re)validation
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (Index("ix_analysis_jobs_status_created", "status", "created_at"),)
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, default="repository")  # "repository", "bulk" or "push"
+    status = Column(String, index=True, default="queued")
+    repo_url = Column(String, nullable=False)  # Bulk jobs: the owner or a short description
+    payload = Column(Text, nullable=True)  # Bulk: serialized BulkAnalysisRequest; push: branch and changed paths
+    include_dev_dependencies = Column(Boolean, default=True)
+    check_vulnerabilities = Column(Boolean, default=True)
+    progress = Column(Text, nullable=True)  # JSON snapshot of pipeline progress
+    result = Column(Text, nullable=True)  # Serialized RepositoryAnalysisResponse
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class OSVAdvisory(Base):
+    __tablename__ = "osv_advisories"
+
+    id = Column(String, primary_key=True)
+    modified = Column(String, nullable=True)
+    data = Column(Text, nullable=False)  # The advisory JSON as published by OSV
+
+    affected_ranges = relationship("OSVAffectedRange", back_populates="advisory", cascade="all, delete-orphan")
+
+
+class OSVAffectedRange(Base):
+    """One affected interval (or enumerated version list) of a package, flattened from OSV events"""
+
+    __tablename__ = "osv_affected_ranges"
+    __table_args__ = (Index("ix_osv_affected_package", "ecosystem", "package"),)
+
+    id = Column(Integer, primary_key=True)
+    advisory_id = Column(String, ForeignKey("osv_advisories.id"), index=True, nullable=False)
+    ecosystem = Column(String, nullable=False)
+    package = Column(String, nullable=False)  # Normalized package name
+    introduced = Column(String, nullable=True)  # None: affected from the first release
+    fixed = Column(String, nullable=True)  # Exclusive upper bound
+    last_affected = Column(String, nullable=True)  # Inclusive upper bound
+    versions = Column(Text, nullable=True)  # JSON list of explicitly affected versions
+
+    advisory = relationship("OSVAdvisory", back_populates="affected_ranges")
+
+
+class SharedCacheEntry(Base):
+    """Lookup results shared by every worker process (OSV answers, GitHub ETag documents)"""
+
+    __tablename__ = "shared_cache"
+
+    namespace = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)  # JSON
+    expires_at = Column(Float, nullable=False, index=True)  # Unix timestamp
+
+
+class CacheLease(Base):
+    """A worker's claim on an upstream lookup, so other workers wait for its result instead of repeating it"""
+
+    __tablename__ = "cache_leases"
+
+    key = Column(String, primary_key=True)  # "<namespace>:<key>"
+    owner = Column(String, nullable=False)
+    expires_at = Column(Float, nullable=False)  # Unix timestamp; expired leases may be taken over
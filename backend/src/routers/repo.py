@@ -1,23 +1,27 @@
-from datetime import datetime
-import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional, List, cast
+from typing import Dict, Any, List, Optional, AsyncIterator, Union
 
 import httpx
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 
 from src.schemas import (
-    SeverityLevel,
-    DependencyType,
-    OutdatedDependency,
+    AnalysisJobResponse,
+    BulkAnalysisRequest,
+    BulkAnalysisResponse,
     RepositoryAnalysisRequest,
     RepositoryAnalysisResponse,
     RepoUrl,
 )
-from src.utils.github_dependency import DependencyAnalyzer
+from src.utils.analysis import AnalysisPipeline, analysis_options, get_analysis_pipeline
+from src.utils.github_token import GitHubTokenPool, get_github_token, get_token_pool
+from src.utils.jobs import JobQueue, get_job_queue
 from src.utils.url_parser import parse_github_url
-from src.utils.github_token import get_github_token
-from src.utils.github import GitHubService 
+from src.utils.github import GitHubETagCache, GitHubService, get_github_etag_cache
+from src.utils.http_client import HTTPClientPool, get_http_pool
+from src.utils.response_cache import ResponseCache, get_response_cache
+from src.utils.singleflight import SingleFlight, get_singleflight
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -63,7 +67,16 @@ def create_repo_response(
 
 
 @router.post("/parse")
-async def parse_github_url_api(data: RepoUrl):
+async def parse_github_url_api(
+    data: RepoUrl,
+    request: Request,
+    github_token: Optional[str] = Depends(get_github_token),
+    http_pool: HTTPClientPool = Depends(get_http_pool),
+    singleflight: SingleFlight = Depends(get_singleflight),
+    etag_cache: GitHubETagCache = Depends(get_github_etag_cache),
+    token_pool: GitHubTokenPool = Depends(get_token_pool),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
     """Parse a GitHub URL and fetch repository information."""
     try:
         parsed = parse_github_url(data.url)
@@ -74,16 +87,15 @@ async def parse_github_url_api(data: RepoUrl):
         raise HTTPException(status_code=400, detail="Invalid GitHub URL format")
 
     owner, repo = parsed.get("owner"), parsed.get("repo")
-    branch = parsed.get("branch") or "main"
 
     if not owner or not repo:
         raise HTTPException(400, "URL must contain both repository owner and name")
 
-    github_service = GitHubService()
+    github_service = GitHubService(github_token, http_pool, singleflight, etag_cache, token_pool)
 
-    try:
-        repo_info = await github_service.get_repo_info(owner, repo)
-        languages = await github_service.get_repo_languages(owner, repo)
+    async def fetch() -> Dict[str, Any]:
+        repo_info, languages = await github_service.get_repo_overview(owner, repo)
+        branch = parsed.get("branch") or repo_info.get("default_branch", "main")
 
         topics_raw = repo_info.get("topics", [])
         topics = (
@@ -94,6 +106,12 @@ async def parse_github_url_api(data: RepoUrl):
 
         return create_repo_response(repo_info, branch, languages, topics)
 
+    key = ("parse", owner.lower(), repo.lower(), parsed.get("branch") or "", github_service.token_scope)
+    try:
+        return await response_cache.respond(request, key, fetch)
+
+    except HTTPException:
+        raise
     except httpx.HTTPStatusError as e:
         logger.error(f"GitHub API error for {owner}/{repo}: {e}")
         raise HTTPException(e.response.status_code, f"GitHub API error: {e}")
@@ -108,155 +126,140 @@ async def parse_github_url_api(data: RepoUrl):
 @router.post("/analyze-repository", response_model=RepositoryAnalysisResponse)
 async def analyze_repository(
     request: RepositoryAnalysisRequest,
-    github_token: Optional[str] = Depends(get_github_token),
+    http_request: Request,
+    pipeline: AnalysisPipeline = Depends(get_analysis_pipeline),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
+    """Analyze a repository; repeated requests within RESPONSE_CACHE_TTL are served from cache.
+
+    Responses carry an ETag; clients sending it back as If-None-Match get a 304.
+    """
     try:
         # Parse repo URL
         result = parse_github_url(request.repo_url)
         if not result:
             raise ValueError("Invalid GitHub repository URL")
-        owner, repo = result["owner"], result["repo"]
 
-        github_service = GitHubService(github_token)
-        analyzer = DependencyAnalyzer()
-        repo_info, repo_languages = await asyncio.gather(
-            github_service.get_repo_info(owner, repo),
-            github_service.get_repo_languages(owner, repo)
+        key = (
+            "analyze",
+            result["owner"].lower(),
+            result["repo"].lower(),
+            result["branch"] or "",
+            analysis_options(request.include_dev_dependencies, request.check_vulnerabilities),
+            pipeline.github.token_scope,
         )
-
-        # Supported files and language map
-        file_analyzers = {
-            "package.json": analyzer.analyze_package_json,
-            "requirements.txt": analyzer.analyze_requirements_txt,
-            "go.mod": analyzer.analyze_go_mod,
-            "pom.xml": analyzer.analyze_maven_pom,
-            "Cargo.toml": analyzer.analyze_cargo_toml,
-            "composer.json": analyzer.analyze_composer_json,
-            "Gemfile": analyzer.analyze_gemfile,
-        }
-
-        language_file_map = {
-            "package.json": "JavaScript",
-            "requirements.txt": "Python",
-            "go.mod": "Go",
-            "pom.xml": "Java",
-            "Cargo.toml": "Rust",
-            "composer.json": "PHP",
-            "Gemfile": "Ruby",
-        }
-
-        # Fetch all relevant files concurrently
-        fetch_tasks = {
-            filename: github_service.get_file_content(owner, repo, filename)
-            for filename, lang in language_file_map.items()
-            if lang in repo_languages
-        }
-        file_contents = await asyncio.gather(*fetch_tasks.values())
-        dependencies: List[Dict[str, Any]] = []
-
-        # Analyze files
-        for filename, content in zip(fetch_tasks.keys(), file_contents):
-            if content:
-                analyzer_func = file_analyzers[filename]
-                if filename in ["package.json", "composer.json"]:
-                    deps = await analyzer_func(content, request.include_dev_dependencies)
-                else:
-                    deps = await analyzer_func(content)
-                dependencies.extend(deps)
-
-        # Early exit if no dependencies
-        if not dependencies:
-            return RepositoryAnalysisResponse(
-                repository=repo_info["name"],
-                owner=repo_info["owner"]["login"],
-                analyzed_at=datetime.utcnow().isoformat(),
-                total_dependencies=0,
-                outdated_dependencies=0,
-                vulnerable_dependencies=0,
-                risk_summary={"critical": 0, "high": 0, "moderate": 0, "low": 0},
-                dependencies=[]
-            )
-
-        # Group tasks per dependency type
-        tasks, dep_map = [], []
-        for dep in dependencies:
-            dep_type = dep["type"]
-            check_func = {
-                DependencyType.NPM: analyzer.check_npm_outdated,
-                DependencyType.PIP: analyzer.check_pypi_outdated,
-                DependencyType.GO: analyzer.check_go_outdated,
-                DependencyType.MAVEN: analyzer.check_maven_outdated,
-                DependencyType.CARGO: analyzer.check_cargo_outdated,
-                DependencyType.COMPOSER: analyzer.check_composer_outdated,
-                DependencyType.GEM: analyzer.check_gem_outdated,
-       
-            }.get(dep_type)
-            if check_func:
-                tasks.append(check_func(dep["name"], dep["version"]))
-                dep_map.append(dep)
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        analyzed_dependencies: List[OutdatedDependency] = []
-
-        for dep, result in zip(dep_map, results):
-            if isinstance(result, Exception):
-                logger.error(f"Dependency check failed for {dep['name']}: {result}")
-                latest_version = dep["version"]
-                is_outdated = False
-            else:
-                result = cast(Dict[str, Any], result)
-                latest_version = result.get("latest_version", dep["version"])
-                is_outdated = result.get("is_outdated", False)
-
-            vulnerabilities: List = []
-            if request.check_vulnerabilities and is_outdated:
-                try:
-                    vulnerabilities = await analyzer.check_vulnerabilities(
-                        dep["name"], dep["version"], dep["type"]
-                    )
-                except Exception as e:
-                    logger.error(f"Vulnerability check failed for {dep['name']}: {e}")
-
-            risk_level = SeverityLevel.LOW
-            if vulnerabilities:
-                risk_level = max((v.severity for v in vulnerabilities), default=SeverityLevel.LOW)
-            elif is_outdated:
-                risk_level = SeverityLevel.MODERATE
-
-            analyzed_dependencies.append(
-                OutdatedDependency(
-                    name=dep["name"],
-                    current_version=dep["version"],
-                    latest_version=latest_version,
-                    dependency_type=dep["type"],
-                    is_outdated=is_outdated,
-                    vulnerabilities=vulnerabilities,
-                    risk_level=risk_level,
-                    update_available=is_outdated,
-                )
-            )
-
-        total = len(analyzed_dependencies)
-        risk_summary = {
-            "critical": sum(dep.risk_level == SeverityLevel.CRITICAL for dep in analyzed_dependencies),
-            "high": sum(dep.risk_level == SeverityLevel.HIGH for dep in analyzed_dependencies),
-            "moderate": sum(dep.risk_level == SeverityLevel.MODERATE for dep in analyzed_dependencies),
-            "low": sum(dep.risk_level == SeverityLevel.LOW for dep in analyzed_dependencies),
-        }
-
-        return RepositoryAnalysisResponse(
-            repository=repo_info["name"],
-            owner=repo_info["owner"]["login"],
-            analyzed_at=datetime.utcnow().isoformat(),
-            total_dependencies=total,
-            outdated_dependencies=sum(dep.is_outdated for dep in analyzed_dependencies),
-            vulnerable_dependencies=sum(bool(dep.vulnerabilities) for dep in analyzed_dependencies),
-            risk_summary=risk_summary,
-            dependencies=analyzed_dependencies,
+        return await response_cache.respond(
+            http_request,
+            key,
+            lambda: pipeline.analyze(
+                result["owner"],
+                result["repo"],
+                result["branch"],
+                include_dev=request.include_dev_dependencies,
+                check_vulnerabilities=request.check_vulnerabilities,
+            ),
         )
 
     except ValueError as e:
         raise HTTPException(400, str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
         raise HTTPException(500, f"Analysis failed: {e}")
+
+
+@router.post("/analyze-repository/stream")
+async def analyze_repository_stream(
+    request: RepositoryAnalysisRequest,
+    http_request: Request,
+    pipeline: AnalysisPipeline = Depends(get_analysis_pipeline),
+):
+    """Stream each dependency result as it completes, then the summary.
+
+    Sends Server-Sent Events when the client accepts `text/event-stream`, NDJSON otherwise.
+    """
+    result = parse_github_url(request.repo_url)
+    if not result:
+        raise HTTPException(400, "Invalid GitHub repository URL")
+
+    events = pipeline.stream(
+        result["owner"],
+        result["repo"],
+        result["branch"],
+        include_dev=request.include_dev_dependencies,
+        check_vulnerabilities=request.check_vulnerabilities,
+    )
+    # Pull the first event before responding so repo-level errors (404, 403) keep their status code
+    try:
+        first = await events.__anext__()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Streaming analysis failed: {e}")
+        raise HTTPException(500, f"Analysis failed: {e}")
+
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    def encode(event: str, data: Dict[str, Any]) -> str:
+        if use_sse:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"event": event, "data": data}) + "\n"
+
+    async def body() -> AsyncIterator[str]:
+        yield encode(*first)
+        try:
+            async for event in events:
+                yield encode(*event)
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            yield encode("error", {"detail": str(getattr(e, "detail", e))})
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/analysis-jobs", response_model=AnalysisJobResponse, status_code=202)
+async def submit_analysis_job(
+    request: RepositoryAnalysisRequest,
+    github_token: Optional[str] = Depends(get_github_token),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Queue a repository analysis and return its job ID immediately"""
+    try:
+        return await job_queue.submit(request, github_token)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.post("/bulk-analysis-jobs", response_model=AnalysisJobResponse, status_code=202)
+async def submit_bulk_analysis_job(
+    request: BulkAnalysisRequest,
+    github_token: Optional[str] = Depends(get_github_token),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Queue an analysis of many repositories (explicit URLs and/or every repo of an owner)"""
+    try:
+        return await job_queue.submit_bulk(request, github_token)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.get("/analysis-jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    """Job status and partial progress"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.get("/analysis-jobs/{job_id}/result", response_model=Union[RepositoryAnalysisResponse, BulkAnalysisResponse])
+async def get_analysis_job_result(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    """Final analysis of a completed job"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    result = await job_queue.get_result(job_id)
+    if result is None:
+        raise HTTPException(409, f"Job is {job.status.value}; no result available")
+    return result
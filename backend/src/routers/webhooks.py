@@ -0,0 +1,72 @@
+import json
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from src import config
+from src.schemas import WebhookDeliveryResponse
+from src.utils.analysis_store import AnalysisStore, get_analysis_store
+from src.utils.github_webhook import parse_push, verify_signature
+from src.utils.jobs import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def ignored(reason: str) -> WebhookDeliveryResponse:
+    return WebhookDeliveryResponse(status="ignored", reason=reason)
+
+
+@router.post("/github", response_model=WebhookDeliveryResponse, status_code=202)
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(""),
+    x_hub_signature_256: Optional[str] = Header(None),
+    store: AnalysisStore = Depends(get_analysis_store),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """Receive GitHub push events and re-analyze the manifests and lockfiles they changed.
+
+    Only repositories with a stored analysis of the pushed branch are refreshed; pushes
+    that touch no supported manifest are acknowledged without any GitHub or registry call.
+    """
+    if not config.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(503, "Webhooks are disabled; set GITHUB_WEBHOOK_SECRET")
+    body = await request.body()
+    if not verify_signature(config.GITHUB_WEBHOOK_SECRET, body, x_hub_signature_256):
+        raise HTTPException(401, "Invalid webhook signature")
+
+    if x_github_event == "ping":
+        return WebhookDeliveryResponse(status="pong")
+    if x_github_event != "push":
+        return ignored(f"'{x_github_event}' events are not handled")
+
+    try:
+        # Webhooks can be configured to deliver form-encoded payloads
+        if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+            payload = json.loads(parse_qs(body.decode()).get("payload", [""])[0])
+        else:
+            payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(400, "Malformed webhook payload")
+
+    push = parse_push(payload)
+    if push is None:
+        return ignored("Not a branch update")
+    tracked_branch = await store.tracked_branch(push.repo_url)
+    if tracked_branch is None:
+        return ignored("Repository has no stored analysis")
+    if tracked_branch != push.branch:
+        return ignored(f"Stored analysis tracks branch '{tracked_branch}'")
+    if push.manifest_paths is not None and not push.manifest_paths:
+        return ignored("No manifest or lockfile changed")
+
+    job = await job_queue.submit_push(push.repo_url, push.branch, push.manifest_paths)
+    logger.info(f"Push to {push.owner}/{push.repo}@{push.branch} queued refresh job {job.job_id}")
+    return WebhookDeliveryResponse(
+        status="queued",
+        manifests=sorted(push.manifest_paths) if push.manifest_paths is not None else None,
+        job=job,
+    )
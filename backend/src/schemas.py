@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 
@@ -71,12 +71,16 @@ class VulnerabilityInfo(BaseModel):
 class OutdatedDependency(BaseModel):
     name: str
     current_version: str
+    version_constraint: Optional[str] = None  # As declared in the manifest, e.g. "^4.17.0"
     latest_version: str
     dependency_type: DependencyType
     is_outdated: bool
     vulnerabilities: List[VulnerabilityInfo] = []
     risk_level: SeverityLevel
     update_available: bool
+    is_transitive: bool = False  # Resolved from a lockfile, not declared in a manifest
+    introduced_by: Optional[str] = None  # Direct dependency that pulls in a transitive one
+    check_failed: bool = False  # A registry or vulnerability lookup failed: unknown, not up to date
 
 class RepositoryAnalysisRequest(BaseModel):
     repo_url: str
@@ -90,5 +94,46 @@ class RepositoryAnalysisResponse(BaseModel):
     total_dependencies: int
     outdated_dependencies: int
     vulnerable_dependencies: int
+    transitive_dependencies: int = 0  # Locked transitive packages checked; only vulnerable ones are listed
+    unchecked_dependencies: int = 0  # Listed with check_failed; retried by the next analysis
     risk_summary: Dict[str, int]  # Count by severity level
-    dependencies: List[OutdatedDependency]
\ No newline at end of file
+    dependencies: List[OutdatedDependency]
+
+class BulkAnalysisRequest(BaseModel):
+    repo_urls: List[str] = []
+    owner: Optional[str] = None  # Organization or user whose repositories are scanned
+    include_forks: bool = False
+    include_archived: bool = False
+    include_dev_dependencies: bool = True
+    check_vulnerabilities: bool = True
+
+class BulkAnalysisResponse(BaseModel):
+    analyzed_at: str
+    total_repositories: int
+    total_dependencies: int
+    unique_dependencies: int
+    repositories: List[RepositoryAnalysisResponse]
+    failures: Dict[str, str] = {}
+
+class AnalysisJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class AnalysisJobResponse(BaseModel):
+    job_id: str
+    kind: str = "repository"
+    status: AnalysisJobStatus
+    repo_url: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Dict[str, Any] = {}
+    error: Optional[str] = None
+
+class WebhookDeliveryResponse(BaseModel):
+    status: str  # "queued", "ignored" or "pong"
+    reason: Optional[str] = None  # Why a delivery was ignored
+    manifests: Optional[List[str]] = None  # Changed manifests; None when every manifest is re-checked
+    job: Optional[AnalysisJobResponse] = None
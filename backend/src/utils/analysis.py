@@ -0,0 +1,853 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Collection, Dict, List, Optional, Tuple, cast
+
+from fastapi import Depends, Request
+
+from src import config
+from src.schemas import (
+    BulkAnalysisResponse,
+    SeverityLevel,
+    DependencyType,
+    OutdatedDependency,
+    RepositoryAnalysisResponse,
+    VulnerabilityInfo,
+)
+from src.utils import metrics
+from src.utils.analysis_store import AnalysisStore, StoredAnalysis
+from src.utils.ecosystems import MANIFEST_FILES
+from src.utils.lockfiles import LOCKFILES, parse_lockfile
+from src.utils.github import GitHubService
+from src.utils.github_dependency import DependencyAnalyzer
+from src.utils.github_token import get_github_token
+from src.utils.osv import VulnQuery
+from src.utils.scheduler import WindowBatcher
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_ORDER = [SeverityLevel.LOW, SeverityLevel.MODERATE, SeverityLevel.HIGH, SeverityLevel.CRITICAL]
+
+# Vendored / generated directories whose manifests belong to third-party code
+IGNORED_DIRECTORIES = {"node_modules", "vendor", "bower_components", ".git", "third_party"}
+
+DependencyKey = Tuple[DependencyType, str, str, Optional[str]]
+# Receives a snapshot of the pipeline's progress whenever it changes
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def dependency_key(dep: Dict[str, Any]) -> DependencyKey:
+    return (dep["type"], dep["name"], dep["version"], dep.get("constraint"))
+
+
+def _stored_results(checked: List[Dict[str, Any]]) -> Dict[DependencyKey, Dict[str, Any]]:
+    """Registry results to persist with each dependency row; failed checks store none"""
+    return {
+        dependency_key(dep): {"latest_version": dep["latest_version"], "is_outdated": dep["is_outdated"]}
+        for dep in checked if not dep.get("check_failed")
+    }
+
+
+def _needs_vulnerability_check(dep: Dict[str, Any]) -> bool:
+    """Whether a checked dependency goes to OSV: locked versions and failed checks always,
+    versions read from a range (the range's floor) only when outdated"""
+    return bool(dep["is_outdated"] or dep.get("locked") or dep.get("transitive") or dep.get("check_failed"))
+
+
+def analysis_options(include_dev: bool, check_vulnerabilities: bool) -> str:
+    """Request options a stored or cached analysis must match to be reused"""
+    return f"dev={int(include_dev)};vulns={int(check_vulnerabilities)}"
+
+
+def parse_analysis_options(options: Optional[str]) -> Tuple[bool, bool]:
+    """(include_dev, check_vulnerabilities) of an analysis_options string; both on if unknown"""
+    values = dict(item.split("=", 1) for item in (options or "").split(";") if "=" in item)
+    return values.get("dev", "1") == "1", values.get("vulns", "1") == "1"
+
+
+def is_manifest_path(path: str) -> bool:
+    """Whether a repository path is a supported manifest or lockfile outside vendored code"""
+    *directories, filename = path.split("/")
+    return (filename in MANIFEST_FILES or filename in LOCKFILES) and not IGNORED_DIRECTORIES.intersection(directories)
+
+
+def _directory(path: str) -> str:
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def _is_lockfile(path: str) -> bool:
+    return path.rsplit("/", 1)[-1] in LOCKFILES
+
+
+def _use_archive(manifests: List[Dict[str, Any]]) -> bool:
+    """Whether fetching these manifests one by one costs more than one tarball of the ref"""
+    return 0 < config.GITHUB_ARCHIVE_THRESHOLD < len(manifests)
+
+
+def _apply_lockfiles(dependencies: List[Dict[str, Any]], locked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pin manifest dependencies to the versions locked beside them and add transitive packages"""
+    pins = {
+        (_directory(dep["manifest_path"]), dep["type"], dep["name"]): dep["version"]
+        for dep in locked if not dep.get("transitive")
+    }
+    pinned, matched = [], set()
+    for dep in dependencies:
+        key = (_directory(dep["manifest_path"]), dep["type"], dep["name"])
+        if key in pins:
+            matched.add(key)
+            dep = {**dep, "version": pins[key], "locked": True}
+        pinned.append(dep)
+    # Direct packages of a lockfile whose manifest isn't parsed (e.g. poetry.lock) stay as locked
+    unmatched = [
+        dep for dep in locked
+        if dep.get("transitive") or (_directory(dep["manifest_path"]), dep["type"], dep["name"]) not in matched
+    ]
+    return pinned + unmatched
+
+
+@dataclass
+class RepositoryContext:
+    """Everything collected about one repository before registry and vulnerability checks"""
+
+    owner: str
+    repo: str
+    branch: str
+    repo_info: Dict[str, Any]
+    languages: Dict[str, int]
+    repo_link: str
+    options: str
+    manifests: List[Dict[str, Any]] = field(default_factory=list)
+    all_dependencies: List[Dict[str, Any]] = field(default_factory=list)
+    dependencies: List[Dict[str, Any]] = field(default_factory=list)
+    reusable: Optional[Dict[DependencyKey, OutdatedDependency]] = None
+    cached_response: Optional[RepositoryAnalysisResponse] = None
+
+
+class AnalysisSummary:
+    """Running totals for a RepositoryAnalysisResponse"""
+
+    def __init__(self):
+        self.total = 0
+        self.outdated = 0
+        self.vulnerable = 0
+        self.transitive = 0
+        self.unchecked = 0
+        self.risk_summary = {level.value: 0 for level in reversed(SEVERITY_ORDER)}
+
+    def add(self, dep: OutdatedDependency) -> bool:
+        """Count a result; returns whether it is listed (transitive packages only when vulnerable or unchecked)"""
+        self.unchecked += dep.check_failed
+        if dep.is_transitive:
+            self.transitive += 1
+            if not dep.vulnerabilities and not dep.check_failed:
+                return False
+        else:
+            self.total += 1
+        self.outdated += dep.is_outdated
+        self.vulnerable += bool(dep.vulnerabilities)
+        self.risk_summary[dep.risk_level.value] += 1
+        return True
+
+    def to_dict(self, repo_info: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "repository": repo_info["name"],
+            "owner": repo_info["owner"]["login"],
+            "analyzed_at": datetime.utcnow().isoformat(),
+            "total_dependencies": self.total,
+            "outdated_dependencies": self.outdated,
+            "vulnerable_dependencies": self.vulnerable,
+            "transitive_dependencies": self.transitive,
+            "unchecked_dependencies": self.unchecked,
+            "risk_summary": dict(self.risk_summary),
+        }
+
+
+class AnalysisPipeline:
+    """Runs a repository analysis: fetch manifests, parse, registry checks, OSV, persist"""
+
+    def __init__(
+        self,
+        github_service: GitHubService,
+        analyzer: DependencyAnalyzer,
+        store: AnalysisStore,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        self.github = github_service
+        self.analyzer = analyzer
+        self.scheduler = analyzer.scheduler
+        self.store = store
+        self.on_progress = on_progress
+        self.progress: Dict[str, Any] = {}
+
+    async def analyze(
+        self,
+        owner: str,
+        repo: str,
+        branch: Optional[str] = None,
+        include_dev: bool = True,
+        check_vulnerabilities: bool = True,
+    ) -> RepositoryAnalysisResponse:
+        metrics.ANALYSES_IN_FLIGHT.inc()
+        try:
+            context = await self.collect(owner, repo, branch, include_dev, check_vulnerabilities)
+            if context.cached_response is not None:
+                return context.cached_response
+
+            analyzed, checked = await self.check_dependencies(
+                context.dependencies,
+                check_vulnerabilities,
+                reused=context.reusable,
+            )
+            return await self.complete(context, analyzed, checked)
+        finally:
+            metrics.ANALYSES_IN_FLIGHT.dec()
+
+    async def refresh(
+        self,
+        repo_link: str,
+        owner: str,
+        repo: str,
+        branch: str,
+        paths: Optional[Collection[str]] = None,
+    ) -> RepositoryAnalysisResponse:
+        """Bring a stored analysis up to date after a push that changed the given manifests.
+
+        Only those paths and the other manifests in their directories (lockfiles pin the
+        manifests beside them) are fetched and parsed, and only their dependency rows are
+        rewritten; packages the stored analysis already checked reuse its results. Without
+        paths or a stored analysis this is a regular analysis with the stored options.
+        """
+        stored = await self.store.load(repo_link)
+        include_dev, check_vulnerabilities = parse_analysis_options(stored.options if stored else None)
+        if paths is None or stored is None or stored.response is None:
+            return await self.analyze(owner, repo, branch, include_dev, check_vulnerabilities)
+
+        metrics.ANALYSES_IN_FLIGHT.inc()
+        try:
+            directories = {_directory(path) for path in paths}
+            affected = set(paths) | {path for path in stored.manifest_shas if _directory(path) in directories}
+            self._report(stage="fetching_manifests", manifests_total=len(affected), manifests_changed=len(paths))
+            with metrics.stage("github"):
+                fetched = await self.fetch_files(owner, repo, branch, sorted(affected))
+            removed = {path for path in affected if path in stored.manifest_shas} - {m["path"] for m in fetched}
+            if not removed and all(stored.manifest_shas.get(m["path"]) == m["sha"] for m in fetched):
+                # The push left every manifest this analysis depends on as it was
+                await self.store.update_manifests(
+                    stored.repo_id, [], set(), [], stored.response, analyzed_at=stored.analyzed_at
+                )
+                return stored.response
+
+            kept = [{"path": path, "sha": sha} for path, sha in stored.manifest_shas.items() if path not in affected]
+            self._report(stage="parsing_manifests")
+            with metrics.stage("parse"):
+                all_dependencies = await self.parse_manifests(fetched + kept, {m["path"] for m in kept}, stored)
+            dependencies = self.select_dependencies(all_dependencies, include_dev)
+            reusable = self._reusable_results(stored, stored.options)
+            analyzed, checked = await self.check_dependencies(dependencies, check_vulnerabilities, reused=reusable)
+            repo_info = {"name": stored.response.repository, "owner": {"login": stored.response.owner}}
+            response = self.summarize(repo_info, analyzed)
+
+            self._report(stage="saving")
+            results = _stored_results(checked)
+            with metrics.stage("persist"):
+                await self.store.update_manifests(
+                    stored.repo_id,
+                    fetched,
+                    affected,
+                    [
+                        {**dep, **results.get(dependency_key(dep), {})}
+                        for dep in all_dependencies if dep["manifest_path"] in affected
+                    ],
+                    response,
+                    # Reused results keep their age, so they still expire ANALYSIS_REUSE_TTL after their check
+                    analyzed_at=stored.analyzed_at if reusable is not None else None,
+                )
+            return response
+        finally:
+            metrics.ANALYSES_IN_FLIGHT.dec()
+
+    async def analyze_many(
+        self,
+        targets: List[Tuple[str, str, Optional[str]]],
+        include_dev: bool = True,
+        check_vulnerabilities: bool = True,
+    ) -> BulkAnalysisResponse:
+        """Analyze many repositories, checking each unique (ecosystem, name, version) only once.
+
+        Only the registry and vulnerability outcome of a package is shared; each repository's
+        results are rebuilt from its own dependencies (manifest, dev and transitive provenance).
+        The checks of every repository run as one phase, so its deadline is ANALYSIS_DEADLINE
+        per repository; anything still unfinished at the deadline is reported unchecked.
+        """
+        semaphore = asyncio.Semaphore(config.BULK_REPO_CONCURRENCY)
+        self._report(stage="collecting_repositories", repositories_total=len(targets), repositories_collected=0)
+
+        async def collect(owner: str, repo: str, branch: Optional[str]) -> RepositoryContext:
+            async with semaphore:
+                try:
+                    return await self.collect(owner, repo, branch, include_dev, check_vulnerabilities, report=False)
+                finally:
+                    self._report(repositories_collected=self.progress.get("repositories_collected", 0) + 1)
+
+        collected = await asyncio.gather(*(collect(*target) for target in targets), return_exceptions=True)
+        contexts: List[RepositoryContext] = []
+        failures: Dict[str, str] = {}
+        for (owner, repo, _), result in zip(targets, collected):
+            if isinstance(result, BaseException):
+                logger.error(f"Bulk analysis could not collect {owner}/{repo}: {result}")
+                failures[f"{owner}/{repo}"] = str(getattr(result, "detail", result))
+            else:
+                contexts.append(result)
+
+        pending = [context for context in contexts if context.cached_response is None]
+        reused: Dict[DependencyKey, OutdatedDependency] = {}
+        for context in pending:
+            reused.update(context.reusable or {})
+        # A package locked transitively in one repository and declared directly in another is
+        # checked both ways: only direct dependencies get a registry check, only outdated or
+        # locked direct ones an OSV query, while transitive ones are always queried
+        unique: Dict[Tuple[DependencyKey, bool], Dict[str, Any]] = {}
+        for context in pending:
+            for dep in context.dependencies:
+                key = (dependency_key(dep), bool(dep.get("transitive")))
+                # A locked copy wins, so the shared check includes its OSV query
+                if key not in unique or (dep.get("locked") and not unique[key].get("locked")):
+                    unique[key] = dep
+        analyzed, checked = await self.check_dependencies(
+            list(unique.values()),
+            check_vulnerabilities,
+            reused=reused,
+            deadline=config.ANALYSIS_DEADLINE * max(1, len(pending)),
+        )
+        outcomes = {
+            (dependency_key(dep), bool(dep.get("transitive"))): (dep, result.vulnerabilities)
+            for result, dep in zip(analyzed, checked)
+        }
+
+        repositories: List[RepositoryAnalysisResponse] = []
+        for context in contexts:
+            if context.cached_response is not None:
+                repositories.append(context.cached_response)
+                continue
+            repo_analyzed: List[OutdatedDependency] = []
+            repo_checked: List[Dict[str, Any]] = []
+            for dep in context.dependencies:
+                outcome = outcomes.get((dependency_key(dep), bool(dep.get("transitive"))))
+                if outcome is None:
+                    continue  # No driver for its ecosystem
+                shared, vulnerabilities = outcome
+                dep = {
+                    **dep,
+                    "latest_version": shared["latest_version"],
+                    "is_outdated": shared["is_outdated"],
+                    "check_failed": shared.get("check_failed", False),
+                }
+                repo_checked.append(dep)
+                repo_analyzed.append(self._to_outdated_dependency(dep, vulnerabilities))
+            try:
+                repositories.append(await self.complete(context, repo_analyzed, repo_checked, report=False))
+            except Exception as e:
+                logger.error(f"Bulk analysis could not save {context.owner}/{context.repo}: {e}")
+                failures[f"{context.owner}/{context.repo}"] = str(e)
+
+        return BulkAnalysisResponse(
+            analyzed_at=datetime.utcnow().isoformat(),
+            total_repositories=len(targets),
+            total_dependencies=sum(len(context.dependencies) for context in pending),
+            unique_dependencies=len({key for key, _ in unique}),
+            repositories=repositories,
+            failures=failures,
+        )
+
+    async def collect(
+        self,
+        owner: str,
+        repo: str,
+        branch: Optional[str] = None,
+        include_dev: bool = True,
+        check_vulnerabilities: bool = True,
+        report: bool = True,
+    ) -> RepositoryContext:
+        """Fetch repo metadata and manifests and parse dependencies, reusing stored work where possible"""
+        report = self._report if report else (lambda **_: None)
+        report(stage="fetching_repository")
+        # Loaded first so the snapshot only carries manifests whose blob changed since
+        default_link = f"https://github.com/{owner}/{repo}"
+        stored = await self.store.load(default_link)
+        with metrics.stage("github"):
+            repo_info, languages, branch, discovered, prefetched = await self.fetch_repository(owner, repo, branch, stored)
+        repo_link = repo_info.get("html_url") or default_link
+        if repo_link != default_link:
+            # Stored under the canonical URL (e.g. a different case or a renamed repository)
+            stored = await self.store.load(repo_link)
+        options = analysis_options(include_dev, check_vulnerabilities)
+        context = RepositoryContext(owner, repo, branch, repo_info, languages, repo_link, options)
+
+        if discovered is None:
+            report(stage="discovering_manifests")
+            with metrics.stage("github"):
+                discovered = await self.discover_manifests(owner, repo, branch)
+        unchanged = self._unchanged_manifests(discovered, stored)
+        context.reusable = self._reusable_results(stored, options)
+
+        # Nothing changed since a recent, complete analysis with the same options: serve it as-is
+        if (
+            context.reusable is not None
+            and stored
+            and len(unchanged) == len(discovered) == len(stored.manifest_shas)
+            and not any(dep.check_failed for dep in stored.response.dependencies)
+        ):
+            context.cached_response = stored.response
+            return context
+
+        report(
+            stage="fetching_manifests",
+            manifests_total=len(discovered),
+            manifests_changed=len(discovered) - len(unchanged),
+        )
+        with metrics.stage("github"):
+            manifests = await self.fetch_manifests(
+                owner, repo, [m for m in discovered if m["path"] not in unchanged], prefetched, branch
+            )
+        context.manifests = manifests + [m for m in discovered if m["path"] in unchanged]
+
+        report(stage="parsing_manifests")
+        with metrics.stage("parse"):
+            context.all_dependencies = await self.parse_manifests(context.manifests, unchanged, stored)
+        context.dependencies = self.select_dependencies(context.all_dependencies, include_dev)
+        return context
+
+    async def complete(
+        self,
+        context: RepositoryContext,
+        analyzed: List[OutdatedDependency],
+        checked: List[Dict[str, Any]],
+        report: bool = True,
+    ) -> RepositoryAnalysisResponse:
+        """Summarize checked dependencies and persist the analysis"""
+        response = self.summarize(context.repo_info, analyzed)
+
+        if report:
+            self._report(stage="saving")
+        results = _stored_results(checked)
+        with metrics.stage("persist"):
+            await self.store.save(
+                context.repo_link,
+                context.repo_info,
+                context.languages,
+                context.branch,
+                context.options,
+                context.manifests,
+                [{**dep, **results.get(dependency_key(dep), {})} for dep in context.all_dependencies],
+                response,
+            )
+        return response
+
+    # ---------------------------
+    # Stages
+    # ---------------------------
+    async def fetch_repository(
+        self, owner: str, repo: str, branch: Optional[str], stored: Optional[StoredAnalysis] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int], str, Optional[List[Dict[str, Any]]], Dict[str, str]]:
+        """Repo metadata, languages and the branch to analyze.
+
+        With GraphQL available the tree is listed first, so a single query returns the
+        metadata together with every manifest blob not already parsed in `stored`; the
+        discovered manifests and the prefetched blob texts (by SHA) are returned as well.
+        Over REST those are None / {}. When more than GITHUB_ARCHIVE_THRESHOLD blobs changed
+        they are left out of the query; fetch_manifests reads them from the ref's tarball instead.
+        """
+        if not self.github.graphql_enabled:
+            repo_info, languages = await self.github.get_repo_overview(owner, repo)
+            return repo_info, languages, branch or repo_info.get("default_branch") or "main", None, {}
+
+        # The trees API resolves HEAD to the default branch
+        discovered = await self.discover_manifests(owner, repo, branch or "HEAD")
+        unchanged = self._unchanged_manifests(discovered, stored)
+        changed = [m for m in discovered if m["path"] not in unchanged]
+        shas = [] if _use_archive(changed) else [m["sha"] for m in changed]
+        snapshot = await self.github.get_repo_snapshot(owner, repo, shas)
+        branch = branch or snapshot.repo_info.get("default_branch") or "main"
+        return snapshot.repo_info, snapshot.languages, branch, discovered, snapshot.blobs
+
+    async def discover_manifests(self, owner: str, repo: str, branch: str) -> List[Dict[str, Any]]:
+        """List supported manifests and lockfiles at any depth with a single recursive tree call.
+
+        Trees too large for one recursive listing are walked a level at a time instead, skipping
+        vendored directories, until each subtree fits in one call.
+        """
+        semaphore = asyncio.Semaphore(config.GITHUB_FETCH_CONCURRENCY)
+
+        async def walk(ref: str, prefix: str, recursive: bool = True) -> List[Dict[str, Any]]:
+            async with semaphore:
+                tree = await self.github.get_tree(owner, repo, ref, recursive=recursive)
+            if recursive and tree.get("truncated"):
+                logger.info(f"Tree listing of {owner}/{repo}@{branch}:{prefix or '/'} was truncated; walking its subtrees")
+                return await walk(ref, prefix, recursive=False)
+            entries = [{**entry, "path": prefix + entry["path"]} for entry in tree.get("tree", [])]
+            if recursive:
+                return entries
+            subtrees = [
+                entry for entry in entries
+                if entry.get("type") == "tree" and entry["path"].rsplit("/", 1)[-1] not in IGNORED_DIRECTORIES
+            ]
+            for listed in await asyncio.gather(*(walk(entry["sha"], entry["path"] + "/") for entry in subtrees)):
+                entries.extend(listed)
+            return entries
+
+        return [
+            {"path": entry["path"], "sha": entry["sha"]}
+            for entry in await walk(branch, "")
+            if entry.get("type") == "blob" and is_manifest_path(entry["path"])
+        ]
+
+    async def fetch_manifests(
+        self,
+        owner: str,
+        repo: str,
+        manifests: List[Dict[str, Any]],
+        prefetched: Optional[Dict[str, str]] = None,
+        ref: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch manifest blobs concurrently, skipping those already prefetched by SHA.
+
+        With a ref and more than GITHUB_ARCHIVE_THRESHOLD blobs to fetch, they come from a
+        single streamed tarball of the ref; any it did not yield are fetched one by one.
+        """
+        semaphore = asyncio.Semaphore(config.GITHUB_FETCH_CONCURRENCY)
+        prefetched = prefetched or {}
+        missing = [m for m in manifests if m["sha"] not in prefetched]
+        if ref and _use_archive(missing):
+            archived = await self.github.get_archive_files(owner, repo, ref, {m["path"]: m["sha"] for m in missing})
+            prefetched = {**prefetched, **archived}
+
+        async def fetch(manifest: Dict[str, Any]) -> Dict[str, Any]:
+            if manifest["sha"] in prefetched:
+                return {**manifest, "content": prefetched[manifest["sha"]]}
+            async with semaphore:
+                return {**manifest, "content": await self.github.get_blob(owner, repo, manifest["sha"])}
+
+        files = await asyncio.gather(*(fetch(manifest) for manifest in manifests))
+        return [file for file in files if file.get("content")]
+
+    async def fetch_files(self, owner: str, repo: str, branch: str, paths: List[str]) -> List[Dict[str, Any]]:
+        """Fetch manifests by path at a branch; paths that no longer exist are left out"""
+        semaphore = asyncio.Semaphore(config.GITHUB_FETCH_CONCURRENCY)
+
+        async def fetch(path: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                file = await self.github.get_file(owner, repo, path, branch)
+                # The contents API leaves files over 1 MB (large lockfiles) empty; the blob has them
+                if file and not file.get("content") and file.get("sha"):
+                    file["content"] = await self.github.get_blob(owner, repo, file["sha"])
+                return file
+
+        files = await asyncio.gather(*(fetch(path) for path in paths))
+        return [file for file in files if file and file.get("content")]
+
+    async def parse_manifests(
+        self,
+        manifests: List[Dict[str, Any]],
+        unchanged: Optional[set] = None,
+        stored: Optional[StoredAnalysis] = None,
+    ) -> List[Dict[str, Any]]:
+        """Parse manifests (dev dependencies included), reusing stored results for unchanged blobs.
+
+        Lockfiles are parsed after the manifests beside them: direct dependencies are pinned to
+        their locked versions and every other locked package is added as a transitive dependency.
+        """
+        def parsed(manifest: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+            if stored and unchanged and manifest["path"] in unchanged:
+                return stored.dependencies_by_manifest.get(manifest["path"], [])
+            return None
+
+        dependencies: List[Dict[str, Any]] = []
+        for manifest in [m for m in manifests if not _is_lockfile(m["path"])]:
+            deps = parsed(manifest)
+            if deps is None:
+                deps = await self._parse(manifest["path"], manifest["content"])
+            dependencies.extend({**dep, "manifest_path": manifest["path"]} for dep in deps)
+
+        locked: List[Dict[str, Any]] = []
+        for manifest in [m for m in manifests if _is_lockfile(m["path"])]:
+            directory = _directory(manifest["path"])
+            deps = parsed(manifest)
+            if deps is None:
+                beside = [dep for dep in dependencies if _directory(dep["manifest_path"]) == directory]
+                deps = await asyncio.to_thread(
+                    parse_lockfile, manifest["path"].rsplit("/", 1)[-1], manifest["content"], beside
+                )
+            locked.extend({**dep, "manifest_path": manifest["path"]} for dep in deps)
+        return _apply_lockfiles(dependencies, locked) if locked else dependencies
+
+    def select_dependencies(self, dependencies: List[Dict[str, Any]], include_dev: bool) -> List[Dict[str, Any]]:
+        """Drop dev dependencies if not requested and collapse duplicates"""
+        # The same package can appear in several sections (e.g. dependencies and devDependencies)
+        unique_deps: Dict[DependencyKey, Dict[str, Any]] = {}
+        for dep in dependencies:
+            if include_dev or not dep.get("is_dev"):
+                unique_deps.setdefault(dependency_key(dep), dep)
+        return list(unique_deps.values())
+
+    async def check_dependencies(
+        self,
+        dependencies: List[Dict[str, Any]],
+        check_vulnerabilities: bool = True,
+        reused: Optional[Dict[DependencyKey, OutdatedDependency]] = None,
+        deadline: float = config.ANALYSIS_DEADLINE,
+    ) -> Tuple[List[OutdatedDependency], List[Dict[str, Any]]]:
+        """Registry and vulnerability checks; deps already in a fresh stored analysis reuse its results.
+
+        A failed or timed-out lookup marks the dependency `check_failed` instead of reporting it
+        up to date or clean; its vulnerabilities are still looked up, as its version is unknown.
+        """
+        reused = reused or {}
+        drivers = self.analyzer.drivers
+
+        previous: Dict[int, OutdatedDependency] = {}
+        tasks, dep_map = [], []
+        for dep in dependencies:
+            key = dependency_key(dep)
+            # A result is only reused for the same kind of dependency: transitive ones skip the registry
+            if key in reused and reused[key].is_transitive == bool(dep.get("transitive")):
+                previous[len(dep_map)] = reused[key]
+                dep_map.append(dep)
+                continue
+            if dep.get("transitive"):
+                # Locked transitive packages are only checked for vulnerabilities
+                dep_map.append(dep)
+                continue
+            driver = drivers.get(dep["type"])
+            if driver:
+                tasks.append(self._tracked(driver.check_outdated(dep["name"], dep["version"], dep.get("constraint"))))
+                dep_map.append(dep)
+
+        self._report(
+            stage="checking_dependencies",
+            dependencies_total=len(dep_map),
+            dependencies_checked=len(previous),
+        )
+        # Registry limits are enforced per request inside the scheduler; the deadline bounds the whole phase
+        with metrics.stage("registry"):
+            results = iter(await self.scheduler.gather(tasks, deadline=deadline))
+        checked: List[Dict[str, Any]] = []
+
+        for i, dep in enumerate(dep_map):
+            if i in previous:
+                prior = previous[i]
+                checked.append({**dep, "latest_version": prior.latest_version, "is_outdated": prior.is_outdated})
+                continue
+            if dep.get("transitive"):
+                checked.append({**dep, "latest_version": dep["version"], "is_outdated": False})
+                continue
+            result = next(results)
+            if isinstance(result, Exception):
+                logger.error(f"Dependency check failed for {dep['name']}: {result!r}")
+                checked.append({**dep, "latest_version": dep["version"], "is_outdated": False, "check_failed": True})
+                continue
+            result = cast(Dict[str, Any], result)
+            latest_version = result.get("latest_version", dep["version"])
+            is_outdated = result.get("is_outdated", False)
+            checked.append({**dep, "latest_version": latest_version, "is_outdated": is_outdated})
+
+        # Resolve vulnerabilities for all outdated, locked (or unknown) deps in one batched OSV pass
+        vulnerability_map: Dict[int, List] = {}
+        if check_vulnerabilities:
+            vuln_indexes = [i for i, dep in enumerate(checked) if _needs_vulnerability_check(dep) and i not in previous]
+            self._report(stage="checking_vulnerabilities", vulnerability_queries=len(vuln_indexes))
+            vuln_results = await self.analyzer.check_vulnerabilities_batch(
+                [(checked[i]["name"], checked[i]["version"], checked[i]["type"]) for i in vuln_indexes]
+            )
+            for i, vulnerabilities in zip(vuln_indexes, vuln_results):
+                if vulnerabilities is None:
+                    checked[i]["check_failed"] = True
+                vulnerability_map[i] = vulnerabilities or []
+            vulnerability_map.update({i: prior.vulnerabilities for i, prior in previous.items()})
+
+        analyzed_dependencies = [
+            self._to_outdated_dependency(dep, vulnerability_map.get(i, [])) for i, dep in enumerate(checked)
+        ]
+        return analyzed_dependencies, checked
+
+    def summarize(
+        self, repo_info: Dict[str, Any], analyzed_dependencies: List[OutdatedDependency]
+    ) -> RepositoryAnalysisResponse:
+        summary = AnalysisSummary()
+        listed = [dep for dep in analyzed_dependencies if summary.add(dep)]
+        return RepositoryAnalysisResponse(
+            **summary.to_dict(repo_info),
+            dependencies=listed,
+        )
+
+    async def stream(
+        self,
+        owner: str,
+        repo: str,
+        branch: Optional[str] = None,
+        include_dev: bool = True,
+        check_vulnerabilities: bool = True,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ("repository" | "dependency" | "summary", payload) events as results complete.
+
+        Each dependency is emitted once its registry check (and, if outdated, its vulnerability
+        check) finishes; only running totals are kept, so memory does not grow with the number
+        of results. Streamed analyses are not persisted.
+        """
+        repo_info, languages, branch, discovered, prefetched = await self.fetch_repository(owner, repo, branch)
+        if discovered is None:
+            discovered = await self.discover_manifests(owner, repo, branch)
+        manifests = await self.fetch_manifests(owner, repo, discovered, prefetched, branch)
+        dependencies = self.select_dependencies(await self.parse_manifests(manifests), include_dev)
+        drivers = self.analyzer.drivers
+        dependencies = [dep for dep in dependencies if dep["type"] in drivers]
+
+        yield "repository", {
+            "repository": repo_info["name"],
+            "owner": repo_info["owner"]["login"],
+            "branch": branch,
+            "languages": languages,
+            "total_dependencies": sum(not dep.get("transitive") for dep in dependencies),
+            "transitive_dependencies": sum(bool(dep.get("transitive")) for dep in dependencies),
+        }
+
+        # Vulnerability checks of results completing close together share one OSV batch
+        batcher: WindowBatcher[VulnQuery, Optional[List[VulnerabilityInfo]]] = WindowBatcher(
+            self.analyzer.check_vulnerabilities_batch, config.OSV_BATCH_SIZE, config.OSV_BATCH_WINDOW
+        )
+
+        async def check(dep: Dict[str, Any]) -> OutdatedDependency:
+            latest_version, is_outdated, check_failed = dep["version"], False, False
+            if not dep.get("transitive"):
+                try:
+                    result = await drivers[dep["type"]].check_outdated(dep["name"], dep["version"], dep.get("constraint"))
+                    latest_version = result.get("latest_version", dep["version"])
+                    is_outdated = result.get("is_outdated", False)
+                except Exception as e:
+                    logger.error(f"Dependency check failed for {dep['name']}: {e!r}")
+                    check_failed = True
+            checked = {**dep, "latest_version": latest_version, "is_outdated": is_outdated, "check_failed": check_failed}
+            vulnerabilities: Optional[List[VulnerabilityInfo]] = []
+            if check_vulnerabilities and _needs_vulnerability_check(checked):
+                try:
+                    vulnerabilities = await batcher.get((dep["name"], dep["version"], dep["type"]))
+                except Exception as e:
+                    logger.error(f"Vulnerability check failed for {dep['name']}: {e}")
+                    vulnerabilities = None
+                checked["check_failed"] = check_failed or vulnerabilities is None
+            return self._to_outdated_dependency(checked, vulnerabilities or [])
+
+        summary = AnalysisSummary()
+        tasks = [asyncio.ensure_future(check(dep)) for dep in dependencies]
+        try:
+            for next_result in asyncio.as_completed(tasks, timeout=config.ANALYSIS_DEADLINE):
+                result = await next_result
+                if summary.add(result):
+                    yield "dependency", result.model_dump(mode="json")
+        except asyncio.TimeoutError:
+            logger.warning(f"Streaming analysis of {owner}/{repo} hit the {config.ANALYSIS_DEADLINE}s deadline")
+            # Dependencies still being checked are reported as unchecked, not silently dropped
+            summary.unchecked += sum(not task.done() for task in tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield "summary", summary.to_dict(repo_info)
+
+    # ---------------------------
+    # Helpers
+    # ---------------------------
+    def _report(self, **progress: Any) -> None:
+        self.progress.update(progress)
+        if self.on_progress:
+            self.on_progress(dict(self.progress))
+
+    def _to_outdated_dependency(self, dep: Dict[str, Any], vulnerabilities: List[VulnerabilityInfo]) -> OutdatedDependency:
+        is_outdated = dep["is_outdated"]
+        risk_level = SeverityLevel.LOW
+        if vulnerabilities:
+            risk_level = max((v.severity for v in vulnerabilities), key=SEVERITY_ORDER.index)
+        elif is_outdated:
+            risk_level = SeverityLevel.MODERATE
+
+        return OutdatedDependency(
+            name=dep["name"],
+            current_version=dep["version"],
+            version_constraint=dep.get("constraint"),
+            latest_version=dep["latest_version"],
+            dependency_type=dep["type"],
+            is_outdated=is_outdated,
+            vulnerabilities=vulnerabilities,
+            risk_level=risk_level,
+            update_available=is_outdated,
+            is_transitive=dep.get("transitive", False),
+            introduced_by=dep.get("introduced_by"),
+            check_failed=dep.get("check_failed", False),
+        )
+
+    async def _tracked(self, coro: Awaitable[Any]) -> Any:
+        try:
+            return await coro
+        finally:
+            self._report(dependencies_checked=self.progress.get("dependencies_checked", 0) + 1)
+
+    async def _parse(self, path: str, content: str) -> List[Dict[str, Any]]:
+        return await self.analyzer.parse_manifest(path.rsplit("/", 1)[-1], content)
+
+    def _unchanged_manifests(self, manifests: List[Dict[str, Any]], stored: Optional[StoredAnalysis]) -> set:
+        """Paths whose stored parse is still valid: same blob, and nothing beside them changed.
+
+        A lockfile pins the manifests in its directory, so a change to any of them (or one added
+        or removed) re-parses the whole directory, as refresh does.
+        """
+        if stored is None:
+            return set()
+        same = {m["path"] for m in manifests if m.get("sha") and stored.manifest_shas.get(m["path"]) == m["sha"]}
+        current = {m["path"] for m in manifests}
+        changed = {_directory(path) for path in (current | set(stored.manifest_shas)) - same}
+        return {path for path in same if _directory(path) not in changed}
+
+    def _reusable_results(
+        self, stored: Optional[StoredAnalysis], options: str
+    ) -> Optional[Dict[DependencyKey, OutdatedDependency]]:
+        """Per-dependency results of the stored analysis, if recent enough and run with the same options"""
+        if stored is None or stored.response is None or stored.options != options:
+            return None
+        if (datetime.utcnow() - stored.analyzed_at).total_seconds() > config.ANALYSIS_REUSE_TTL:
+            return None
+        # Failed lookups are never reused: the next analysis retries them
+        reusable: Dict[DependencyKey, OutdatedDependency] = {}
+        failed = set()
+        for dep in stored.response.dependencies:
+            key = (dep.dependency_type, dep.name, dep.current_version, dep.version_constraint)
+            if dep.check_failed:
+                failed.add(key)
+            else:
+                reusable[key] = dep
+        # Transitive packages are only listed when vulnerable or unchecked; the rest were checked and clean
+        for deps in stored.dependencies_by_manifest.values():
+            for dep in deps:
+                if dep["transitive"] and dependency_key(dep) not in failed:
+                    reusable.setdefault(
+                        dependency_key(dep),
+                        self._to_outdated_dependency({**dep, "latest_version": dep["version"], "is_outdated": False}, []),
+                    )
+        return reusable
+
+
+def build_analysis_pipeline(
+    state: Any, github_token: Optional[str] = None, on_progress: Optional[ProgressCallback] = None
+) -> AnalysisPipeline:
+    """Build a pipeline from the app-lifetime shared services stored on app.state"""
+    github_service = GitHubService(
+        github_token, state.http_pool, state.singleflight, state.github_etag_cache, state.github_tokens
+    )
+    analyzer = DependencyAnalyzer(
+        state.http_pool, state.registry_cache, state.scheduler, state.singleflight, state.osv_mirror, state.shared_cache
+    )
+    return AnalysisPipeline(github_service, analyzer, state.analysis_store, on_progress)
+
+
+def get_analysis_pipeline(request: Request, github_token: Optional[str] = Depends(get_github_token)) -> AnalysisPipeline:
+    """Build a pipeline for this request from the app-lifetime shared services"""
+    return build_analysis_pipeline(request.app.state, github_token)
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import Request
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import config
+from src.database import AsyncSessionLocal
+from src.models import Dependency, Manifest, Repo
+from src.schemas import DependencyType, RepositoryAnalysisResponse
+
+
+@dataclass
+class StoredAnalysis:
+    repo_id: int
+    analyzed_at: datetime
+    options: Optional[str]
+    manifest_shas: Dict[str, str] = field(default_factory=dict)
+    dependencies_by_manifest: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    response: Optional[RepositoryAnalysisResponse] = None
+
+
+class AnalysisStore:
+    """Persists analyses in the `repos`, `manifests` and `dependencies` tables"""
+
+    async def load(self, repo_link: str) -> Optional[StoredAnalysis]:
+        async with AsyncSessionLocal() as db:
+            repo = (await db.execute(select(Repo).where(Repo.repo_link == repo_link))).scalar_one_or_none()
+            if repo is None:
+                return None
+
+            stored = StoredAnalysis(
+                repo_id=repo.id,
+                analyzed_at=repo.last_fetched,
+                options=repo.analysis_options,
+            )
+            manifests = await db.execute(select(Manifest.path, Manifest.blob_sha).where(Manifest.repo_id == repo.id))
+            stored.manifest_shas = {path: sha for path, sha in manifests}
+            # Plain column tuples: building ORM objects for 50k lockfile rows costs more than the query
+            dependencies = await db.execute(
+                select(
+                    Dependency.manifest_path,
+                    Dependency.name,
+                    Dependency.version,
+                    Dependency.version_constraint,
+                    Dependency.dependency_type,
+                    Dependency.is_dev,
+                    Dependency.is_transitive,
+                    Dependency.is_locked,
+                    Dependency.introduced_by,
+                ).where(Dependency.repo_id == repo.id)
+            )
+            for manifest_path, name, version, constraint, dep_type, is_dev, transitive, locked, introduced_by in dependencies:
+                stored.dependencies_by_manifest.setdefault(manifest_path, []).append({
+                    "name": name,
+                    "version": version,
+                    "constraint": constraint,
+                    "type": DependencyType(dep_type),
+                    "is_dev": is_dev,
+                    "transitive": bool(transitive),
+                    "locked": bool(locked),
+                    "introduced_by": introduced_by,
+                })
+            if repo.last_analysis:
+                stored.response = RepositoryAnalysisResponse.model_validate_json(repo.last_analysis)
+            return stored
+
+    async def tracked_branch(self, repo_link: str) -> Optional[str]:
+        """Branch of the stored analysis of a repository, or None if it was never analyzed"""
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(
+                select(Repo.branch).where(Repo.repo_link == repo_link, Repo.last_analysis.is_not(None))
+            )).scalar_one_or_none()
+
+    async def save(
+        self,
+        repo_link: str,
+        repo_info: Dict[str, Any],
+        languages: Dict[str, int],
+        branch: str,
+        options: str,
+        manifests: List[Dict[str, Any]],
+        dependencies: List[Dict[str, Any]],
+        response: RepositoryAnalysisResponse,
+    ) -> None:
+        now = datetime.utcnow()
+        values = {
+            "repo_name": repo_info.get("name"),
+            "owner_name": repo_info.get("owner", {}).get("login"),
+            "branch": branch,
+            "stars_count": repo_info.get("stargazers_count", 0),
+            "forks_count": repo_info.get("forks_count", 0),
+            "issues_count": repo_info.get("open_issues_count", 0),
+            "technologies": ",".join(languages),
+            "description": repo_info.get("description"),
+            "tags": ",".join(str(t) for t in repo_info.get("topics", []) or []),
+            "last_fetched": now,
+            "analysis_options": options,
+            "last_analysis": response.model_dump_json(),
+        }
+        # One upsert instead of select-then-insert/update; date_added is kept on conflict
+        upsert = insert(Repo).values(repo_link=repo_link, date_added=now, **values)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[Repo.repo_link],
+            set_={column: upsert.excluded[column] for column in values},
+        ).returning(Repo.id)
+
+        async with AsyncSessionLocal() as db:
+            repo_id = (await db.execute(upsert)).scalar_one()
+            await db.execute(delete(Manifest).where(Manifest.repo_id == repo_id))
+            await db.execute(delete(Dependency).where(Dependency.repo_id == repo_id))
+
+            await self._insert_rows(db, repo_id, manifests, dependencies, now)
+            await db.commit()
+
+    async def update_manifests(
+        self,
+        repo_id: int,
+        manifests: List[Dict[str, Any]],
+        paths: Set[str],
+        dependencies: List[Dict[str, Any]],
+        response: RepositoryAnalysisResponse,
+        analyzed_at: Optional[datetime] = None,
+    ) -> None:
+        """Replace the manifest and dependency rows of the given paths only, leaving the rest in place.
+
+        `manifests` and `dependencies` are the current state of those paths (a path missing
+        from `manifests` was deleted); the repository's summary is updated, and last_fetched
+        is set to `analyzed_at` (default: now), the time of the oldest result in `response`.
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Repo)
+                .where(Repo.id == repo_id)
+                .values(last_fetched=analyzed_at or now, last_analysis=response.model_dump_json())
+            )
+            if paths:
+                await db.execute(delete(Manifest).where(Manifest.repo_id == repo_id, Manifest.path.in_(paths)))
+                await db.execute(
+                    delete(Dependency).where(Dependency.repo_id == repo_id, Dependency.manifest_path.in_(paths))
+                )
+            await self._insert_rows(db, repo_id, manifests, dependencies, now)
+            await db.commit()
+
+    async def _insert_rows(
+        self,
+        db: AsyncSession,
+        repo_id: int,
+        manifests: List[Dict[str, Any]],
+        dependencies: List[Dict[str, Any]],
+        now: datetime,
+    ) -> None:
+        manifest_rows = [
+            {"repo_id": repo_id, "path": m["path"], "blob_sha": m["sha"], "fetched_at": now}
+            for m in manifests if m.get("sha")
+        ]
+        if manifest_rows:
+            await db.execute(insert(Manifest), manifest_rows)
+        # Lockfiles contribute tens of thousands of rows; insert them with chunked executemany
+        rows = [
+            {
+                "repo_id": repo_id,
+                "name": dep["name"],
+                "version": dep["version"],
+                "version_constraint": dep.get("constraint"),
+                "latest_version": dep.get("latest_version"),
+                "outdated": dep.get("is_outdated", False),
+                "dependency_type": dep["type"].value,
+                "is_dev": dep.get("is_dev", False),
+                "is_transitive": dep.get("transitive", False),
+                "is_locked": dep.get("locked", False),
+                "introduced_by": dep.get("introduced_by"),
+                "manifest_path": dep["manifest_path"],
+            }
+            for dep in dependencies
+        ]
+        for i in range(0, len(rows), config.DB_BULK_CHUNK):
+            await db.execute(insert(Dependency), rows[i:i + config.DB_BULK_CHUNK])
+
+
+def get_analysis_store(request: Request) -> AnalysisStore:
+    """Return the app-lifetime analysis store created in the lifespan hook"""
+    return request.app.state.analysis_store
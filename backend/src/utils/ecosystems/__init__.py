@@ -0,0 +1,56 @@
+from typing import Dict
+
+from src import config
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.ecosystems.cargo import CargoDriver
+from src.utils.ecosystems.composer import ComposerDriver
+from src.utils.ecosystems.gem import GemDriver
+from src.utils.ecosystems.go import GoDriver
+from src.utils.ecosystems.maven import MavenDriver
+from src.utils.ecosystems.npm import NpmDriver
+from src.utils.ecosystems.pypi import PyPIDriver
+from src.utils.http_client import HTTPClientPool
+from src.utils.registry_cache import RegistryCache
+from src.utils.scheduler import RegistryScheduler
+
+DRIVER_CLASSES = (NpmDriver, PyPIDriver, GoDriver, MavenDriver, CargoDriver, ComposerDriver, GemDriver)
+
+# Manifest filename -> ecosystem that parses it
+MANIFEST_FILES: Dict[str, DependencyType] = {
+    filename: driver.dependency_type for driver in DRIVER_CLASSES for filename in driver.manifest_files
+}
+
+
+def build_drivers(
+    http_pool: HTTPClientPool, scheduler: RegistryScheduler, registry_cache: RegistryCache
+) -> Dict[DependencyType, EcosystemDriver]:
+    """One driver per supported ecosystem, sharing the app's pool, scheduler and cache"""
+    base_urls = {
+        DependencyType.NPM: config.NPM_REGISTRY_URL,
+        DependencyType.PIP: config.PYPI_URL,
+        DependencyType.GO: config.GO_PROXY_URL,
+        DependencyType.MAVEN: config.MAVEN_SEARCH_URL,
+        DependencyType.CARGO: config.CARGO_INDEX_URL,
+        DependencyType.COMPOSER: config.PACKAGIST_URL,
+        DependencyType.GEM: config.RUBYGEMS_URL,
+    }
+    return {
+        driver.dependency_type: driver(base_urls[driver.dependency_type], http_pool, scheduler, registry_cache)
+        for driver in DRIVER_CLASSES
+    }
+
+
+__all__ = [
+    "DRIVER_CLASSES",
+    "MANIFEST_FILES",
+    "EcosystemDriver",
+    "CargoDriver",
+    "ComposerDriver",
+    "GemDriver",
+    "GoDriver",
+    "MavenDriver",
+    "NpmDriver",
+    "PyPIDriver",
+    "build_drivers",
+]
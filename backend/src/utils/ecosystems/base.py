@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from src import config
+from src.schemas import DependencyType
+from src.utils.http_client import HTTPClientPool
+from src.utils.registry_cache import RegistryCache
+from src.utils.scheduler import RegistryScheduler, WindowBatcher
+from src.utils.versioning import base_version, is_outdated
+
+
+class EcosystemDriver:
+    """One package ecosystem: manifest parsing, registry lookups and its OSV ecosystem name.
+
+    Drivers for registries that only serve one package per request implement
+    `fetch_latest` / `extract_latest`, which go through the registry cache with
+    conditional revalidation. Drivers whose registry has a multi-package endpoint set
+    `batch_size` and implement `fetch_latest_batch`; concurrent lookups are then
+    coalesced for `config.REGISTRY_BATCH_WINDOW` into requests of up to `batch_size`.
+    """
+
+    dependency_type: DependencyType
+    osv_ecosystem: str
+    manifest_files: Tuple[str, ...] = ()
+    batch_size: int = 1
+
+    def __init__(
+        self,
+        base_url: str,
+        http_pool: HTTPClientPool,
+        scheduler: RegistryScheduler,
+        registry_cache: RegistryCache,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.client = http_pool.client(self.base_url)
+        self.scheduler = scheduler
+        self.registry_cache = registry_cache
+        self._batcher: Optional[WindowBatcher[str, Optional[Dict[str, Any]]]] = None
+        if self.batch_size > 1:
+            self._batcher = WindowBatcher(self._resolve_batch, self.batch_size, config.REGISTRY_BATCH_WINDOW)
+
+    @property
+    def registry(self) -> str:
+        """Key for the scheduler's per-registry limits and the registry cache"""
+        return self.dependency_type.value
+
+    # ---------------------------
+    # Interface
+    # ---------------------------
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Dependencies declared in one of `manifest_files`; CPU-bound, called off the event loop"""
+        raise NotImplementedError
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        """Request a single package's metadata, passing the cache's conditional headers"""
+        raise NotImplementedError
+
+    def extract_latest(self, response: httpx.Response) -> Union[Dict[str, Any], Awaitable[Dict[str, Any]]]:
+        """Pick latest_version / description / homepage out of a 200 `fetch_latest` response"""
+        raise NotImplementedError
+
+    async def fetch_latest_batch(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Resolve up to `batch_size` packages in one request; None for unknown packages"""
+        raise NotImplementedError
+
+    # ---------------------------
+    # Manifests
+    # ---------------------------
+    async def parse_manifest(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Parse a manifest in a worker thread so large files never block the event loop"""
+        return await asyncio.to_thread(self.parse, filename, content, include_dev)
+
+    # ---------------------------
+    # Lookups
+    # ---------------------------
+    async def resolve_latest(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Cached registry metadata for many packages; None where the registry has none.
+
+        Lookups that fail raise rather than read as unknown packages.
+        """
+        if self.batch_size > 1:
+            return await self.registry_cache.get_many(self.registry, package_names, self._fetch_batches)
+        results = await asyncio.gather(*(self.latest(name) for name in package_names))
+        return dict(zip(package_names, results))
+
+    async def latest(self, package_name: str) -> Optional[Dict[str, Any]]:
+        """Cached registry metadata for one package"""
+        if self._batcher is not None:
+            return await self._batcher.get(package_name)
+        return await self.registry_cache.get(
+            self.registry,
+            package_name,
+            lambda headers: self.fetch_latest(package_name, headers),
+            self.extract_latest,
+        )
+
+    async def check_outdated(
+        self, package_name: str, current_version: str, constraint: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Compare the registry's latest release against the declared constraint.
+
+        Registry errors propagate, so the caller reports the dependency as unchecked rather than up to date.
+        """
+        meta = await self.latest(package_name)
+        if not meta or not meta.get("latest_version"):
+            return {"latest_version": current_version, "is_outdated": False}
+
+        latest_version = meta["latest_version"]
+        return {
+            "latest_version": latest_version,
+            "is_outdated": is_outdated(self.dependency_type, current_version, constraint, latest_version),
+            "description": meta.get("description", ""),
+            "homepage": meta.get("homepage", ""),
+        }
+
+    # ---------------------------
+    # Helpers
+    # ---------------------------
+    async def _send(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        return await self.scheduler.request(self.registry, send)
+
+    async def _resolve_batch(self, package_names: List[str]) -> List[Optional[Dict[str, Any]]]:
+        resolved = await self.resolve_latest(package_names)
+        return [resolved.get(name) for name in package_names]
+
+    async def _fetch_batches(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        chunks = [package_names[i:i + self.batch_size] for i in range(0, len(package_names), self.batch_size)]
+        resolved: Dict[str, Optional[Dict[str, Any]]] = {}
+        for chunk_result in await asyncio.gather(*(self.fetch_latest_batch(chunk) for chunk in chunks)):
+            resolved.update(chunk_result)
+        return resolved
+
+    def _dependency(self, name: str, constraint: str, is_dev: bool = False) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "version": self._clean_version(constraint),
+            "constraint": constraint,
+            "type": self.dependency_type,
+            "is_dev": is_dev,
+        }
+
+    def _clean_version(self, version: str) -> str:
+        """Concrete version named by a constraint, used for display and vulnerability queries"""
+        return base_version(version) or version
@@ -0,0 +1,85 @@
+import json
+import tomllib
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.versioning import parse_version
+
+
+def index_path(crate: str) -> str:
+    """Path of a crate's file in the sparse registry index"""
+    crate = crate.lower()
+    if len(crate) <= 2:
+        return f"{len(crate)}/{crate}"
+    if len(crate) == 3:
+        return f"3/{crate[0]}/{crate}"
+    return f"{crate[:2]}/{crate[2:4]}/{crate}"
+
+
+class CargoDriver(EcosystemDriver):
+    """crates.io sparse index (index.crates.io): one small, CDN-cached file per crate with ETags"""
+
+    dependency_type = DependencyType.CARGO
+    osv_ecosystem = "crates.io"
+    manifest_files = ("Cargo.toml",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Cargo.toml (Rust) dependencies, including target-specific and workspace tables"""
+        try:
+            manifest = tomllib.loads(content)
+        except tomllib.TOMLDecodeError:
+            return []
+
+        workspace = manifest.get("workspace", {}).get("dependencies", {})
+        # [target.'cfg(windows)'.dependencies] tables sit beside the top-level ones
+        tables = [manifest, *manifest.get("target", {}).values()]
+        sections = [("dependencies", False), ("build-dependencies", False)]
+        if include_dev:
+            sections.append(("dev-dependencies", True))
+
+        dependencies = []
+        for table in tables:
+            for section, is_dev in sections:
+                for key, spec in table.get(section, {}).items():
+                    dependency = self._crate(key, spec, workspace, is_dev)
+                    if dependency:
+                        dependencies.append(dependency)
+        # A virtual workspace manifest declares versions only under [workspace.dependencies]
+        if "package" not in manifest:
+            for key, spec in workspace.items():
+                dependency = self._crate(key, spec, {}, False)
+                if dependency:
+                    dependencies.append(dependency)
+        return dependencies
+
+    def _crate(self, key: str, spec: Any, workspace: Dict[str, Any], is_dev: bool) -> Optional[Dict[str, Any]]:
+        """`name = "1.0"` or `name = { version = "1.0", package = "renamed" }`; path/git-only crates are skipped"""
+        if isinstance(spec, dict) and spec.get("workspace"):
+            spec = workspace.get(key)
+        if isinstance(spec, str):
+            name, version = key, spec
+        elif isinstance(spec, dict) and isinstance(spec.get("version"), str):
+            name, version = spec.get("package", key), spec["version"]
+        else:
+            return None
+        return self._dependency(name, version, is_dev)
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        return await self._send(lambda: self.client.get(f"{self.base_url}/{index_path(package_name)}", headers=headers))
+
+    def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        # One JSON object per published version; the newest non-yanked stable release wins
+        releases = []
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = parse_version(DependencyType.CARGO, entry.get("vers", ""))
+            if key is not None and not entry.get("yanked"):
+                releases.append((key, entry["vers"]))
+        stable = [release for release in releases if release[0][3] == (1,)]
+        candidates = stable or releases
+        return {"latest_version": max(candidates)[1] if candidates else None}
@@ -0,0 +1,60 @@
+import json
+from typing import Any, Dict, List
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.versioning import parse_version
+
+# Stability rank of stable and patch releases in the Composer version scheme
+_STABLE = 4
+
+
+class ComposerDriver(EcosystemDriver):
+    """Packagist metadata v2 (`/p2/{vendor}/{package}.json`), which supports If-Modified-Since"""
+
+    dependency_type = DependencyType.COMPOSER
+    osv_ecosystem = "Packagist"
+    manifest_files = ("composer.json",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze PHP composer.json dependencies"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return []
+
+        dependencies = [self._dependency(name, version) for name, version in data.get("require", {}).items()]
+        if include_dev:
+            dependencies.extend(
+                self._dependency(name, version, is_dev=True) for name, version in data.get("require-dev", {}).items()
+            )
+        return dependencies
+
+    async def latest(self, package_name: str):
+        # Platform requirements (php, ext-json, lib-icu) are not Packagist packages
+        if "/" not in package_name:
+            return None
+        return await super().latest(package_name)
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        return await self._send(lambda: self.client.get(f"{self.base_url}/p2/{package_name.lower()}.json", headers=headers))
+
+    def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        # Versions are listed newest first; the first entry carries the full package metadata
+        versions = next(iter(response.json().get("packages", {}).values()), [])
+        releases = []
+        for version in versions:
+            # Tags like "v2.1.0" come with a normalized "2.1.0.0" alongside
+            key = parse_version(DependencyType.COMPOSER, version.get("version_normalized") or version.get("version", ""))
+            if key is not None and version.get("version"):
+                releases.append((key, version["version"]))
+        stable = [release for release in releases if release[0][1] >= _STABLE]
+        candidates = stable or releases
+        first = versions[0] if versions else {}
+        return {
+            "latest_version": max(candidates)[1] if candidates else None,
+            "description": first.get("description", ""),
+            "homepage": first.get("homepage", ""),
+        }
@@ -0,0 +1,48 @@
+import re
+from typing import Any, Dict, List
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.versioning import base_version
+
+
+class GemDriver(EcosystemDriver):
+    """rubygems.org gem API"""
+
+    dependency_type = DependencyType.GEM
+    osv_ecosystem = "RubyGems"
+    manifest_files = ("Gemfile",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Ruby Gemfile dependencies (basic parser)"""
+        dependencies = []
+        for line in content.splitlines():
+            line = line.strip()
+            if line.startswith("gem "):
+                parts = re.findall(r'["\'](.*?)["\']', line)
+                if parts:
+                    name = parts[0]
+                    # gem "rails", "~> 7.0", ">= 7.0.4" -> every requirement applies
+                    requirements = [p for p in parts[1:] if re.match(r'^\s*(~>|>=|<=|!=|=|>|<)?\s*\d', p)]
+                    constraint = ", ".join(requirements)
+                    dependencies.append({
+                        "name": name,
+                        "version": base_version(constraint) or "latest",
+                        "constraint": constraint,
+                        "type": DependencyType.GEM,
+                        "is_dev": False
+                    })
+        return dependencies
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        return await self._send(lambda: self.client.get(f"{self.base_url}/api/v1/gems/{package_name}.json", headers=headers))
+
+    def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        data = response.json()
+        return {
+            "latest_version": data.get("version"),
+            "description": data.get("info", ""),
+            "homepage": data.get("homepage_uri", ""),
+        }
@@ -0,0 +1,93 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+
+
+def escape_module_path(module: str) -> str:
+    """Module proxy case encoding: each upper-case letter becomes '!' + its lower-case form"""
+    return re.sub(r"[A-Z]", lambda m: "!" + m.group(0).lower(), module)
+
+
+# Quoted strings, comments, `=>`, parentheses and bare words
+_GO_MOD_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|`[^`]*`|//.*|=>|[()]|[^\s()"`]+')
+
+Replacements = Dict[Tuple[str, Optional[str]], Tuple[str, Optional[str]]]
+
+
+def _go_mod_lines(content: str) -> Iterator[Tuple[List[str], str]]:
+    """(tokens, trailing comment) per directive; `verb ( ... )` blocks become one `verb ...` line each"""
+    block: Optional[str] = None
+    for line in content.splitlines():
+        tokens = _GO_MOD_TOKEN.findall(line)
+        comment = tokens.pop() if tokens and tokens[-1].startswith("//") else ""
+        tokens = [token[1:-1] if token[:1] in ('"', "`") else token for token in tokens]
+        if not tokens:
+            continue
+        if block is not None:
+            if tokens == [")"]:
+                block = None
+            else:
+                yield [block, *tokens], comment
+        elif len(tokens) == 2 and tokens[1] == "(":
+            block = tokens[0]
+        else:
+            yield tokens, comment
+
+
+def read_go_mod(content: str) -> Tuple[List[Tuple[str, str, bool]], Replacements]:
+    """(module, version, indirect) requirements and the replace directives of a go.mod"""
+    requires: List[Tuple[str, str, bool]] = []
+    replaces: Replacements = {}
+    for tokens, comment in _go_mod_lines(content):
+        verb, args = tokens[0], tokens[1:]
+        if verb == "require" and len(args) >= 2:
+            indirect = comment[2:].strip().split(";")[0].strip() == "indirect"
+            requires.append((args[0], args[1], indirect))
+        elif verb == "replace" and "=>" in args:
+            arrow = args.index("=>")
+            old, new = args[:arrow], args[arrow + 1:]
+            if old and new:
+                replaces[(old[0], old[1] if len(old) > 1 else None)] = (new[0], new[1] if len(new) > 1 else None)
+    return requires, replaces
+
+
+class GoDriver(EcosystemDriver):
+    """Go module proxy (proxy.golang.org) `@latest` endpoint"""
+
+    dependency_type = DependencyType.GO
+    osv_ecosystem = "Go"
+    manifest_files = ("go.mod",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Go modules from go.mod, applying replace directives"""
+        requires, replaces = read_go_mod(content)
+        dependencies = []
+        for module, version, indirect in requires:
+            replacement = replaces.get((module, version)) or replaces.get((module, None))
+            if replacement is not None:
+                module, version = replacement
+                if version is None:
+                    # Replaced by a local directory: nothing to look up in the module proxy
+                    continue
+            dependencies.append({
+                "name": module,
+                "version": version,
+                "constraint": version,
+                "type": DependencyType.GO,
+                "is_dev": False,
+                # `// indirect` requirements are only listed to pin versions of transitive modules
+                "transitive": indirect,
+            })
+        return dependencies
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        # The proxy answers 404/410 for unknown modules
+        url = f"{self.base_url}/{escape_module_path(package_name)}/@latest"
+        return await self._send(lambda: self.client.get(url, headers=headers))
+
+    def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        return {"latest_version": response.json().get("Version")}
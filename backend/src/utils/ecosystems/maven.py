@@ -0,0 +1,140 @@
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from src import config
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.versioning import base_version
+
+
+# Coordinates read from <dependency> elements
+_DEPENDENCY_FIELDS = {"groupId", "artifactId", "version", "scope"}
+_PROPERTY = re.compile(r"\$\{([^}]+)\}")
+
+
+@dataclass
+class Pom:
+    """The parts of a pom.xml needed to resolve its dependencies"""
+
+    properties: Dict[str, str] = field(default_factory=dict)
+    dependencies: List[Dict[str, str]] = field(default_factory=list)
+    managed: Dict[Tuple[Optional[str], Optional[str]], str] = field(default_factory=dict)
+
+    def interpolate(self, value: str, depth: int = 10) -> str:
+        """Expand ${property} references; unknown properties are left in place"""
+        while depth and "${" in value:
+            expanded = _PROPERTY.sub(lambda m: self.properties.get(m.group(1), m.group(0)), value)
+            if expanded == value:
+                break
+            value, depth = expanded, depth - 1
+        return value
+
+
+def read_pom(content: str) -> Pom:
+    """Single streaming pass over a pom with iterparse.
+
+    Only <properties>, project/parent coordinates and the <dependency> elements under
+    <dependencies> and <dependencyManagement> are kept; every other element is cleared as
+    soon as it ends, so multi-module poms with large <build> sections stay cheap.
+    """
+    pom = Pom()
+    path: List[str] = []
+    current: Optional[Dict[str, str]] = None
+    for event, element in ElementTree.iterparse(io.BytesIO(content.encode()), events=("start", "end")):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            path.append(tag)
+            if tag == "dependency" and path[-2:-1] == ["dependencies"] and len(path) in (3, 4):
+                current = {}
+            continue
+
+        text = (element.text or "").strip()
+        depth = len(path)
+        if depth == 3 and path[1] == "properties":
+            pom.properties[tag] = text
+        elif depth == 2 and tag in ("groupId", "artifactId", "version"):
+            pom.properties[f"project.{tag}"] = text
+        elif depth == 3 and path[1] == "parent" and tag in ("groupId", "artifactId", "version"):
+            pom.properties[f"project.parent.{tag}"] = text
+        elif current is not None and tag in _DEPENDENCY_FIELDS and path[-2] == "dependency":
+            current[tag] = text
+        elif current is not None and tag == "dependency":
+            if depth == 3 and path[1] == "dependencies":
+                pom.dependencies.append(current)
+            elif depth == 4 and path[1] == "dependencyManagement" and current.get("version"):
+                pom.managed[(current.get("groupId"), current.get("artifactId"))] = current["version"]
+            current = None
+        path.pop()
+        if depth <= 3:
+            element.clear()
+
+    # A child pom without its own groupId/version inherits the parent's
+    for tag in ("groupId", "version"):
+        pom.properties.setdefault(f"project.{tag}", pom.properties.get(f"project.parent.{tag}", ""))
+    for key in list(pom.properties):
+        if key.startswith("project."):
+            pom.properties.setdefault(f"pom.{key[len('project.'):]}", pom.properties[key])
+    return pom
+
+
+class MavenDriver(EcosystemDriver):
+    """Maven Central search API; one Solr query resolves a whole batch of artifacts.
+
+    Artifacts are OR-ed into `(g:"group" AND a:"artifact")` clauses, so a pom with fifty
+    dependencies costs a handful of requests rather than fifty.
+    """
+
+    dependency_type = DependencyType.MAVEN
+    osv_ecosystem = "Maven"
+    manifest_files = ("pom.xml",)
+    batch_size = config.MAVEN_BATCH_SIZE
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Maven dependencies from pom.xml"""
+        try:
+            pom = read_pom(content)
+        except ElementTree.ParseError:
+            return []
+
+        dependencies = []
+        for dependency in pom.dependencies:
+            is_dev = dependency.get("scope") == "test"
+            if is_dev and not include_dev:
+                continue
+            group_id = pom.interpolate(dependency.get("groupId", ""))
+            artifact_id = pom.interpolate(dependency.get("artifactId", ""))
+            if not group_id or not artifact_id:
+                continue
+            # Versions may be inherited from <dependencyManagement> in the same pom
+            version = dependency.get("version") or pom.managed.get((dependency.get("groupId"), dependency.get("artifactId")))
+            if not version:
+                continue
+            version = pom.interpolate(version)
+            dependencies.append({
+                "name": f"{group_id}:{artifact_id}",
+                "version": base_version(version) or version,
+                "constraint": version,
+                "type": DependencyType.MAVEN,
+                "is_dev": is_dev,
+            })
+        return dependencies
+
+    async def fetch_latest_batch(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        resolved: Dict[str, Optional[Dict[str, Any]]] = {name: None for name in package_names}
+        # Unresolved ${property} coordinates can't match anything
+        coordinates = [name.split(":", 1) for name in package_names if name.count(":") == 1 and "$" not in name]
+        if not coordinates:
+            return resolved
+
+        query = " OR ".join(f'(g:"{group}" AND a:"{artifact}")' for group, artifact in coordinates)
+        params = {"q": query, "rows": len(coordinates), "wt": "json"}
+        response = await self._send(lambda: self.client.get(f"{self.base_url}/solrsearch/select", params=params))
+        response.raise_for_status()
+        for doc in response.json().get("response", {}).get("docs", []):
+            name = f"{doc.get('g')}:{doc.get('a')}"
+            if name in resolved and doc.get("latestVersion"):
+                resolved[name] = {"latest_version": doc["latestVersion"]}
+        return resolved
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, List
+from urllib.parse import quote
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.json_stream import scan_json_keys
+
+# Abbreviated packument: dist-tags and per-version install metadata only
+NPM_ABBREVIATED_ACCEPT = "application/vnd.npm.install-v1+json; q=1.0, application/json; q=0.8"
+
+
+class NpmDriver(EcosystemDriver):
+    """registry.npmjs.org, reading `/{name}/latest` instead of the full packument.
+
+    Scoped packages the registry won't serve that way fall back to the abbreviated
+    install document, streamed only until `dist-tags` has been read.
+    """
+
+    dependency_type = DependencyType.NPM
+    osv_ecosystem = "npm"
+    manifest_files = ("package.json",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Node.js package.json dependencies"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return []
+
+        dependencies = [self._dependency(name, version) for name, version in data.get("dependencies", {}).items()]
+        if include_dev:
+            dependencies.extend(
+                self._dependency(name, version, is_dev=True) for name, version in data.get("devDependencies", {}).items()
+            )
+        return dependencies
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        package_path = quote(package_name, safe="@")
+        response = await self._send(lambda: self.client.get(f"{self.base_url}/{package_path}/latest", headers=headers))
+        if response.status_code != 404 or not package_name.startswith("@"):
+            return response
+        request = self.client.build_request(
+            "GET", f"{self.base_url}/{package_path}", headers={**headers, "Accept": NPM_ABBREVIATED_ACCEPT}
+        )
+        return await self._send(lambda: self.client.send(request, stream=True))
+
+    async def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        if response.url.path.endswith("/latest"):
+            data = response.json()
+            return {
+                "latest_version": data.get("version"),
+                "description": data.get("description", ""),
+                "homepage": data.get("homepage", ""),
+            }
+        fields = await scan_json_keys(response.aiter_bytes(), ["dist-tags"])
+        return {"latest_version": fields.get("dist-tags", {}).get("latest")}
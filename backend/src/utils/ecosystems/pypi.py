@@ -0,0 +1,52 @@
+import re
+from typing import Any, Dict, List
+
+import httpx
+
+from src.schemas import DependencyType
+from src.utils.ecosystems.base import EcosystemDriver
+from src.utils.versioning import base_version
+
+
+class PyPIDriver(EcosystemDriver):
+    """pypi.org JSON API"""
+
+    dependency_type = DependencyType.PIP
+    osv_ecosystem = "PyPI"
+    manifest_files = ("requirements.txt",)
+
+    def parse(self, filename: str, content: str, include_dev: bool = True) -> List[Dict[str, Any]]:
+        """Analyze Python requirements.txt dependencies"""
+        dependencies = []
+        for line in content.strip().split('\n'):
+            line = line.strip()
+            # Options (-r, -e, --hash) are not requirements
+            if not line or line.startswith(('#', '-')):
+                continue
+
+            # name[extras] specifier ; markers  # comment
+            match = re.match(r'^([a-zA-Z0-9][a-zA-Z0-9\-_\.]*)\s*(?:\[[^\]]*\])?\s*([^;#]*)', line)
+            if match:
+                name, specifier = match.groups()
+                specifier = specifier.strip()
+                operator = re.match(r'^[>=<!~]*', specifier).group(0)
+                dependencies.append({
+                    "name": name,
+                    "version": base_version(specifier) or "latest",
+                    "constraint": specifier,
+                    "type": DependencyType.PIP,
+                    "is_dev": False,
+                    "operator": operator or "=="
+                })
+        return dependencies
+
+    async def fetch_latest(self, package_name: str, headers: Dict[str, str]) -> httpx.Response:
+        return await self._send(lambda: self.client.get(f"{self.base_url}/pypi/{package_name}/json", headers=headers))
+
+    def extract_latest(self, response: httpx.Response) -> Dict[str, Any]:
+        info = response.json().get("info", {})
+        return {
+            "latest_version": info.get("version"),
+            "description": info.get("summary", ""),
+            "homepage": info.get("home_page", ""),
+        }
@@ -1,56 +1,416 @@
+import asyncio
 import base64
-from typing import Optional, List, Dict, Any
+import hashlib
+import json
+import logging
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union
 
 import httpx
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 
+from src import config
+from src.utils import metrics
+from src.utils.github_token import GitHubTokenPool, is_rate_limited, token_scope
+from src.utils.http_client import HTTPClientPool
+from src.utils.shared_cache import SharedCache
+from src.utils.singleflight import SingleFlight
+from src.utils.scheduler import WindowBatcher
+from src.utils.tar_stream import TarFormatError, extract_tarball
+
+logger = logging.getLogger(__name__)
+
+# Repository fields requested over GraphQL, mapped back to the REST shape by _rest_repo_info
+_REPOSITORY_FIELDS = """
+    databaseId name nameWithOwner description url sshUrl isPrivate isFork
+    stargazerCount forkCount createdAt updatedAt pushedAt
+    watchers { totalCount }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    owner { login avatarUrl url }
+    defaultBranchRef { name }
+    repositoryTopics(first: 100) { nodes { topic { name } } }
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+"""
+
+# (owner, repo, blob SHAs whose text to include)
+SnapshotRequest = Tuple[str, str, Sequence[str]]
+
+
+@dataclass
+class RepoSnapshot:
+    """Repository metadata, languages and manifest texts fetched by one GraphQL query"""
+
+    repo_info: Dict[str, Any]
+    languages: Dict[str, int]
+    # Blob SHA -> text; blobs GraphQL truncated are left out for the caller to fetch over REST
+    blobs: Dict[str, str] = field(default_factory=dict)
+
+
+class GitHubETagCache:
+    """Last seen body and ETag of GitHub documents, for conditional revalidation.
+
+    GitHub does not count 304 Not Modified answers against the rate limit, so
+    refetching an unchanged repository costs nothing but a round trip. With a shared
+    cache enabled, documents one worker has seen are revalidated by the others too.
+    """
+
+    def __init__(self, max_entries: int = config.GITHUB_ETAG_CACHE_ENTRIES, shared: Optional[SharedCache] = None):
+        self.max_entries = max_entries
+        self.shared = shared or SharedCache()
+        self._entries: "OrderedDict[Tuple, Tuple[str, bytes]]" = OrderedDict()
+
+    async def get(self, key: Tuple) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        stored = await self.shared.get("github-etag", json.dumps(key))
+        if stored is None:
+            return None
+        entry = (stored["etag"], base64.b64decode(stored["content"]))
+        self._remember(key, entry)
+        return entry
+
+    async def put(self, key: Tuple, etag: str, content: bytes) -> None:
+        self._remember(key, (etag, content))
+        await self.shared.put(
+            "github-etag",
+            json.dumps(key),
+            {"etag": etag, "content": base64.b64encode(content).decode()},
+            config.GITHUB_SHARED_ETAG_TTL,
+        )
+
+    def _remember(self, key: Tuple, entry: Tuple[str, bytes]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
 
 
 class GitHubService:
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        http_pool: Optional[HTTPClientPool] = None,
+        singleflight: Optional[SingleFlight] = None,
+        etag_cache: Optional[GitHubETagCache] = None,
+        token_pool: Optional[GitHubTokenPool] = None,
+    ):
         self.token = token
-        self.base_url = "https://api.github.com"
+        # The server's tokens are only used for requests that bring none of their own
+        self.token_pool = token_pool if not token and token_pool else None
+        self.base_url = config.GITHUB_API_URL
+        self.http_pool = http_pool or HTTPClientPool()
+        self.client = self.http_pool.client(self.base_url)
+        self.singleflight = singleflight or SingleFlight()
+        self.etag_cache = etag_cache or GitHubETagCache()
+        # Pool tokens are interchangeable server credentials and share one cache scope
+        self.token_scope = "pool" if self.token_pool else token_scope(token)
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "DependencySecurityAnalyzer/1.0",
         }
-        if token:
-            self.headers["Authorization"] = f"token {token}"
+        self.authenticated = bool(token or self.token_pool)
+        self.graphql_enabled = self.authenticated and config.GITHUB_GRAPHQL_ENABLED
+        # Snapshot requests arriving close together share one GraphQL query
+        self._snapshots: WindowBatcher[SnapshotRequest, RepoSnapshot] = WindowBatcher(
+            self._fetch_snapshots, config.GITHUB_GRAPHQL_BATCH_SIZE, config.GITHUB_GRAPHQL_BATCH_WINDOW
+        )
+
+    async def get_repo_overview(self, owner: str, repo: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Repository metadata and languages: one GraphQL query with a token, two REST calls without"""
+        if self.graphql_enabled:
+            snapshot = await self.get_repo_snapshot(owner, repo)
+            return snapshot.repo_info, snapshot.languages
+        repo_info, languages = await asyncio.gather(
+            self.get_repo_info(owner, repo),
+            self.get_repo_languages(owner, repo),
+        )
+        return repo_info, languages
+
+    async def get_repo_snapshot(self, owner: str, repo: str, blob_shas: Sequence[str] = ()) -> RepoSnapshot:
+        """Metadata, languages, topics, default branch and the given blobs' text in one GraphQL query.
+
+        Requires a token. Snapshot requests made concurrently on this service are batched
+        into a single query of up to GITHUB_GRAPHQL_BATCH_SIZE repositories.
+        """
+        return await self._snapshots.get((owner, repo, list(dict.fromkeys(blob_shas))))
 
     async def get_repo_info(self, owner: str, repo: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/repos/{owner}/{repo}", headers=self.headers)
+        key = ("github-repo", self.token_scope, owner.lower(), repo.lower())
+        return await self.singleflight.do(key, lambda: self._fetch_repo_info(owner, repo))
+
+    async def _fetch_repo_info(self, owner: str, repo: str) -> Dict[str, Any]:
+        response = await self._conditional_get(f"{self.base_url}/repos/{owner}/{repo}")
+        if response.status_code == 404:
+            raise HTTPException(404, "Repository not found")
+        elif response.status_code == 403:
+            raise HTTPException(403, "Access denied. Repository may be private or rate limit exceeded")
+        response.raise_for_status()
+        return response.json()
+
+    async def list_owner_repos(self, owner: str, max_repos: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List an organization's repositories, falling back to a user's"""
+        try:
+            return await self._paginate(f"{self.base_url}/orgs/{owner}/repos", {"type": "all"}, max_repos)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+        return await self._paginate(f"{self.base_url}/users/{owner}/repos", {"type": "owner"}, max_repos)
+
+    async def _paginate(self, url: str, params: Dict[str, Any], max_items: Optional[int] = None) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        next_url: Optional[str] = url
+        next_params: Optional[Dict[str, Any]] = {**params, "per_page": 100}
+        while next_url and (max_items is None or len(items) < max_items):
+            response = await self._request("GET", next_url, params=next_params)
             if response.status_code == 404:
-                raise HTTPException(404, "Repository not found")
+                raise HTTPException(404, "Owner not found")
             elif response.status_code == 403:
-                raise HTTPException(403, "Access denied. Repository may be private or rate limit exceeded")
+                raise HTTPException(403, "Access denied or rate limit exceeded")
             response.raise_for_status()
-            return response.json()
+            items.extend(response.json())
+            # The Link header's next URL already carries the query string
+            next_url, next_params = response.links.get("next", {}).get("url"), None
+        return items[:max_items] if max_items is not None else items
 
     async def get_repo_languages(self, owner: str, repo: str) -> Dict[str, int]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/repos/{owner}/{repo}/languages", headers=self.headers)
-            return response.json() if response.status_code == 200 else {}
-
-    async def get_file_content(self, owner: str, repo: str, path: str, branch: str = "main") -> Optional[str]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/contents/{path}", headers=self.headers, params={"ref": branch}
-            )
-            if response.status_code == 404 and branch == "main":
-                return await self.get_file_content(owner, repo, path, "master")
-            response.raise_for_status()
-            data = response.json()
-            if data.get("encoding") == "base64":
-                return base64.b64decode(data["content"]).decode("utf-8")
-            return data.get("content")
+        response = await self._conditional_get(f"{self.base_url}/repos/{owner}/{repo}/languages")
+        return response.json() if response.status_code == 200 else {}
+
+    async def get_file_content(self, owner: str, repo: str, path: str, branch: Optional[str] = None) -> Optional[str]:
+        file = await self.get_file(owner, repo, path, branch)
+        return file["content"] if file else None
+
+    async def get_file(self, owner: str, repo: str, path: str, branch: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fetch a file's decoded content together with its git blob SHA (default branch if none given)"""
+        params = {"ref": branch} if branch else {}
+        response = await self._request("GET", f"{self.base_url}/repos/{owner}/{repo}/contents/{path}", params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        content = data.get("content")
+        if data.get("encoding") == "base64":
+            content = base64.b64decode(data["content"]).decode("utf-8")
+        return {"path": path, "sha": data.get("sha"), "content": content}
+
+    async def get_tree(self, owner: str, repo: str, ref: str, recursive: bool = True) -> Dict[str, Any]:
+        """List the paths under ref (a branch, tag, commit or tree SHA) with one Git Trees call.
+
+        Recursive listings past GitHub's size limit come back partial with `truncated` set.
+        """
+        response = await self._conditional_get(
+            f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}", params={"recursive": "1"} if recursive else None
+        )
+        if response.status_code == 404:
+            raise HTTPException(404, f"Repository or branch '{ref}' not found")
+        # An empty repository has no commit to list
+        if response.status_code == 409:
+            return {"sha": None, "tree": [], "truncated": False}
+        response.raise_for_status()
+        return response.json()
+
+    async def get_blob(self, owner: str, repo: str, sha: str) -> Optional[str]:
+        """Fetch and decode a blob by its SHA"""
+        response = await self._request("GET", f"{self.base_url}/repos/{owner}/{repo}/git/blobs/{sha}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        if data.get("encoding") == "base64":
+            return base64.b64decode(data["content"]).decode("utf-8")
+        return data.get("content")
+
+    async def get_archive_files(self, owner: str, repo: str, ref: str, blobs: Dict[str, str]) -> Dict[str, str]:
+        """Texts of the given files (path -> blob SHA) read from one tarball of ref, keyed by SHA.
+
+        The archive is decompressed and scanned as it streams in, keeping only the wanted
+        members in memory; nothing touches disk. Files whose content no longer matches
+        their SHA (the ref moved since it was listed), or that lie beyond
+        GITHUB_ARCHIVE_MAX_BYTES, are left out for the caller to fetch as blobs.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/tarball/{ref}"
+        try:
+            # GitHub answers with a redirect to a short-lived codeload.github.com URL
+            response = await self._request("GET", url, stream=True, follow_redirects=True)
+            try:
+                if response.status_code != 200:
+                    return {}
+                # Members sit under a single "<owner>-<repo>-<sha>/" directory
+                files = await extract_tarball(
+                    response.aiter_bytes(), blobs.__contains__, strip_components=1,
+                    max_bytes=config.GITHUB_ARCHIVE_MAX_BYTES,
+                )
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, TarFormatError, zlib.error) as e:
+            logger.warning(f"Archive download for {owner}/{repo}@{ref} failed, fetching blobs instead: {e}")
+            return {}
+
+        texts: Dict[str, str] = {}
+        for path, content in files.items():
+            sha = _git_blob_sha(content)
+            if sha == blobs[path]:
+                texts[sha] = content.decode("utf-8", "replace")
+        return texts
 
     async def get_vulnerability_alerts(self, owner: str, repo: str) -> List[Dict[str, Any]]:
-        if not self.token:
+        if not self.authenticated:
             return []
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/repos/{owner}/{repo}/vulnerability-alerts", headers=self.headers)
-            if response.status_code in [403, 404]:
-                return []
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"{self.base_url}/repos/{owner}/{repo}/vulnerability-alerts")
+        if response.status_code in [403, 404]:
+            return []
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_snapshots(self, requests: List[SnapshotRequest]) -> List[Union[RepoSnapshot, Exception]]:
+        query, variables = _snapshot_query(requests)
+        response = await self._request(
+            "POST", config.GITHUB_GRAPHQL_URL, resource="graphql", json={"query": query, "variables": variables}
+        )
+        if response.status_code in [401, 403]:
+            raise HTTPException(403, "Access denied. Token may be invalid or rate limit exceeded")
+        response.raise_for_status()
+        payload = response.json()
+        data = payload.get("data") or {}
+        errors = {error["path"][0]: error for error in payload.get("errors", []) if error.get("path")}
+        if not data and payload.get("errors"):
+            # Query-level failures (rate limiting, malformed query) carry no path
+            raise HTTPException(403, f"GitHub GraphQL error: {payload['errors'][0].get('message')}")
+
+        results: List[Union[RepoSnapshot, Exception]] = []
+        for i, (_, _, shas) in enumerate(requests):
+            node = data.get(f"repo{i}")
+            if node is None:
+                error = errors.get(f"repo{i}", {})
+                if error.get("type") == "FORBIDDEN":
+                    results.append(HTTPException(403, "Access denied. Repository may be private or rate limit exceeded"))
+                elif error.get("type") in (None, "NOT_FOUND"):
+                    results.append(HTTPException(404, "Repository not found"))
+                else:
+                    results.append(HTTPException(502, f"GitHub GraphQL error: {error.get('message')}"))
+                continue
+            blobs: Dict[str, str] = {}
+            for j, sha in enumerate(shas):
+                blob = node.get(f"blob{j}") or {}
+                if blob.get("isBinary"):
+                    blobs[sha] = ""
+                elif blob.get("text") is not None and not blob.get("isTruncated"):
+                    blobs[sha] = blob["text"]
+            languages = {edge["node"]["name"]: edge["size"] for edge in (node.get("languages") or {}).get("edges", [])}
+            results.append(RepoSnapshot(_rest_repo_info(node), languages, blobs))
+        return results
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        resource: str = "core",
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        follow_redirects: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request with the caller's token or, failing that, the pool token with most budget.
+
+        Rate-limited responses on pool tokens are retried on another token, or after the
+        reset once the whole pool is exhausted. Streamed responses must be closed by the caller.
+        """
+        client = self.http_pool.client(url)
+        attempts = len(self.token_pool.tokens) + 1 if self.token_pool else 1
+        for attempt in range(attempts):
+            token = self.token or (await self.token_pool.acquire(resource) if self.token_pool else None)
+            request_headers = {**self.headers, **(headers or {})}
+            if token:
+                request_headers["Authorization"] = f"token {token}"
+            request = client.build_request(method, url, headers=request_headers, **kwargs)
+            response = await client.send(request, stream=stream, follow_redirects=follow_redirects)
+            if self.token_pool:
+                self.token_pool.update(token, response, resource)
+                if is_rate_limited(response) and attempt + 1 < attempts:
+                    await response.aclose()
+                    continue
+            return response
+        return response
+
+    async def _conditional_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """GET a document, revalidating a previously seen copy with If-None-Match.
+
+        A 304 is answered with the cached body as a 200, so callers never see the difference.
+        """
+        key = (self.token_scope, url, tuple(sorted((params or {}).items())))
+        cached = await self.etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = await self._request("GET", url, headers=headers, params=params)
+        if cached is None:
+            metrics.cache_lookup("github", "miss")
+        elif response.status_code == 304:
+            metrics.cache_lookup("github", "not_modified")
+        else:
+            metrics.cache_lookup("github", "changed")
+        if response.status_code == 304 and cached:
+            headers = {k: v for k, v in response.headers.items() if not k.lower().startswith("content-")}
+            return httpx.Response(200, headers=headers, content=cached[1], request=response.request)
+        if response.status_code == 200 and response.headers.get("ETag"):
+            await self.etag_cache.put(key, response.headers["ETag"], response.content)
+        return response
+
+
+def _git_blob_sha(content: bytes) -> str:
+    """The SHA git (and so the trees API) gives a blob with this content"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def _snapshot_query(requests: List[SnapshotRequest]) -> Tuple[str, Dict[str, Any]]:
+    """One aliased `repository` selection per request, with every value passed as a variable"""
+    declarations: List[str] = []
+    selections: List[str] = []
+    variables: Dict[str, Any] = {}
+    for i, (owner, repo, shas) in enumerate(requests):
+        declarations += [f"$owner{i}: String!", f"$name{i}: String!"]
+        variables.update({f"owner{i}": owner, f"name{i}": repo})
+        blobs = []
+        for j, sha in enumerate(shas):
+            declarations.append(f"$oid{i}_{j}: GitObjectID!")
+            variables[f"oid{i}_{j}"] = sha
+            blobs.append(f"blob{j}: object(oid: $oid{i}_{j}) {{ ... on Blob {{ text isTruncated isBinary }} }}")
+        selections.append(
+            f"repo{i}: repository(owner: $owner{i}, name: $name{i}) {{ {_REPOSITORY_FIELDS} {' '.join(blobs)} }}"
+        )
+    return f"query({', '.join(declarations)}) {{ {' '.join(selections)} }}", variables
+
+
+def _rest_repo_info(node: Dict[str, Any]) -> Dict[str, Any]:
+    """The subset of the REST repository document that the rest of the app reads"""
+    owner = node.get("owner") or {}
+    return {
+        "id": node.get("databaseId"),
+        "name": node.get("name"),
+        "full_name": node.get("nameWithOwner"),
+        "description": node.get("description"),
+        "private": node.get("isPrivate", False),
+        "fork": node.get("isFork", False),
+        "html_url": node.get("url"),
+        "ssh_url": node.get("sshUrl"),
+        "owner": {"login": owner.get("login"), "avatar_url": owner.get("avatarUrl"), "html_url": owner.get("url")},
+        "stargazers_count": node.get("stargazerCount", 0),
+        "watchers_count": (node.get("watchers") or {}).get("totalCount", 0),
+        "forks_count": node.get("forkCount", 0),
+        # REST counts open pull requests as issues
+        "open_issues_count": (node.get("issues") or {}).get("totalCount", 0)
+        + (node.get("pullRequests") or {}).get("totalCount", 0),
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "pushed_at": node.get("pushedAt"),
+        "default_branch": (node.get("defaultBranchRef") or {}).get("name"),
+        "topics": [n["topic"]["name"] for n in (node.get("repositoryTopics") or {}).get("nodes", [])],
+    }
+
+
+def get_github_etag_cache(request: Request) -> GitHubETagCache:
+    """Return the app-lifetime GitHub revalidation cache created in the lifespan hook"""
+    return request.app.state.github_etag_cache
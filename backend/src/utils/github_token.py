@@ -1,15 +1,159 @@
-from typing import Optional
-from fastapi import Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
+import hashlib
+import logging
 import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from src import config
 
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
 
+# Budget assumed for a token GitHub has not reported on yet (authenticated REST limit)
+_DEFAULT_LIMIT = 5000
+
 
 def get_github_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[str]:
-    """Extract GitHub token from Authorization header"""
+    """Extract the caller's GitHub token from the Authorization header.
+
+    Without one, requests are made with the server's token pool (GITHUB_TOKENS / GITHUB_TOKEN).
+    """
     if credentials:
         return credentials.credentials
-    return os.getenv("GITHUB_TOKEN")
\ No newline at end of file
+    return None
+
+
+def token_scope(token: Optional[str]) -> str:
+    """Identifies a credential without keeping the token itself in cache keys"""
+    return hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous"
+
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    """Whether a 403/429 is GitHub's primary or secondary rate limit rather than a permission error"""
+    if response.status_code not in (403, 429):
+        return False
+    return response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers
+
+
+@dataclass
+class RateLimitState:
+    """Last reported budget of one token for one GitHub rate-limit resource (core, graphql, ...)"""
+
+    limit: int = _DEFAULT_LIMIT
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+    # Secondary rate limits (Retry-After) block a token regardless of its remaining budget
+    blocked_until: float = 0.0
+
+    def available(self, now: float) -> int:
+        if self.blocked_until > now:
+            return 0
+        if self.remaining is None or self.reset_at <= now:
+            return self.limit
+        return self.remaining
+
+    def available_at(self, now: float) -> float:
+        """When this token can be used again"""
+        if self.blocked_until > now:
+            return self.blocked_until
+        return self.reset_at if self.available(now) <= 0 else now
+
+
+class GitHubTokenPool:
+    """Server-side GitHub tokens, used whenever a request brings no token of its own.
+
+    Every response reports the token's remaining budget (`X-RateLimit-*`); each request
+    goes to the token with the most budget left for its resource, so sustained throughput
+    is the combined limit of all tokens. When every token is exhausted, callers wait for
+    the earliest reset (up to GITHUB_RATE_LIMIT_MAX_WAIT) instead of failing.
+    """
+
+    def __init__(self, tokens: List[str], max_wait: float = config.GITHUB_RATE_LIMIT_MAX_WAIT):
+        self.tokens = list(dict.fromkeys(token for token in tokens if token))
+        self.max_wait = max_wait
+        self._states: Dict[str, Dict[str, RateLimitState]] = {token: {} for token in self.tokens}
+        self.waiting = 0
+
+    @classmethod
+    def from_env(cls) -> "GitHubTokenPool":
+        tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",")]
+        return cls(tokens + [os.getenv("GITHUB_TOKEN", "")])
+
+    def __bool__(self) -> bool:
+        return bool(self.tokens)
+
+    async def acquire(self, resource: str = "core") -> str:
+        """Reserve one request on the token with the most remaining budget, waiting for a reset if needed"""
+        while True:
+            now = time.time()
+            states = {token: self._state(token, resource) for token in self.tokens}
+            token = max(states, key=lambda t: states[t].available(now))
+            state = states[token]
+            if state.available(now) > 0:
+                # Reserve the request now so concurrent callers spread across tokens
+                state.remaining = state.available(now) - 1
+                if state.reset_at <= now:
+                    state.reset_at = now + 3600
+                return token
+
+            wait = min(s.available_at(now) for s in states.values()) - now
+            if wait > self.max_wait:
+                raise HTTPException(403, f"GitHub rate limit exhausted for all tokens; resets in {int(wait)}s")
+            if not self.waiting:
+                logger.warning(f"GitHub {resource} budget exhausted on all {len(self.tokens)} tokens; waiting {wait:.0f}s for reset")
+            self.waiting += 1
+            try:
+                await asyncio.sleep(max(wait, 0.0) + 1.0)
+            finally:
+                self.waiting -= 1
+
+    def update(self, token: str, response: httpx.Response, resource: str = "core") -> None:
+        """Record the budget GitHub reported for a token"""
+        if token not in self._states:
+            return
+        headers = response.headers
+        state = self._state(token, headers.get("x-ratelimit-resource", resource))
+        try:
+            if "x-ratelimit-remaining" in headers:
+                state.remaining = int(headers["x-ratelimit-remaining"])
+                state.limit = int(headers.get("x-ratelimit-limit", state.limit))
+                state.reset_at = float(headers.get("x-ratelimit-reset", state.reset_at))
+            if response.status_code in (403, 429) and "retry-after" in headers:
+                state.blocked_until = time.time() + float(headers["retry-after"])
+        except ValueError:
+            logger.debug(f"Ignoring malformed rate-limit headers: {dict(headers)}")
+
+    def budget(self) -> Dict[str, Any]:
+        """Current budget per token and resource, plus totals across the pool"""
+        now = time.time()
+        tokens: List[Dict[str, Any]] = []
+        totals: Dict[str, Dict[str, int]] = {}
+        for token in self.tokens:
+            resources = {}
+            for resource, state in self._states[token].items():
+                resources[resource] = {
+                    "limit": state.limit,
+                    "remaining": state.available(now),
+                    "reset_at": int(state.reset_at) if state.reset_at > now else None,
+                    "blocked_until": int(state.blocked_until) if state.blocked_until > now else None,
+                }
+                total = totals.setdefault(resource, {"limit": 0, "remaining": 0})
+                total["limit"] += state.limit
+                total["remaining"] += state.available(now)
+            tokens.append({"token": token_scope(token), "resources": resources})
+        return {"tokens": len(self.tokens), "waiting_requests": self.waiting, "totals": totals, "by_token": tokens}
+
+    def _state(self, token: str, resource: str) -> RateLimitState:
+        return self._states[token].setdefault(resource, RateLimitState())
+
+
+def get_token_pool(request: Request) -> GitHubTokenPool:
+    """Return the app-lifetime GitHub token pool created in the lifespan hook"""
+    return request.app.state.github_tokens
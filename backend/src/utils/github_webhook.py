@@ -0,0 +1,59 @@
+import hashlib
+import hmac
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+from src.utils.analysis import is_manifest_path
+
+# GitHub lists at most this many commits in a push payload; longer pushes are truncated
+_MAX_PAYLOAD_COMMITS = 2048
+_BRANCH_PREFIX = "refs/heads/"
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an X-Hub-Signature-256 header (HMAC-SHA256 of the raw body) in constant time"""
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len("sha256="):])
+
+
+@dataclass
+class PushEvent:
+    repo_url: str
+    owner: str
+    repo: str
+    branch: str
+    # Supported manifests and lockfiles the push added, modified or removed; None when the
+    # payload cannot tell (force pushes, truncated commit lists)
+    manifest_paths: Optional[Set[str]]
+
+
+def parse_push(payload: Dict[str, Any]) -> Optional[PushEvent]:
+    """The branch update described by a push payload; None for tags and deleted branches"""
+    ref = payload.get("ref") or ""
+    if not ref.startswith(_BRANCH_PREFIX) or payload.get("deleted"):
+        return None
+    repository = payload.get("repository") or {}
+    owner = repository.get("owner") or {}
+    login, name = owner.get("login") or owner.get("name"), repository.get("name")
+    if not login or not name:
+        return None
+
+    commits = payload.get("commits") or []
+    # Payloads that report their commit count expose truncation directly
+    pushed = max(payload.get("size") or 0, payload.get("distinct_size") or 0)
+    paths: Optional[Set[str]] = set()
+    if payload.get("forced") or len(commits) >= _MAX_PAYLOAD_COMMITS or pushed > len(commits):
+        paths = None
+    else:
+        for commit in commits:
+            for key in ("added", "modified", "removed"):
+                paths.update(path for path in commit.get(key) or [] if is_manifest_path(path))
+    return PushEvent(
+        repo_url=repository.get("html_url") or f"https://github.com/{login}/{name}",
+        owner=login,
+        repo=name,
+        branch=ref[len(_BRANCH_PREFIX):],
+        manifest_paths=paths,
+    )
@@ -0,0 +1,73 @@
+import importlib.util
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import Request
+
+from src import config
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# h2 is optional; without it the pool falls back to HTTP/1.1 keep-alive.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """One long-lived, connection-pooled AsyncClient per upstream host"""
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.limits = limits or httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.timeout = timeout or httpx.Timeout(
+            config.HTTP_READ_TIMEOUT,
+            connect=config.HTTP_CONNECT_TIMEOUT,
+            pool=config.HTTP_POOL_TIMEOUT,
+        )
+        if http2 is None:
+            http2 = config.HTTP2_ENABLED
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._closed = False
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        """Return the shared client for the host serving base_url"""
+        if self._closed:
+            raise RuntimeError("HTTPClientPool is closed")
+        parts = urlsplit(base_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=origin,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                event_hooks=metrics.http_event_hooks(),
+            )
+            self._clients[origin] = client
+        return client
+
+    async def aclose(self) -> None:
+        self._closed = True
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+def get_http_pool(request: Request) -> HTTPClientPool:
+    """Return the app-lifetime HTTP client pool created in the lifespan hook"""
+    return request.app.state.http_pool
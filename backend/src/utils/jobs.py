@@ -0,0 +1,349 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Collection, Dict, List, Optional, Tuple, Union
+
+from fastapi import Request
+from sqlalchemy import select, update
+
+from src import config
+from src.database import AsyncSessionLocal
+from src.models import AnalysisJob
+from src.schemas import (
+    AnalysisJobResponse,
+    AnalysisJobStatus,
+    BulkAnalysisRequest,
+    BulkAnalysisResponse,
+    RepositoryAnalysisRequest,
+    RepositoryAnalysisResponse,
+)
+from src.utils.analysis import AnalysisPipeline, build_analysis_pipeline
+from src.utils.url_parser import parse_github_url
+
+logger = logging.getLogger(__name__)
+
+# Shared-cache lease namespace claiming a job for one worker process
+_JOB_LEASE = "analysis-job"
+
+
+class JobQueue:
+    """SQLite-backed analysis job queue drained by a fixed pool of asyncio workers.
+
+    Jobs are durable in the `analysis_jobs` table; the in-process asyncio.Queue only carries
+    IDs. Unfinished jobs are re-queued on startup. GitHub tokens are held in memory only, so
+    a job resumed after a restart runs with the server's own token.
+
+    With several worker processes, a worker claims a job with a shared-cache lease before
+    running it and keeps the lease (and the job's progress in the table) fresh while it
+    runs, so a restarting worker only resumes jobs whose worker is gone.
+
+    Push jobs (from the GitHub webhook) wait WEBHOOK_COALESCE_WINDOW before running; pushes
+    to the same branch arriving meanwhile are merged into the queued job.
+    """
+
+    def __init__(self, state: Any, workers: int = config.ANALYSIS_JOB_WORKERS):
+        self.state = state
+        self.workers = workers
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._tokens: Dict[str, Optional[str]] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._push_lock = asyncio.Lock()
+        # One refresh at a time per (repository, branch)
+        self._branch_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    async def start(self) -> None:
+        for job_id in await self._requeue_unfinished():
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: RepositoryAnalysisRequest, github_token: Optional[str] = None) -> AnalysisJobResponse:
+        if not parse_github_url(request.repo_url):
+            raise ValueError("Invalid GitHub repository URL")
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            status=AnalysisJobStatus.QUEUED.value,
+            repo_url=request.repo_url,
+            include_dev_dependencies=request.include_dev_dependencies,
+            check_vulnerabilities=request.check_vulnerabilities,
+            created_at=datetime.utcnow(),
+        )
+        await self._insert(job)
+        self._tokens[job.id] = github_token
+        self._queue.put_nowait(job.id)
+        return self._to_response(job)
+
+    async def submit_bulk(self, request: BulkAnalysisRequest, github_token: Optional[str] = None) -> AnalysisJobResponse:
+        if not request.repo_urls and not request.owner:
+            raise ValueError("Provide repo_urls and/or an owner to scan")
+        invalid = [url for url in request.repo_urls if not parse_github_url(url)]
+        if invalid:
+            raise ValueError(f"Invalid GitHub repository URL: {invalid[0]}")
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            kind="bulk",
+            status=AnalysisJobStatus.QUEUED.value,
+            repo_url=request.owner or f"{len(request.repo_urls)} repositories",
+            payload=request.model_dump_json(),
+            include_dev_dependencies=request.include_dev_dependencies,
+            check_vulnerabilities=request.check_vulnerabilities,
+            created_at=datetime.utcnow(),
+        )
+        await self._insert(job)
+        self._tokens[job.id] = github_token
+        self._queue.put_nowait(job.id)
+        return self._to_response(job)
+
+    async def submit_push(self, repo_url: str, branch: str, paths: Optional[Collection[str]]) -> AnalysisJobResponse:
+        """Queue a refresh of the manifests a push changed (None: all of them), coalescing bursts"""
+        async with self._push_lock:
+            merged = await self._merge_push(repo_url, branch, paths)
+            if merged is not None:
+                return self._to_response(merged)
+            job = AnalysisJob(
+                id=uuid.uuid4().hex,
+                kind="push",
+                status=AnalysisJobStatus.QUEUED.value,
+                repo_url=repo_url,
+                payload=json.dumps({"branch": branch, "paths": sorted(paths) if paths is not None else None}),
+                created_at=datetime.utcnow(),
+            )
+            await self._insert(job)
+        asyncio.get_running_loop().call_later(config.WEBHOOK_COALESCE_WINDOW, self._queue.put_nowait, job.id)
+        return self._to_response(job)
+
+    async def get(self, job_id: str) -> Optional[AnalysisJobResponse]:
+        job = await self._load(job_id)
+        return self._to_response(job) if job else None
+
+    async def get_result(self, job_id: str) -> Optional[Union[RepositoryAnalysisResponse, BulkAnalysisResponse]]:
+        job = await self._load(job_id)
+        if job is None or not job.result:
+            return None
+        if job.kind == "bulk":
+            return BulkAnalysisResponse.model_validate_json(job.result)
+        return RepositoryAnalysisResponse.model_validate_json(job.result)
+
+    # ---------------------------
+    # Worker
+    # ---------------------------
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed in worker {index}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        shared = self.state.shared_cache
+        if not await shared.acquire(_JOB_LEASE, [job_id]):
+            return  # Another worker process is running it
+        heartbeat = asyncio.create_task(self._heartbeat(job_id)) if shared.enabled else None
+        try:
+            await self._execute(job_id)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            await shared.release(_JOB_LEASE, [job_id])
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew the job's lease and publish its progress for other workers' status polls"""
+        shared = self.state.shared_cache
+        published = None
+        while True:
+            await asyncio.sleep(min(shared.lease_ttl / 3, 1.0))
+            try:
+                await shared.renew(_JOB_LEASE, [job_id])
+                progress = self._progress.get(job_id)
+                if progress is not None and progress != published:
+                    await self._update(job_id, progress=json.dumps(progress))
+                    published = dict(progress)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+    async def _execute(self, job_id: str) -> None:
+        job = await self._load(job_id)
+        if job is None or job.status not in (AnalysisJobStatus.QUEUED.value, AnalysisJobStatus.RUNNING.value):
+            return
+        await self._update(job_id, status=AnalysisJobStatus.RUNNING.value, started_at=datetime.utcnow())
+
+        def on_progress(progress: Dict[str, Any]) -> None:
+            self._progress[job_id] = progress
+
+        try:
+            pipeline = build_analysis_pipeline(self.state, self._tokens.get(job_id), on_progress)
+            if job.kind == "bulk":
+                response = await self._run_bulk(pipeline, BulkAnalysisRequest.model_validate_json(job.payload))
+            elif job.kind == "push":
+                response = await self._run_push(pipeline, job_id)
+            else:
+                parsed = parse_github_url(job.repo_url)
+                if not parsed:
+                    raise ValueError("Invalid GitHub repository URL")
+                response = await pipeline.analyze(
+                    parsed["owner"],
+                    parsed["repo"],
+                    parsed["branch"],
+                    include_dev=job.include_dev_dependencies,
+                    check_vulnerabilities=job.check_vulnerabilities,
+                )
+        except Exception as e:
+            logger.error(f"Analysis job {job_id} failed: {e}")
+            await self._update(
+                job_id,
+                status=AnalysisJobStatus.FAILED.value,
+                error=str(getattr(e, "detail", e)),
+                progress=json.dumps(self._progress.get(job_id, {})),
+                finished_at=datetime.utcnow(),
+            )
+        else:
+            await self._update(
+                job_id,
+                status=AnalysisJobStatus.COMPLETED.value,
+                result=response.model_dump_json(),
+                progress=json.dumps({**self._progress.get(job_id, {}), "stage": "completed"}),
+                finished_at=datetime.utcnow(),
+            )
+        finally:
+            self._progress.pop(job_id, None)
+            self._tokens.pop(job_id, None)
+
+    async def _run_bulk(self, pipeline: AnalysisPipeline, request: BulkAnalysisRequest) -> BulkAnalysisResponse:
+        targets: List[Tuple[str, str, Optional[str]]] = []
+        for url in request.repo_urls:
+            parsed = parse_github_url(url)
+            if parsed:
+                targets.append((parsed["owner"], parsed["repo"], parsed["branch"]))
+        if request.owner:
+            repos = await pipeline.github.list_owner_repos(request.owner, config.BULK_MAX_REPOSITORIES)
+            targets.extend(
+                (repo["owner"]["login"], repo["name"], None)
+                for repo in repos
+                if (request.include_forks or not repo.get("fork"))
+                and (request.include_archived or not repo.get("archived"))
+            )
+        # Same repository listed twice (explicitly and via its owner) is analyzed once
+        unique_targets = list({
+            (owner.lower(), repo.lower()): (owner, repo, branch) for owner, repo, branch in targets
+        }.values())
+        return await pipeline.analyze_many(
+            unique_targets[:config.BULK_MAX_REPOSITORIES],
+            include_dev=request.include_dev_dependencies,
+            check_vulnerabilities=request.check_vulnerabilities,
+        )
+
+    async def _run_push(self, pipeline: AnalysisPipeline, job_id: str) -> RepositoryAnalysisResponse:
+        # Reloaded now that the job is running: every push merged into it so far is included
+        job = await self._load(job_id)
+        payload = json.loads(job.payload)
+        parsed = parse_github_url(job.repo_url)
+        if not parsed:
+            raise ValueError("Invalid GitHub repository URL")
+        lock = self._branch_locks.setdefault((job.repo_url, payload["branch"]), asyncio.Lock())
+        async with lock:
+            response = await pipeline.refresh(
+                job.repo_url, parsed["owner"], parsed["repo"], payload["branch"], payload["paths"]
+            )
+        # Cached /analyze-repository responses of this repository predate the push
+        repository = (parsed["owner"].lower(), parsed["repo"].lower())
+        self.state.response_cache.invalidate(lambda key: key[0] == "analyze" and key[1:3] == repository)
+        return response
+
+    async def _merge_push(
+        self, repo_url: str, branch: str, paths: Optional[Collection[str]]
+    ) -> Optional[AnalysisJob]:
+        """Add a push's paths to a still-queued push job for the same branch, if there is one"""
+        async with AsyncSessionLocal() as db:
+            queued = (await db.execute(
+                select(AnalysisJob).where(
+                    AnalysisJob.kind == "push",
+                    AnalysisJob.repo_url == repo_url,
+                    AnalysisJob.status == AnalysisJobStatus.QUEUED.value,
+                )
+            )).scalars().all()
+            for job in queued:
+                payload = json.loads(job.payload)
+                if payload["branch"] != branch:
+                    continue
+                if payload["paths"] is not None and paths is not None:
+                    payload["paths"] = sorted(set(payload["paths"]) | set(paths))
+                else:
+                    payload["paths"] = None
+                # Only while still queued: a job that started meanwhile has read its payload
+                result = await db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == job.id, AnalysisJob.status == AnalysisJobStatus.QUEUED.value)
+                    .values(payload=json.dumps(payload))
+                )
+                await db.commit()
+                if result.rowcount:
+                    return job
+        return None
+
+    def _to_response(self, job: AnalysisJob) -> AnalysisJobResponse:
+        # Running jobs report live in-memory progress; finished ones the persisted snapshot
+        progress = self._progress.get(job.id)
+        if progress is None:
+            progress = json.loads(job.progress) if job.progress else {}
+        return AnalysisJobResponse(
+            job_id=job.id,
+            kind=job.kind or "repository",
+            status=AnalysisJobStatus(job.status),
+            repo_url=job.repo_url,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            progress=progress,
+            error=job.error,
+        )
+
+    # ---------------------------
+    # SQLite persistence
+    # ---------------------------
+    async def _insert(self, job: AnalysisJob) -> None:
+        async with AsyncSessionLocal() as db:
+            db.add(job)
+            await db.commit()
+
+    async def _load(self, job_id: str) -> Optional[AnalysisJob]:
+        async with AsyncSessionLocal() as db:
+            return await db.get(AnalysisJob, job_id)
+
+    async def _update(self, job_id: str, **values: Any) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(**values))
+            await db.commit()
+
+    async def _requeue_unfinished(self) -> List[str]:
+        unfinished = AnalysisJob.status.in_([AnalysisJobStatus.QUEUED.value, AnalysisJobStatus.RUNNING.value])
+        async with AsyncSessionLocal() as db:
+            job_ids = list((await db.execute(
+                select(AnalysisJob.id).where(unfinished).order_by(AnalysisJob.created_at)
+            )).scalars())
+            # Jobs claimed by a live worker process are left to it
+            claimed = await self.state.shared_cache.leased(_JOB_LEASE, job_ids)
+            job_ids = [job_id for job_id in job_ids if job_id not in claimed]
+            if job_ids:
+                await db.execute(
+                    update(AnalysisJob).where(AnalysisJob.id.in_(job_ids)).values(status=AnalysisJobStatus.QUEUED.value)
+                )
+                await db.commit()
+            return job_ids
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Return the app-lifetime job queue started in the lifespan hook"""
+    return request.app.state.job_queue
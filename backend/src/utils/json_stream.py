@@ -0,0 +1,111 @@
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+# Bytes that can change the scanner's state; everything between them is skipped in bulk
+_STRUCTURAL = re.compile(rb'["\\{}\[\],:]')
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPEN, _CLOSE = frozenset(b"{["), frozenset(b"}]")
+
+
+class TopLevelScanner:
+    """Extracts selected top-level keys of a JSON object from a byte stream.
+
+    Only the values of wanted keys are buffered and decoded; everything else is skipped
+    without building Python objects, and `feed` reports completion as soon as every
+    wanted key has been seen, so callers can stop reading a multi-megabyte document early.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.wanted = set(keys)
+        self.found: Dict[str, Any] = {}
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False
+        self._key: Optional[bytearray] = None  # Key string being read
+        self._current: Optional[str] = None  # Key whose value comes next
+        self._value: Optional[bytearray] = None  # Raw bytes of a wanted value being read
+        self._finished = False
+
+    @property
+    def done(self) -> bool:
+        return self._finished or self.wanted <= self.found.keys()
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next chunk; returns True once nothing more needs to be read"""
+        if self.done:
+            return True
+        key_start = value_start = 0
+        skip_to = 0
+        if self._escaped:
+            # The previous chunk ended on a backslash inside a string
+            self._escaped = False
+            skip_to = 1
+
+        for match in _STRUCTURAL.finditer(chunk, skip_to):
+            pos = match.start()
+            if pos < skip_to:
+                continue
+            char = chunk[pos]
+
+            if self._in_string:
+                if char == _BACKSLASH:
+                    skip_to = pos + 2
+                    self._escaped = skip_to > len(chunk)
+                elif char == _QUOTE:
+                    self._in_string = False
+                    if self._key is not None:
+                        self._key += chunk[key_start:pos]
+                        self._current = json.loads(b'"' + bytes(self._key) + b'"')
+                        self._key = None
+                continue
+
+            if char == _QUOTE:
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key = bytearray()
+                    key_start = pos + 1
+            elif char in _OPEN:
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif char in _CLOSE:
+                if self._depth == 1:
+                    self._finish_value(chunk[value_start:pos])
+                    self._finished = True
+                    return True
+                self._depth -= 1
+            elif self._depth == 1 and char == ord(","):
+                self._finish_value(chunk[value_start:pos])
+                self._expect_key = True
+                if self.done:
+                    return True
+            elif self._depth == 1 and char == ord(":"):
+                self._expect_key = False
+                if self._current in self.wanted:
+                    self._value = bytearray()
+                    value_start = pos + 1
+
+        # Carry partially read keys and values over to the next chunk
+        if self._key is not None:
+            self._key += chunk[key_start:]
+        if self._value is not None:
+            self._value += chunk[value_start:]
+        return self.done
+
+    def _finish_value(self, tail: bytes) -> None:
+        if self._value is None:
+            return
+        self._value += tail
+        self.found[self._current] = json.loads(bytes(self._value))
+        self._value = None
+
+
+async def scan_json_keys(chunks: AsyncIterator[bytes], keys: Iterable[str]) -> Dict[str, Any]:
+    """Read a JSON object stream only until the given top-level keys have been found"""
+    scanner = TopLevelScanner(keys)
+    async for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.found
@@ -0,0 +1,577 @@
+import json
+import re
+import tomllib
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.schemas import DependencyType
+
+
+class DependencyGraph:
+    """Deduplicated package graph resolved by one lockfile.
+
+    Names and versions are interned into a single string table and nodes live in parallel
+    integer arrays, so a lockfile with tens of thousands of entries costs a few hundred KB
+    instead of one dict per entry. Edges are kept as (parent, child) pairs and only turned
+    into adjacency lists when the graph is walked.
+    """
+
+    def __init__(self, dependency_type: DependencyType):
+        self.dependency_type = dependency_type
+        self._string_ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._names = array("I")
+        self._versions = array("I")
+        self._dev = bytearray()
+        # Keyed by the interned strings themselves: lookups of known packages skip the string table
+        self._nodes: Dict[Tuple[str, str], int] = {}
+        self._by_name: Dict[int, List[int]] = {}
+        self._parents = array("I")
+        self._children = array("I")
+        self._direct: Dict[int, bool] = {}  # node -> is dev
+        # False when the lockfile doesn't record dev-only packages; they are then derived from the roots
+        self.has_dev_flags = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def add(self, name: str, version: str, dev: bool = False) -> int:
+        """Node for name@version, created on first sight; a package is dev only if every occurrence is"""
+        node = self._nodes.get((name, version))
+        if node is None:
+            name_id, version_id = self.intern(name), self.intern(version)
+            node = self._nodes[(self._strings[name_id], self._strings[version_id])] = len(self._names)
+            self._names.append(name_id)
+            self._versions.append(version_id)
+            self._dev.append(dev)
+            self._by_name.setdefault(name_id, []).append(node)
+        elif not dev:
+            self._dev[node] = False
+        return node
+
+    def add_edge(self, parent: int, child: int) -> None:
+        self._parents.append(parent)
+        self._children.append(child)
+
+    def mark_direct(self, node: int, dev: bool = False) -> None:
+        self._direct[node] = self._direct.get(node, True) and dev
+
+    def get(self, name: str, version: str) -> Optional[int]:
+        return self._nodes.get((name, version))
+
+    def find(self, name: str, version: Optional[str] = None) -> Optional[int]:
+        """Node by name, preferring an exact version match when several versions are locked"""
+        nodes = self._by_name.get(self._string_ids.get(name, -1), [])
+        if version is not None:
+            version_id = self._string_ids.get(version)
+            for node in nodes:
+                if self._versions[node] == version_id:
+                    return node
+        return nodes[0] if nodes else None
+
+    def name(self, node: int) -> str:
+        return self._strings[self._names[node]]
+
+    def version(self, node: int) -> str:
+        return self._strings[self._versions[node]]
+
+    def dependencies(self, direct_names: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Every locked package as a pinned dependency dict.
+
+        Direct dependencies are the ones the lockfile marks as such plus `direct_names` (the
+        manifest next to it); without either, packages nothing else depends on are taken as
+        roots. Transitive packages record the direct dependency that first pulls them in.
+        """
+        for name in direct_names:
+            for node in self._by_name.get(self._string_ids.get(name, -1), []):
+                self.mark_direct(node, bool(self._dev[node]))
+        direct = dict(self._direct)
+        if not direct:
+            has_parent = set(self._children)
+            direct = {node: bool(self._dev[node]) for node in range(len(self)) if node not in has_parent}
+
+        introduced_by, prod = self._walk(direct)
+        dependencies = []
+        for node in range(len(self)):
+            is_dev = bool(self._dev[node]) if self.has_dev_flags else (node in introduced_by and node not in prod)
+            dependencies.append({
+                "name": self.name(node),
+                "version": self.version(node),
+                "constraint": None,
+                "type": self.dependency_type,
+                "is_dev": direct[node] if node in direct else is_dev,
+                "transitive": node not in direct,
+                "locked": True,
+                "introduced_by": None if node in direct or node not in introduced_by else self.name(introduced_by[node]),
+            })
+        return dependencies
+
+    def _walk(self, direct: Dict[int, bool]) -> Tuple[Dict[int, int], Set[int]]:
+        """Breadth-first from the roots: nearest introducing root per node, and nodes reachable from prod roots"""
+        children: List[List[int]] = [[] for _ in range(len(self))]
+        for parent, child in zip(self._parents, self._children):
+            children[parent].append(child)
+
+        # Prod roots go first so shared packages are attributed to them
+        roots = sorted(direct, key=lambda node: (direct[node], self.name(node)))
+        introduced_by = {root: root for root in roots}
+        queue = deque(roots)
+        while queue:
+            node = queue.popleft()
+            for child in children[node]:
+                if child not in introduced_by:
+                    introduced_by[child] = introduced_by[node]
+                    queue.append(child)
+
+        prod = {root for root in roots if not direct[root]}
+        queue = deque(prod)
+        while queue:
+            for child in children[queue.popleft()]:
+                if child not in prod:
+                    prod.add(child)
+                    queue.append(child)
+        return introduced_by, prod
+
+
+# ---------------------------
+# npm
+# ---------------------------
+_NPM_DEPENDENCY_FIELDS = ("dependencies", "optionalDependencies", "peerDependencies")
+
+
+def parse_package_lock(content: str) -> DependencyGraph:
+    """package-lock.json / npm-shrinkwrap.json, lockfileVersion 1 to 3"""
+    graph = DependencyGraph(DependencyType.NPM)
+    graph.has_dev_flags = True
+    data = json.loads(content)
+    if "packages" in data:
+        _package_lock_packages(graph, data["packages"])
+    else:
+        _package_lock_v1(graph, data)
+    return graph
+
+
+def _package_lock_packages(graph: DependencyGraph, packages: Dict[str, Any]) -> None:
+    # lockfileVersion 2+: flat map of node_modules install paths
+    nodes: Dict[str, int] = {}
+    for path, entry in packages.items():
+        if "node_modules/" not in path or entry.get("link") or not entry.get("version"):
+            continue
+        name = entry.get("name") or path.rsplit("node_modules/", 1)[1]
+        nodes[path] = graph.add(name, entry["version"], bool(entry.get("dev") or entry.get("devOptional")))
+
+    def resolve(path: str, name: str) -> Optional[int]:
+        # Node's module resolution: nearest node_modules walking up from the requiring package
+        while True:
+            node = nodes.get(f"{path}/node_modules/{name}" if path else f"node_modules/{name}")
+            if node is not None or not path:
+                return node
+            path = path.rsplit("/node_modules/", 1)[0] if "/node_modules/" in path else ""
+
+    # The root package and any workspace packages declare the direct dependencies
+    for path, entry in packages.items():
+        if "node_modules/" in path:
+            continue
+        for field in _NPM_DEPENDENCY_FIELDS + ("devDependencies",):
+            for name in entry.get(field, {}):
+                node = resolve(path, name)
+                if node is not None:
+                    graph.mark_direct(node, field == "devDependencies")
+
+    for path, parent in nodes.items():
+        entry = packages[path]
+        for field in _NPM_DEPENDENCY_FIELDS:
+            for name in entry.get(field, {}):
+                child = resolve(path, name)
+                if child is not None:
+                    graph.add_edge(parent, child)
+
+
+def _package_lock_v1(graph: DependencyGraph, data: Dict[str, Any]) -> None:
+    # lockfileVersion 1: nested "dependencies" trees with "requires" ranges. The top level
+    # holds every hoisted package, so direct dependencies come from package.json instead.
+    pending: List[Tuple[int, Dict[str, Any], Tuple[Dict[str, int], ...]]] = []
+    # (nested dependencies, enclosing scopes, owning package and its requires)
+    stack: List[Tuple[Dict[str, Any], Tuple[Dict[str, int], ...], Optional[Tuple[int, Dict[str, Any]]]]] = [
+        (data.get("dependencies", {}), (), None)
+    ]
+    while stack:
+        dependencies, scopes, owner = stack.pop()
+        scope = {
+            name: graph.add(name, entry["version"], bool(entry.get("dev")))
+            for name, entry in dependencies.items()
+            if entry.get("version")
+        }
+        scopes = (scope,) + scopes
+        if owner is not None:
+            # A package's own nested node_modules shadow the outer ones
+            pending.append((owner[0], owner[1], scopes))
+        for name, node in scope.items():
+            entry = dependencies[name]
+            if entry.get("dependencies"):
+                stack.append((entry["dependencies"], scopes, (node, entry.get("requires", {}))))
+            else:
+                pending.append((node, entry.get("requires", {}), scopes))
+
+    for parent, requires, scopes in pending:
+        for name in requires:
+            child = next((scope[name] for scope in scopes if name in scope), None)
+            if child is not None:
+                graph.add_edge(parent, child)
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _split_spec(spec: str) -> Tuple[str, str]:
+    """'@scope/name@^1.0.0' -> ('@scope/name', '^1.0.0')"""
+    at = spec.find("@", 1)
+    return (spec[:at], spec[at + 1:]) if at > 0 else (spec, "")
+
+
+def _yarn_specs(header: str) -> List[str]:
+    """Specs of an entry header; v1 quotes each (`"a@^1", "a@^2":`), Berry the whole list (`"a@npm:^1, a@npm:^2":`)"""
+    return [spec.strip().strip("\"'") for spec in header.rstrip(":").split(",")]
+
+
+# Field and dependency lines inside a yarn.lock entry; both v1 (`version "1.0.0"`) and Berry (`version: 1.0.0`)
+_YARN_VERSION = re.compile(r'^  version:? "?([^"\n]+?)"?$', re.M)
+_YARN_DEPENDENCIES = re.compile(r"^  (?:dependencies|optionalDependencies):\n((?:    .*\n?)+)", re.M)
+_YARN_REQUIREMENT = re.compile(r"""^    ["']?([^"'\s:]+)["']?:? ["']?([^"'\n]*)["']?$""", re.M)
+
+
+def parse_yarn_lock(content: str) -> DependencyGraph:
+    """yarn.lock, both the classic v1 format and Berry's YAML-style format.
+
+    Entries are separated by blank lines, so each is matched with a few compiled regexes
+    instead of walking the file line by line.
+    """
+    graph = DependencyGraph(DependencyType.NPM)
+    by_spec: Dict[str, int] = {}
+    requires: List[Tuple[Optional[int], str]] = []
+
+    for block in content.replace("\r\n", "\n").split("\n\n"):
+        block = block.strip("\n")
+        if not block or block[0] in "# " or block.startswith("__metadata"):
+            continue
+        header, _, body = block.partition("\n")
+        specs = _yarn_specs(header)
+        version_match = _YARN_VERSION.search(body)
+        dependencies_match = _YARN_DEPENDENCIES.search(body)
+        dependencies = dependencies_match.group(1) if dependencies_match else ""
+        version = version_match.group(1) if version_match else None
+        # Berry lists the project's own workspaces; their dependencies are the direct ones
+        if version is None or version.endswith("-use.local") or any("@workspace:" in spec for spec in specs):
+            requires.append((None, dependencies))
+            continue
+        node = graph.add(_split_spec(specs[0])[0], version)
+        for spec in specs:
+            by_spec[spec] = node
+        if dependencies:
+            requires.append((node, dependencies))
+
+    for parent, dependencies in requires:
+        for name, requirement in _YARN_REQUIREMENT.findall(dependencies):
+            child = by_spec.get(f"{name}@{requirement}")
+            if child is None:
+                child = by_spec.get(f"{name}@npm:{requirement}")
+            if child is None:
+                continue
+            if parent is None:
+                graph.mark_direct(child)
+            else:
+                graph.add_edge(parent, child)
+    return graph
+
+
+def _pnpm_key(key: str) -> Tuple[str, str]:
+    """Package key of any pnpm lockfile version -> (name, version)
+
+    v5: /@scope/name/1.0.0_peer@1.0.0   v6: /@scope/name@1.0.0(peer@1.0.0)   v9: @scope/name@1.0.0(peer@1.0.0)
+    """
+    key = key.lstrip("/").split("(", 1)[0]
+    at = key.rfind("@")
+    if at > 0:
+        return key[:at], key[at + 1:]
+    name, _, version = key.rpartition("/")
+    return name, version.split("_", 1)[0]
+
+
+def _pnpm_version(reference: str) -> Optional[str]:
+    """Installed version from a dependency reference; None for links and workspace packages"""
+    if reference.startswith(("link:", "file:", "workspace:")):
+        return None
+    version = reference.split("(", 1)[0]
+    return version.split("_", 1)[0] if version[:1].isdigit() else None
+
+
+_PNPM_PACKAGE = re.compile(r"\n(?=  \S)")
+_PNPM_DEV = re.compile(r"^    dev: (true|false)$", re.M)
+_PNPM_DEPENDENCIES = re.compile(r"^    (?:dependencies|optionalDependencies):\n((?:      .*\n?)+)", re.M)
+_PNPM_REFERENCE = re.compile(r"""^      ['"]?(.+?)['"]?: ['"]?([^'"\n]+?)['"]?$""", re.M)
+_PNPM_ROOT_SECTIONS = ("dependencies", "devDependencies", "optionalDependencies")
+
+
+def parse_pnpm_lock(content: str) -> DependencyGraph:
+    """pnpm-lock.yaml, lockfileVersion 5 to 9.
+
+    Parsed with regexes rather than a YAML loader: pnpm writes a fixed two-space layout
+    with blank lines between packages, and a full YAML parse of a large monorepo lockfile
+    takes seconds.
+    """
+    graph = DependencyGraph(DependencyType.NPM)
+    direct: List[Tuple[str, str, bool]] = []  # name, reference, dev
+    edges: List[Tuple[int, str]] = []
+    section: Optional[str] = None
+
+    for block in content.replace("\r\n", "\n").split("\n\n"):
+        block = block.strip("\n")
+        if not block:
+            continue
+        if not block[0].isspace():
+            header, _, block = block.partition("\n")
+            section = header.rstrip(":")
+            if section in _PNPM_ROOT_SECTIONS:
+                # lockfileVersion 5/6 single-project layout keeps root dependencies at the top level
+                block = f"  .:\n    {section}:\n" + "\n".join("    " + line for line in block.splitlines())
+            if not block:
+                continue
+        if section in ("importers",) + _PNPM_ROOT_SECTIONS:
+            direct.extend(_pnpm_importers(block))
+        elif section in ("packages", "snapshots"):
+            for entry in _PNPM_PACKAGE.split(block):
+                header, _, body = entry.partition("\n")
+                # Entries without fields are written inline: "js-tokens@4.0.0: {}"
+                name, version = _pnpm_key(_unquote(header.strip().removesuffix("{}").rstrip().rstrip(":")))
+                dev_match = _PNPM_DEV.search(body)
+                if dev_match:
+                    graph.has_dev_flags = True
+                node = graph.add(name, version, bool(dev_match) and dev_match.group(1) == "true")
+                dependencies = _PNPM_DEPENDENCIES.search(body)
+                if dependencies:
+                    edges.append((node, dependencies.group(1)))
+
+    for name, reference, dev in direct:
+        version = _pnpm_version(reference)
+        node = graph.find(name, version) if version else None
+        if node is not None:
+            graph.mark_direct(node, dev)
+    for parent, dependencies in edges:
+        for name, reference in _PNPM_REFERENCE.findall(dependencies):
+            # Plain "1.2.3" references are exact node keys; only peer-suffixed ones need cleaning
+            child = graph.get(name, reference)
+            if child is None:
+                version = _pnpm_version(reference)
+                child = graph.get(name, version) if version else None
+            if child is not None:
+                graph.add_edge(parent, child)
+    return graph
+
+
+def _pnpm_importers(block: str) -> Iterator[Tuple[str, str, bool]]:
+    """(name, reference, dev) of each importer dependency; v5 `name: ref` or v6+ `name:` + `version: ref`"""
+    field: Optional[str] = None
+    pending: Optional[str] = None
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        key, _, value = stripped.partition(": ") if ": " in stripped else (stripped.rstrip(":"), "", "")
+        key, value = _unquote(key), _unquote(value)
+        if indent == 4:
+            field, pending = key, None
+        elif indent == 6 and field in _PNPM_ROOT_SECTIONS:
+            if value:
+                yield key, value, field == "devDependencies"
+            else:
+                pending = key
+        elif indent == 8 and key == "version" and pending:
+            yield pending, value, field == "devDependencies"
+
+
+# ---------------------------
+# Python / PHP / Rust / Go / Ruby
+# ---------------------------
+def _normalize_python(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_poetry_lock(content: str) -> DependencyGraph:
+    """poetry.lock"""
+    graph = DependencyGraph(DependencyType.PIP)
+    packages = tomllib.loads(content).get("package", [])
+    # Poetry < 1.5 records a category per package; later versions leave dev-ness to pyproject.toml
+    graph.has_dev_flags = any("category" in package for package in packages)
+    nodes = {
+        _normalize_python(package["name"]): graph.add(package["name"], package["version"], package.get("category") == "dev")
+        for package in packages
+    }
+    for package in packages:
+        parent = nodes[_normalize_python(package["name"])]
+        for name in package.get("dependencies", {}):
+            child = nodes.get(_normalize_python(name))
+            if child is not None:
+                graph.add_edge(parent, child)
+    return graph
+
+
+def parse_pipfile_lock(content: str) -> DependencyGraph:
+    """Pipfile.lock; it records no dependency edges, so every package is a root unless a manifest names them"""
+    graph = DependencyGraph(DependencyType.PIP)
+    graph.has_dev_flags = True
+    data = json.loads(content)
+    for section, dev in (("default", False), ("develop", True)):
+        for name, entry in data.get(section, {}).items():
+            # VCS and path requirements carry no version
+            if entry.get("version", "").startswith("=="):
+                graph.add(name, entry["version"][2:], dev)
+    return graph
+
+
+def _composer_version(version: str) -> str:
+    return version[1:] if version[:1] == "v" and version[1:2].isdigit() else version
+
+
+def parse_composer_lock(content: str) -> DependencyGraph:
+    """composer.lock; `packages-dev` holds the packages only require-dev needs"""
+    graph = DependencyGraph(DependencyType.COMPOSER)
+    graph.has_dev_flags = True
+    data = json.loads(content)
+    packages = [(package, False) for package in data.get("packages") or []]
+    packages += [(package, True) for package in data.get("packages-dev") or []]
+    # Composer package names are case-insensitive
+    nodes = {
+        package["name"].lower(): graph.add(package["name"], _composer_version(package["version"]), dev)
+        for package, dev in packages
+    }
+    for package, _ in packages:
+        parent = nodes[package["name"].lower()]
+        # Platform requirements (php, ext-json) have no node
+        for name in package.get("require", {}):
+            child = nodes.get(name.lower())
+            if child is not None:
+                graph.add_edge(parent, child)
+    return graph
+
+
+def parse_cargo_lock(content: str) -> DependencyGraph:
+    """Cargo.lock; workspace members (packages without a source) are the roots, not dependencies"""
+    graph = DependencyGraph(DependencyType.CARGO)
+    packages = tomllib.loads(content).get("package", [])
+    members = [package for package in packages if "source" not in package]
+    external = [package for package in packages if "source" in package]
+    for package in external:
+        graph.add(package["name"], package["version"])
+
+    def resolve(reference: str) -> Optional[int]:
+        # "name", "name version" or "name version (source)"
+        name, _, rest = reference.partition(" ")
+        return graph.find(name, rest.split(" ", 1)[0] or None)
+
+    for package in members:
+        for reference in package.get("dependencies", []):
+            node = resolve(reference)
+            if node is not None:
+                graph.mark_direct(node)
+    for package in external:
+        parent = graph.find(package["name"], package["version"])
+        for reference in package.get("dependencies", []):
+            child = resolve(reference)
+            if child is not None:
+                graph.add_edge(parent, child)
+    return graph
+
+
+def parse_go_sum(content: str) -> DependencyGraph:
+    """go.sum; only modules whose source was downloaded, not every go.mod consulted by MVS"""
+    graph = DependencyGraph(DependencyType.GO)
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and not parts[1].endswith("/go.mod"):
+            graph.add(parts[0], parts[1])
+    return graph
+
+
+_GEM_SPEC = re.compile(r"^(\S+?)!?(?: \(([^)]*)\))?$")
+
+
+def parse_gemfile_lock(content: str) -> DependencyGraph:
+    """Gemfile.lock"""
+    graph = DependencyGraph(DependencyType.GEM)
+    section: Optional[str] = None
+    parent: Optional[int] = None
+    requires: List[Tuple[int, str]] = []
+    direct: List[str] = []
+
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        if not line.startswith(" "):
+            section, parent = line.strip(), None
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        match = _GEM_SPEC.match(line.strip())
+        if not match:
+            continue
+        name, version = match.groups()
+        if section in ("GEM", "GIT", "PATH"):
+            if indent == 4 and version:
+                # "nokogiri (1.15.4-x86_64-linux)": the platform suffix is not part of the version
+                parent = graph.add(name, version.split("-", 1)[0])
+            elif indent == 6 and parent is not None:
+                requires.append((parent, name))
+        elif section == "DEPENDENCIES" and indent == 2:
+            direct.append(name)
+
+    for name in direct:
+        node = graph.find(name)
+        if node is not None:
+            graph.mark_direct(node)
+    for parent, name in requires:
+        child = graph.find(name)
+        if child is not None:
+            graph.add_edge(parent, child)
+    return graph
+
+
+# Lockfile filename -> parser
+LOCKFILES: Dict[str, Callable[[str], DependencyGraph]] = {
+    "package-lock.json": parse_package_lock,
+    "npm-shrinkwrap.json": parse_package_lock,
+    "yarn.lock": parse_yarn_lock,
+    "pnpm-lock.yaml": parse_pnpm_lock,
+    "poetry.lock": parse_poetry_lock,
+    "Pipfile.lock": parse_pipfile_lock,
+    "composer.lock": parse_composer_lock,
+    "Cargo.lock": parse_cargo_lock,
+    "go.sum": parse_go_sum,
+    "Gemfile.lock": parse_gemfile_lock,
+}
+
+
+def parse_lockfile(
+    filename: str, content: str, manifest_dependencies: Iterable[Dict[str, Any]] = ()
+) -> List[Dict[str, Any]]:
+    """Locked packages as pinned dependency dicts; [] if the lockfile can't be parsed.
+
+    `manifest_dependencies` are the dependencies declared beside the lockfile; those of the
+    lockfile's ecosystem are its direct dependencies.
+    """
+    try:
+        graph = LOCKFILES[filename](content)
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+        return []
+    return graph.dependencies(dep["name"] for dep in manifest_dependencies if dep["type"] == graph.dependency_type)
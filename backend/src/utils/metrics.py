@@ -0,0 +1,208 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from fastapi import Request, Response
+
+from src import config
+
+# Every instrumentation point checks this first, so disabled metrics cost one attribute lookup
+ENABLED = config.METRICS_ENABLED
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LabelValues = Tuple[str, ...]
+
+# (stage, seconds) recorded during the current request, for the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """A named metric family with a fixed set of label names, rendered in Prometheus text format"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labels, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{self._format_labels(key)} {value:g}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        if ENABLED:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = _DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, [sum, count])
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = ([0] * len(self.buckets), [0.0, 0.0])
+        counts, totals = entry
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        totals[0] += value
+        totals[1] += 1
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, (total, count)) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{self._format_labels(key, [('le', f'{bound:g}')])} {cumulative}"
+            yield f"{self.name}_bucket{self._format_labels(key, [('le', '+Inf')])} {count:g}"
+            yield f"{self.name}_sum{self._format_labels(key)} {total:g}"
+            yield f"{self.name}_count{self._format_labels(key)} {count:g}"
+
+
+REGISTRY: List[Metric] = []
+
+HTTP_REQUESTS = Counter("releaseradar_http_requests_total", "API requests served", ["route", "method", "status"])
+HTTP_SECONDS = Histogram("releaseradar_http_request_seconds", "API request latency", ["route", "method"])
+HTTP_IN_FLIGHT = Gauge("releaseradar_http_requests_in_flight", "API requests being served")
+STAGE_SECONDS = Histogram("releaseradar_stage_seconds", "Time spent per analysis stage", ["stage"])
+ANALYSES_IN_FLIGHT = Gauge("releaseradar_analyses_in_flight", "Repository analyses running")
+UPSTREAM_REQUESTS = Counter("releaseradar_upstream_requests_total", "Upstream HTTP responses", ["host", "status"])
+UPSTREAM_SECONDS = Histogram("releaseradar_upstream_request_seconds", "Upstream time to response headers", ["host"])
+UPSTREAM_RETRIES = Counter("releaseradar_upstream_retries_total", "Upstream requests retried by the scheduler", ["registry", "reason"])
+CACHE_LOOKUPS = Counter("releaseradar_cache_lookups_total", "Cache lookups by outcome", ["cache", "result"])
+GITHUB_BUDGET = Gauge("releaseradar_github_rate_limit_remaining", "Remaining GitHub budget of the token pool", ["resource"])
+GITHUB_LIMIT = Gauge("releaseradar_github_rate_limit", "GitHub rate limit of the token pool", ["resource"])
+GITHUB_WAITING = Gauge("releaseradar_github_rate_limit_waiting", "Requests waiting for a GitHub rate-limit reset")
+
+
+# ---------------------------
+# Instrumentation helpers
+# ---------------------------
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as an analysis stage, also reported in the request's Server-Timing header"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def cache_lookup(cache: str, result: str) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result=result)
+
+
+def http_event_hooks() -> Dict[str, List[Callable[..., Awaitable[None]]]]:
+    """httpx hooks counting upstream responses and timing them by host; none when disabled"""
+    if not ENABLED:
+        return {}
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["metrics_started"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        host = response.request.url.host
+        UPSTREAM_REQUESTS.inc(host=host, status=str(response.status_code))
+        started = response.request.extensions.get("metrics_started")
+        if started is not None:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, host=host)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+async def track_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """HTTP middleware: request counts, latency, in-flight gauge and the Server-Timing header"""
+    timings: List[Tuple[str, float]] = []
+    token = _request_timings.set(timings)
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+    finally:
+        elapsed = time.perf_counter() - start
+        HTTP_IN_FLIGHT.dec()
+        _request_timings.reset(token)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUESTS.inc(route=route, method=request.method, status=status)
+        HTTP_SECONDS.observe(elapsed, route=route, method=request.method)
+
+    if config.SERVER_TIMING_ENABLED:
+        totals: Dict[str, float] = {}
+        for name, seconds in timings:
+            totals[name] = totals.get(name, 0.0) + seconds
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+        # Streaming responses are still running here; their total covers the headers only
+        entries.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(entries)
+    return response
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from src import config
+from src.schemas import DependencyType
+from src.utils.ecosystems import DRIVER_CLASSES
+from src.utils.http_client import HTTPClientPool
+from src.utils.scheduler import RegistryScheduler
+from src.utils.shared_cache import SharedCache
+from src.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# OSV ecosystem identifiers differ from our DependencyType values
+OSV_ECOSYSTEMS = {
+    **{driver.dependency_type: driver.osv_ecosystem for driver in DRIVER_CLASSES},
+    DependencyType.GRADLE: "Maven",
+    DependencyType.NUGET: "NuGet",
+}
+
+# (package name, version, dependency type)
+VulnQuery = Tuple[str, str, DependencyType]
+
+
+def _cache_key(name: str, version: str, dep_type: DependencyType) -> str:
+    return json.dumps([dep_type.value, name, version])
+
+
+class OSVClient:
+    """Batched OSV lookups: querybatch for vuln IDs, then one fetch per unique advisory"""
+
+    def __init__(
+        self,
+        http_pool: HTTPClientPool,
+        scheduler: RegistryScheduler,
+        singleflight: SingleFlight,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.base_url = config.OSV_API_URL
+        self.client = http_pool.client(self.base_url)
+        self.scheduler = scheduler
+        self.singleflight = singleflight
+        # Answers shared with other worker processes; only queries none of them made go upstream
+        self.shared = shared or SharedCache()
+        self.batch_size = config.OSV_BATCH_SIZE
+        self.hydrate_concurrency = config.OSV_HYDRATE_CONCURRENCY
+
+    async def query_batch(self, queries: List[VulnQuery]) -> List[List[str]]:
+        """Return the vulnerability IDs affecting each query, in input order"""
+        keys = [("osv-query", *query) for query in queries]
+        resolved = await self.singleflight.do_many(keys, self._query_keys)
+        return [resolved[key] for key in keys]
+
+    async def get_vulns(self, vuln_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch full advisories for the given IDs, each unique ID at most once"""
+        keys = [("osv-vuln", vuln_id) for vuln_id in vuln_ids]
+        resolved = await self.singleflight.do_many(keys, self._fetch_vulns)
+        return {key[1]: vuln for key, vuln in resolved.items() if vuln is not None}
+
+    async def _query_keys(self, keys: List[Tuple]) -> Dict[Tuple, List[str]]:
+        by_cache_key = {_cache_key(*key[1:]): key for key in keys}
+
+        async def fetch(cache_keys: List[str]) -> Dict[str, List[str]]:
+            queries = [by_cache_key[cache_key][1:] for cache_key in cache_keys]
+            chunks = [queries[i:i + self.batch_size] for i in range(0, len(queries), self.batch_size)]
+            chunk_results = await asyncio.gather(*(self._query_chunk(chunk) for chunk in chunks))
+            return dict(zip(cache_keys, (ids for chunk in chunk_results for ids in chunk)))
+
+        resolved = await self.shared.fill_many("osv-query", list(by_cache_key), fetch, config.OSV_CACHE_TTL)
+        return {key: resolved[cache_key] for cache_key, key in by_cache_key.items()}
+
+    async def _fetch_vulns(self, keys: List[Tuple]) -> Dict[Tuple, Optional[Dict[str, Any]]]:
+        resolved = await self.shared.fill_many("osv-vuln", [key[1] for key in keys], self._fetch_advisories, config.OSV_CACHE_TTL)
+        return {("osv-vuln", vuln_id): vuln for vuln_id, vuln in resolved.items()}
+
+    async def _fetch_advisories(self, vuln_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        semaphore = asyncio.Semaphore(self.hydrate_concurrency)
+
+        async def fetch(vuln_id: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+            async with semaphore:
+                try:
+                    response = await self._send(lambda: self.client.get(f"{self.base_url}/v1/vulns/{vuln_id}"))
+                    if response.status_code == 200:
+                        return vuln_id, response.json()
+                    logger.warning(f"OSV returned {response.status_code} for {vuln_id}")
+                except Exception as e:
+                    logger.warning(f"OSV advisory fetch failed for {vuln_id}: {e}")
+                return vuln_id, None
+
+        return dict(await asyncio.gather(*(fetch(vuln_id) for vuln_id in vuln_ids)))
+
+    async def _query_chunk(self, chunk: List[VulnQuery]) -> List[List[str]]:
+        payload = {"queries": [self._query(name, version, dep_type) for name, version, dep_type in chunk]}
+        response = await self._send(lambda: self.client.post(f"{self.base_url}/v1/querybatch", json=payload))
+        response.raise_for_status()
+        results = response.json().get("results", [])
+
+        ids: List[List[str]] = []
+        for query, result in zip(chunk, results):
+            vuln_ids = [vuln["id"] for vuln in result.get("vulns", []) if vuln.get("id")]
+            page_token = result.get("next_page_token")
+            while page_token:
+                more, page_token = await self._query_page(*query, page_token)
+                vuln_ids.extend(more)
+            ids.append(vuln_ids)
+        return ids
+
+    async def _query_page(self, name: str, version: str, dep_type: DependencyType, page_token: str) -> Tuple[List[str], Optional[str]]:
+        payload = {**self._query(name, version, dep_type), "page_token": page_token}
+        response = await self._send(lambda: self.client.post(f"{self.base_url}/v1/query", json=payload))
+        response.raise_for_status()
+        data = response.json()
+        return [vuln["id"] for vuln in data.get("vulns", []) if vuln.get("id")], data.get("next_page_token")
+
+    async def _send(self, send) -> httpx.Response:
+        return await self.scheduler.request("osv", send)
+
+    def _query(self, name: str, version: str, dep_type: DependencyType) -> Dict[str, Any]:
+        return {
+            "package": {"name": name, "ecosystem": OSV_ECOSYSTEMS.get(dep_type, dep_type.value)},
+            "version": version,
+        }
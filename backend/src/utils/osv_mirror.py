@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import re
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from src import config
+from src.database import AsyncSessionLocal, Base, SessionLocal, engine
+from src.models import OSVAdvisory, OSVAffectedRange
+from src.schemas import DependencyType
+from src.utils.osv import OSV_ECOSYSTEMS, VulnQuery
+from src.utils.versioning import VersionKey, parse_version
+
+logger = logging.getLogger(__name__)
+
+PackageKey = Tuple[str, str]
+# SQLite caps bound parameters per statement; IN (...) lookups are chunked below it
+_IN_CHUNK = 500
+# Version scheme used to order each OSV ecosystem's range bounds
+_VERSION_SCHEMES = {ecosystem: dep_type for dep_type, ecosystem in OSV_ECOSYSTEMS.items()}
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    """Canonical package name used both when ingesting and when looking up"""
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+@dataclass
+class PackageAdvisories:
+    """Precomputed affected ranges of one package, matched in memory"""
+
+    scheme: Optional[DependencyType] = None
+    versions: Dict[str, Set[str]] = field(default_factory=dict)  # version -> advisory IDs
+    # (advisory ID, lower bound key, upper bound key, upper bound inclusive)
+    ranges: List[Tuple[str, Optional[VersionKey], Optional[VersionKey], bool]] = field(default_factory=list)
+
+    def add(self, row: OSVAffectedRange) -> None:
+        if row.versions:
+            for version in json.loads(row.versions):
+                self.versions.setdefault(version, set()).add(row.advisory_id)
+            return
+        upper = row.fixed or row.last_affected
+        lower_key = parse_version(self.scheme, row.introduced) if row.introduced else None
+        upper_key = parse_version(self.scheme, upper) if upper else None
+        if (row.introduced and lower_key is None) or (upper and upper_key is None):
+            logger.debug(f"Skipping unparseable range of {row.advisory_id}: {row.introduced} - {upper}")
+            return
+        self.ranges.append((row.advisory_id, lower_key, upper_key, row.fixed is None))
+
+    def affecting(self, version: str) -> List[str]:
+        ids = set(self.versions.get(version, ()))
+        key = parse_version(self.scheme, version)
+        if key is None:
+            return sorted(ids)
+        for advisory_id, lower, upper, inclusive in self.ranges:
+            if lower is not None and key < lower:
+                continue
+            if upper is not None and (key > upper if inclusive else key >= upper):
+                continue
+            ids.add(advisory_id)
+        return sorted(ids)
+
+
+class OSVMirror:
+    """OSV lookups answered from the local `osv_advisories` tables instead of api.osv.dev.
+
+    Exposes the same query_batch / get_vulns interface as OSVClient. Each package's ranges
+    are loaded from SQLite once and kept in an LRU, so repeat lookups never leave memory.
+    Re-ingesting while the server runs only affects packages it has not cached yet.
+    """
+
+    def __init__(self, max_entries: int = config.OSV_MIRROR_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._packages: "OrderedDict[PackageKey, PackageAdvisories]" = OrderedDict()
+
+    async def query_batch(self, queries: List[VulnQuery]) -> List[List[str]]:
+        """Return the vulnerability IDs affecting each query, in input order"""
+        keys = [self._package_key(name, dep_type) for name, _, dep_type in queries]
+        packages: Dict[PackageKey, PackageAdvisories] = {}
+        for key in keys:
+            cached = self._packages.get(key)
+            if cached is not None:
+                self._packages.move_to_end(key)
+                packages[key] = cached
+
+        missing = [key for key in dict.fromkeys(keys) if key not in packages]
+        if missing:
+            loaded = await self._db_load_packages(missing)
+            for key in missing:
+                packages[key] = loaded.get(key) or PackageAdvisories(_VERSION_SCHEMES.get(key[0]))
+                self._memory_put(key, packages[key])
+
+        return [packages[key].affecting(version) for key, (_, version, _) in zip(keys, queries)]
+
+    async def get_vulns(self, vuln_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return full advisories for the given IDs"""
+        ids = list(dict.fromkeys(vuln_ids))
+        if not ids:
+            return {}
+        return await self._db_load_advisories(ids)
+
+    def _package_key(self, name: str, dep_type: DependencyType) -> PackageKey:
+        ecosystem = OSV_ECOSYSTEMS.get(dep_type, dep_type.value)
+        return ecosystem, normalize_package(ecosystem, name)
+
+    def _memory_put(self, key: PackageKey, entry: PackageAdvisories) -> None:
+        self._packages[key] = entry
+        self._packages.move_to_end(key)
+        while len(self._packages) > self.max_entries:
+            self._packages.popitem(last=False)
+
+    async def _db_load_packages(self, keys: List[PackageKey]) -> Dict[PackageKey, PackageAdvisories]:
+        by_ecosystem: Dict[str, List[str]] = {}
+        for ecosystem, package in keys:
+            by_ecosystem.setdefault(ecosystem, []).append(package)
+
+        loaded: Dict[PackageKey, PackageAdvisories] = {}
+        async with AsyncSessionLocal() as db:
+            for ecosystem, names in by_ecosystem.items():
+                for i in range(0, len(names), _IN_CHUNK):
+                    rows = (await db.execute(
+                        select(OSVAffectedRange)
+                        .where(OSVAffectedRange.ecosystem == ecosystem, OSVAffectedRange.package.in_(names[i:i + _IN_CHUNK]))
+                    )).scalars()
+                    for row in rows:
+                        key = (ecosystem, row.package)
+                        loaded.setdefault(key, PackageAdvisories(_VERSION_SCHEMES.get(ecosystem))).add(row)
+        return loaded
+
+    async def _db_load_advisories(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        advisories: Dict[str, Dict[str, Any]] = {}
+        async with AsyncSessionLocal() as db:
+            for i in range(0, len(ids), _IN_CHUNK):
+                rows = await db.execute(select(OSVAdvisory.id, OSVAdvisory.data).where(OSVAdvisory.id.in_(ids[i:i + _IN_CHUNK])))
+                for advisory_id, data in rows:
+                    advisories[advisory_id] = json.loads(data)
+        return advisories
+
+
+# ---------------------------
+# Ingest
+# ---------------------------
+def ingest(paths: Iterable[str], batch_size: int = 1000) -> Dict[str, int]:
+    """Load OSV advisories into the mirror, replacing any previous copy of each advisory.
+
+    Each path may be an OSV ecosystem dump (`all.zip` of JSON advisories), a directory
+    of advisory JSON files, or a single advisory JSON file.
+    """
+    Base.metadata.create_all(bind=engine)
+    stats = {"advisories": 0, "withdrawn": 0, "ranges": 0}
+    batch: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        for advisory in _iter_advisories(Path(path)):
+            if not advisory.get("id"):
+                continue
+            batch[advisory["id"]] = advisory
+            if len(batch) >= batch_size:
+                _store_batch(list(batch.values()), stats)
+                batch = {}
+    if batch:
+        _store_batch(list(batch.values()), stats)
+    return stats
+
+
+def _iter_advisories(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.is_dir():
+        files = sorted(path.rglob("*.json"))
+        sources = ((str(f), f.read_bytes) for f in files)
+    elif zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        names = [n for n in archive.namelist() if n.endswith(".json")]
+        sources = ((n, lambda n=n: archive.read(n)) for n in names)
+    else:
+        sources = iter([(str(path), path.read_bytes)])
+
+    for name, read in sources:
+        try:
+            yield json.loads(read())
+        except (ValueError, OSError) as e:
+            logger.warning(f"Skipping unreadable advisory {name}: {e}")
+
+
+def _store_batch(advisories: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    ids = [advisory["id"] for advisory in advisories]
+    live = [advisory for advisory in advisories if not advisory.get("withdrawn")]
+    range_rows = [row for advisory in live for row in _affected_rows(advisory)]
+
+    with SessionLocal() as db:
+        db.query(OSVAffectedRange).filter(OSVAffectedRange.advisory_id.in_(ids)).delete(synchronize_session=False)
+        db.query(OSVAdvisory).filter(OSVAdvisory.id.in_(ids)).delete(synchronize_session=False)
+        if live:
+            db.execute(insert(OSVAdvisory), [
+                {"id": advisory["id"], "modified": advisory.get("modified"), "data": json.dumps(advisory)}
+                for advisory in live
+            ])
+        if range_rows:
+            db.execute(insert(OSVAffectedRange), range_rows)
+        db.commit()
+
+    stats["advisories"] += len(live)
+    stats["withdrawn"] += len(advisories) - len(live)
+    stats["ranges"] += len(range_rows)
+
+
+def _affected_rows(advisory: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    for affected in advisory.get("affected", []):
+        package = affected.get("package") or {}
+        ecosystem, name = package.get("ecosystem"), package.get("name")
+        if not ecosystem or not name:
+            continue
+        base = {"advisory_id": advisory["id"], "ecosystem": ecosystem, "package": normalize_package(ecosystem, name)}
+        if affected.get("versions"):
+            yield {**base, "versions": json.dumps(affected["versions"])}
+        for range_ in affected.get("ranges", []):
+            # GIT ranges are commit hashes and cannot be compared against release versions
+            if range_.get("type") == "GIT":
+                continue
+            for interval in _intervals(range_.get("events", [])):
+                yield {**base, **interval}
+
+
+def _intervals(events: List[Dict[str, str]]) -> Iterator[Dict[str, Optional[str]]]:
+    """Flatten OSV range events into [introduced, fixed) / [introduced, last_affected] intervals"""
+    introduced: Optional[str] = None
+    is_open = False
+    for event in events:
+        if "introduced" in event:
+            introduced = None if event["introduced"] == "0" else event["introduced"]
+            is_open = True
+        elif "fixed" in event and is_open:
+            yield {"introduced": introduced, "fixed": event["fixed"]}
+            is_open = False
+        elif "last_affected" in event and is_open:
+            yield {"introduced": introduced, "last_affected": event["last_affected"]}
+            is_open = False
+    if is_open:
+        yield {"introduced": introduced}
+
+
+def mirror_stats() -> Dict[str, int]:
+    """Advisory count per ecosystem currently in the mirror"""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        rows = (
+            db.query(OSVAffectedRange.ecosystem, func.count(func.distinct(OSVAffectedRange.advisory_id)))
+            .group_by(OSVAffectedRange.ecosystem)
+            .all()
+        )
+    return dict(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.utils.osv_mirror", description="Manage the offline OSV advisory mirror")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Load OSV dumps (all.zip), advisory directories or JSON files")
+    ingest_parser.add_argument("paths", nargs="+")
+    commands.add_parser("stats", help="Show advisory counts per ecosystem")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        stats = ingest(args.paths)
+        print(f"Ingested {stats['advisories']} advisories ({stats['ranges']} affected ranges), removed {stats['withdrawn']} withdrawn")
+    else:
+        for ecosystem, count in sorted(mirror_stats().items()):
+            print(f"{ecosystem}: {count}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,342 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import httpx
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from src import config
+from src.database import AsyncSessionLocal
+from src.models import RegistryMetadata
+from src.utils import metrics
+from src.utils.shared_cache import SharedCache
+from src.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+# Performs the registry request, given conditional headers (If-None-Match / If-Modified-Since)
+Fetcher = Callable[[Dict[str, str]], Awaitable[httpx.Response]]
+# Picks the fields we keep (latest_version, description, homepage) out of a 200 response;
+# may be async to read a streamed response body incrementally
+Extractor = Callable[[httpx.Response], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+# Resolves many packages with one registry call; None marks a package the registry doesn't know
+BatchFetcher = Callable[[List[str]], Awaitable[Dict[str, Optional[Dict[str, Any]]]]]
+
+
+@dataclass
+class CacheEntry:
+    found: bool
+    latest_version: Optional[str]
+    description: Optional[str]
+    homepage: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def fields(self) -> Optional[Dict[str, Any]]:
+        if not self.found:
+            return None
+        return {
+            "latest_version": self.latest_version,
+            "description": self.description or "",
+            "homepage": self.homepage or "",
+        }
+
+
+class RegistryCache:
+    """Registry metadata cache: in-memory LRU in front of the SQLite `registry_metadata` table.
+
+    Entries younger than `ttl` are served as-is. Entries between `ttl` and `ttl + stale_ttl`
+    are served immediately while a background task revalidates them. Older entries are
+    revalidated inline. Revalidation uses ETag / Last-Modified so unchanged packages cost
+    a 304 instead of a full document.
+    """
+
+    def __init__(
+        self,
+        ttl: float = config.REGISTRY_CACHE_TTL,
+        stale_ttl: float = config.REGISTRY_CACHE_STALE_TTL,
+        max_entries: int = config.REGISTRY_CACHE_MAX_ENTRIES,
+        singleflight: Optional[SingleFlight] = None,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._refreshing: Set[CacheKey] = set()
+        self._background: Set[asyncio.Task] = set()
+        self._flights = singleflight or SingleFlight()
+        # The SQLite table is already visible to every worker; this coordinates who refreshes
+        self.shared = shared or SharedCache()
+
+    async def get(
+        self, ecosystem: str, package: str, fetch: Fetcher, extract: Extractor
+    ) -> Optional[Dict[str, Any]]:
+        """Return cached fields for a package, or None if the registry does not know it"""
+        key = (ecosystem, package)
+        entry = self._memory_get(key)
+        if entry is None:
+            entry = await self._flights.do(("registry-load", *key), lambda: self._db_load(key))
+            if entry is not None:
+                self._memory_put(key, entry)
+
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl:
+                metrics.cache_lookup("registry", "hit")
+                return entry.fields()
+            if age < self.ttl + self.stale_ttl:
+                metrics.cache_lookup("registry", "stale")
+                self._refresh_in_background(key, entry, fetch, extract)
+                return entry.fields()
+        metrics.cache_lookup("registry", "miss")
+
+        try:
+            entry = await self._revalidate(key, entry, fetch, extract)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Revalidation failed for {ecosystem}/{package}, serving stale entry: {e}")
+        return entry.fields()
+
+    async def get_many(
+        self, ecosystem: str, packages: List[str], fetch_batch: BatchFetcher
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Batch variant of `get` for registries with multi-package endpoints.
+
+        Fresh entries are served from the cache; everything else is fetched in one
+        `fetch_batch` call. Batch endpoints have no conditional requests, so expired
+        entries are refetched inline and only served stale if that call fails; the
+        failure is raised when some package has no entry to fall back on.
+        """
+        packages = list(dict.fromkeys(packages))
+        entries: Dict[str, Optional[CacheEntry]] = {p: self._memory_get((ecosystem, p)) for p in packages}
+        unloaded = [p for p, entry in entries.items() if entry is None]
+        if unloaded:
+            loaded = await self._db_load_many(ecosystem, unloaded)
+            for package, entry in loaded.items():
+                self._memory_put((ecosystem, package), entry)
+                entries[package] = entry
+
+        now = time.time()
+        expired = [p for p, entry in entries.items() if entry is None or now - entry.fetched_at >= self.ttl]
+        metrics.CACHE_LOOKUPS.inc(len(entries) - len(expired), cache="registry", result="hit")
+        metrics.CACHE_LOOKUPS.inc(len(expired), cache="registry", result="miss")
+        if expired:
+            try:
+                keys = [("registry", ecosystem, p) for p in expired]
+                refreshed = await self._flights.do_many(keys, lambda missing: self._refresh_many_shared(ecosystem, missing, fetch_batch))
+                entries.update({key[2]: entry for key, entry in refreshed.items()})
+            except Exception as e:
+                if any(entries[p] is None for p in expired):
+                    raise
+                logger.warning(f"Batch lookup failed for {len(expired)} {ecosystem} packages, serving cached entries: {e}")
+        return {p: entry.fields() if entry is not None else None for p, entry in entries.items()}
+
+    async def aclose(self) -> None:
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ---------------------------
+    # Refresh
+    # ---------------------------
+    def _refresh_in_background(
+        self, key: CacheKey, entry: CacheEntry, fetch: Fetcher, extract: Extractor
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def run():
+            try:
+                await self._revalidate(key, entry, fetch, extract)
+            except Exception as e:
+                logger.warning(f"Background revalidation failed for {key[0]}/{key[1]}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _revalidate(
+        self, key: CacheKey, entry: Optional[CacheEntry], fetch: Fetcher, extract: Extractor
+    ) -> CacheEntry:
+        # Concurrent revalidations of the same package (across requests) share one upstream call
+        return await self._flights.do(("registry", *key), lambda: self._revalidate_shared(key, entry, fetch, extract))
+
+    async def _revalidate_shared(
+        self, key: CacheKey, entry: Optional[CacheEntry], fetch: Fetcher, extract: Extractor
+    ) -> CacheEntry:
+        """Refresh one package unless another worker is already doing so; then wait for its row"""
+        ecosystem, package = key
+
+        async def load(_: List[str]) -> Dict[str, CacheEntry]:
+            stored = await self._db_load(key)
+            if stored is None or not self._is_fresh(stored):
+                return {}
+            self._memory_put(key, stored)
+            return {package: stored}
+
+        async def produce(_: List[str]) -> Dict[str, CacheEntry]:
+            return {package: await self._refresh(key, entry, fetch, extract)}
+
+        return (await self.shared.coordinate(f"registry:{ecosystem}", [package], load, produce))[package]
+
+    async def _refresh(
+        self, key: CacheKey, entry: Optional[CacheEntry], fetch: Fetcher, extract: Extractor
+    ) -> CacheEntry:
+        headers: Dict[str, str] = {}
+        if entry is not None and entry.found:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = await fetch(headers)
+        try:
+            now = time.time()
+            if response.status_code == 304 and entry is not None:
+                entry = CacheEntry(**{**entry.__dict__, "fetched_at": now})
+            elif response.status_code in (404, 410):
+                entry = CacheEntry(False, None, None, None, None, None, now)
+            elif response.status_code == 200:
+                fields = extract(response)
+                if inspect.isawaitable(fields):
+                    fields = await fields
+                entry = CacheEntry(
+                    found=True,
+                    latest_version=fields.get("latest_version"),
+                    description=fields.get("description"),
+                    homepage=fields.get("homepage"),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    fetched_at=now,
+                )
+            else:
+                raise httpx.HTTPStatusError(
+                    f"Registry returned {response.status_code}", request=response.request, response=response
+                )
+        finally:
+            # Streamed responses may be abandoned part-way through the body
+            await response.aclose()
+
+        self._memory_put(key, entry)
+        await self._db_store(key, entry)
+        return entry
+
+    async def _refresh_many_shared(
+        self, ecosystem: str, keys: List[Tuple], fetch_batch: BatchFetcher
+    ) -> Dict[Tuple, CacheEntry]:
+        """Batch refresh of the packages no other worker is refreshing; waits for the rest"""
+        by_package = {key[2]: key for key in keys}
+
+        async def load(packages: List[str]) -> Dict[str, CacheEntry]:
+            stored = await self._db_load_many(ecosystem, packages)
+            fresh = {package: entry for package, entry in stored.items() if self._is_fresh(entry)}
+            for package, entry in fresh.items():
+                self._memory_put((ecosystem, package), entry)
+            return fresh
+
+        async def produce(packages: List[str]) -> Dict[str, CacheEntry]:
+            refreshed = await self._refresh_many(ecosystem, [by_package[p] for p in packages], fetch_batch)
+            return {key[2]: entry for key, entry in refreshed.items()}
+
+        results = await self.shared.coordinate(f"registry:{ecosystem}", list(by_package), load, produce)
+        return {by_package[package]: entry for package, entry in results.items()}
+
+    async def _refresh_many(
+        self, ecosystem: str, keys: List[Tuple], fetch_batch: BatchFetcher
+    ) -> Dict[Tuple, CacheEntry]:
+        fetched = await fetch_batch([key[2] for key in keys])
+        now = time.time()
+        entries: Dict[Tuple, CacheEntry] = {}
+        for key in keys:
+            fields = fetched.get(key[2])
+            entries[key] = CacheEntry(
+                found=fields is not None,
+                latest_version=(fields or {}).get("latest_version"),
+                description=(fields or {}).get("description"),
+                homepage=(fields or {}).get("homepage"),
+                etag=None,
+                last_modified=None,
+                fetched_at=now,
+            )
+            self._memory_put((ecosystem, key[2]), entries[key])
+        await self._db_store_many([((ecosystem, key[2]), entry) for key, entry in entries.items()])
+        return entries
+
+    # ---------------------------
+    # In-memory LRU
+    # ---------------------------
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def _memory_get(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key: CacheKey, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------------------------
+    # SQLite backing store
+    # ---------------------------
+    async def _db_load(self, key: CacheKey) -> Optional[CacheEntry]:
+        return (await self._db_load_many(key[0], [key[1]])).get(key[1])
+
+    async def _db_load_many(self, ecosystem: str, packages: List[str]) -> Dict[str, CacheEntry]:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(RegistryMetadata)
+                .where(RegistryMetadata.ecosystem == ecosystem, RegistryMetadata.package.in_(packages))
+            )).scalars()
+            return {
+                row.package: CacheEntry(
+                    found=row.found,
+                    latest_version=row.latest_version,
+                    description=row.description,
+                    homepage=row.homepage,
+                    etag=row.etag,
+                    last_modified=row.last_modified,
+                    fetched_at=row.fetched_at,
+                )
+                for row in rows
+            }
+
+    async def _db_store(self, key: CacheKey, entry: CacheEntry) -> None:
+        await self._db_store_many([(key, entry)])
+
+    async def _db_store_many(self, items: List[Tuple[CacheKey, CacheEntry]]) -> None:
+        if not items:
+            return
+        stmt = insert(RegistryMetadata)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["ecosystem", "package"],
+            set_={column: stmt.excluded[column] for column in CacheEntry.__dataclass_fields__},
+        )
+        # executemany keeps large batches under SQLite's bound-parameter limit
+        rows = [{"ecosystem": key[0], "package": key[1], **entry.__dict__} for key, entry in items]
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, rows)
+            await db.commit()
+
+
+def get_registry_cache(request: Request) -> RegistryCache:
+    """Return the app-lifetime registry metadata cache created in the lifespan hook"""
+    return request.app.state.registry_cache
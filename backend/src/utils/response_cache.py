@@ -0,0 +1,114 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+
+from src import config
+from src.utils import metrics
+from src.utils.singleflight import SingleFlight
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the serialized response body"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """Short-lived cache of serialized API responses keyed by request identity.
+
+    Keys must include everything the response depends on, including the scope of the
+    GitHub credential, so a private repository is never served to another token.
+    Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(
+        self,
+        ttl: float = config.RESPONSE_CACHE_TTL,
+        max_entries: int = config.RESPONSE_CACHE_MAX_ENTRIES,
+        singleflight: Optional[SingleFlight] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._flights = singleflight or SingleFlight()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.stored_at >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, make_etag(body), time.time())
+        if self.ttl > 0:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> int:
+        """Drop entries whose key matches, e.g. after the data behind them changed; returns how many"""
+        stale = [key for key in self._entries if match(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    async def respond(
+        self, request: Request, key: Hashable, produce: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """Serve a cached JSON response, or produce, cache and serve it.
+
+        Answers 304 when the client's If-None-Match already names the current body, and
+        bypasses the cache when the client sends `Cache-Control: no-cache`.
+        """
+        entry = None
+        if "no-cache" not in request.headers.get("cache-control", ""):
+            entry = self.get(key)
+        metrics.cache_lookup("response", "miss" if entry is None else "hit")
+        if entry is None:
+            entry = await self._flights.do(("response", key), lambda: self._produce(key, produce))
+
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+    async def _produce(self, key: Hashable, produce: Callable[[], Awaitable[Any]]) -> CachedResponse:
+        content = await produce()
+        with metrics.stage("serialize"):
+            if hasattr(content, "model_dump_json"):
+                body = content.model_dump_json().encode()
+            else:
+                body = json.dumps(content).encode()
+        return self.put(key, body)
+
+
+def get_response_cache(request: Request) -> ResponseCache:
+    """Return the app-lifetime response cache created in the lifespan hook"""
+    return request.app.state.response_cache
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+import httpx
+from fastapi import Request
+
+from src import config
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+Q = TypeVar("Q")
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests/second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RegistryScheduler:
+    """Per-registry concurrency caps, rate limiting and retries for upstream requests"""
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        max_attempts: int = config.RETRY_MAX_ATTEMPTS,
+        base_delay: float = config.RETRY_BASE_DELAY,
+        max_delay: float = config.RETRY_MAX_DELAY,
+    ):
+        self.concurrency = concurrency if concurrency is not None else config.REGISTRY_CONCURRENCY
+        self.rate_limits = rate_limits if rate_limits is not None else config.REGISTRY_RATE_LIMITS
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def request(self, registry: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send a request under the registry's limits, retrying 429/5xx and transport errors"""
+        semaphore = self._semaphore(registry)
+        bucket = self._bucket(registry)
+
+        for attempt in range(1, self.max_attempts + 1):
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    response = await send()
+                except httpx.TransportError as e:
+                    if attempt == self.max_attempts:
+                        raise
+                    delay = self._backoff(attempt)
+                    metrics.UPSTREAM_RETRIES.inc(registry=registry, reason="transport")
+                    logger.warning(f"{registry} request failed ({e}); retrying in {delay:.2f}s")
+                else:
+                    if response.status_code not in RETRYABLE_STATUS or attempt == self.max_attempts:
+                        return response
+                    delay = self._retry_after(response) or self._backoff(attempt)
+                    await response.aclose()
+                    metrics.UPSTREAM_RETRIES.inc(registry=registry, reason=str(response.status_code))
+                    logger.warning(f"{registry} returned {response.status_code}; retrying in {delay:.2f}s")
+            # Sleep outside the semaphore so waiting retries don't hold a slot
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def gather(self, coros: List[Awaitable[Any]], deadline: float = config.ANALYSIS_DEADLINE) -> List[Any]:
+        """Run coroutines concurrently; anything unfinished at the deadline yields a TimeoutError"""
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        if not tasks:
+            return []
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Deadline of {deadline}s reached with {len(pending)} checks pending")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results: List[Any] = []
+        for task in tasks:
+            if task in pending:
+                results.append(asyncio.TimeoutError(f"Deadline of {deadline}s exceeded"))
+            elif task.exception() is not None:
+                results.append(task.exception())
+            else:
+                results.append(task.result())
+        return results
+
+    def _semaphore(self, registry: str) -> asyncio.Semaphore:
+        if registry not in self._semaphores:
+            limit = self.concurrency.get(registry, config.DEFAULT_REGISTRY_CONCURRENCY)
+            self._semaphores[registry] = asyncio.Semaphore(limit)
+        return self._semaphores[registry]
+
+    def _bucket(self, registry: str) -> TokenBucket:
+        if registry not in self._buckets:
+            rate = self.rate_limits.get(registry, config.DEFAULT_REGISTRY_RATE_LIMIT)
+            self._buckets[registry] = TokenBucket(rate)
+        return self._buckets[registry]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if value and value.isdigit():
+            return min(float(value), self.max_delay)
+        return None
+
+
+class WindowBatcher(Generic[Q, R]):
+    """Coalesces single requests arriving within a short window into one batched call.
+
+    A batch is sent `window` seconds after its first request, or as soon as it holds
+    `batch_size` requests. `fetch` returns one result per request, in order; an Exception
+    in a request's place fails only that request, while raising fails the whole batch.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[Q]], Awaitable[Sequence[Union[R, Exception]]]],
+        batch_size: int,
+        window: float,
+    ):
+        self.fetch = fetch
+        self.batch_size = batch_size
+        self.window = window
+        self._pending: List[Tuple[Q, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, request: Q) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: List[Tuple[Q, asyncio.Future]]) -> None:
+        try:
+            results = await self.fetch([request for request, _ in pending])
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def get_scheduler(request: Request) -> RegistryScheduler:
+    """Return the app-lifetime registry scheduler created in the lifespan hook"""
+    return request.app.state.scheduler
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from fastapi import Request
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from src import config
+from src.database import AsyncSessionLocal
+from src.models import CacheLease, SharedCacheEntry
+
+T = TypeVar("T")
+# Loads already-available results for some keys; missing keys are left out
+Loader = Callable[[List[str]], Awaitable[Dict[str, T]]]
+# Performs the upstream lookup for keys this worker holds the lease on, storing the results
+Producer = Callable[[List[str]], Awaitable[Dict[str, T]]]
+
+# SQLite caps bound parameters per statement; IN (...) lookups are chunked below it
+_IN_CHUNK = 500
+
+
+def _chunks(items: List[str], size: int = _IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class SharedCache:
+    """Lookup cache and cross-process single-flight for multi-worker deployments.
+
+    Values live in the `shared_cache` table, so every worker sharing the SQLite file (in WAL
+    mode, readers never block on a writer) sees them. Before an upstream lookup a worker
+    takes a lease per key in `cache_leases`; workers that find a key leased wait for its
+    result instead of repeating the lookup, and take over if the holder releases without
+    one or its lease expires. When disabled (single worker), lookups run directly.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = config.SHARED_CACHE_ENABLED,
+        lease_ttl: float = config.SHARED_LEASE_TTL,
+        poll_interval: float = config.SHARED_LEASE_POLL_INTERVAL,
+    ):
+        self.enabled = enabled
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # ---------------------------
+    # Key-value store
+    # ---------------------------
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        if not self.enabled or not keys:
+            return {}
+        now = time.time()
+        values: Dict[str, Any] = {}
+        async with AsyncSessionLocal() as db:
+            for chunk in _chunks(list(dict.fromkeys(keys))):
+                rows = await db.execute(
+                    select(SharedCacheEntry.key, SharedCacheEntry.value).where(
+                        SharedCacheEntry.namespace == namespace,
+                        SharedCacheEntry.key.in_(chunk),
+                        SharedCacheEntry.expires_at > now,
+                    )
+                )
+                values.update((key, json.loads(value)) for key, value in rows)
+        return values
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return (await self.get_many(namespace, [key])).get(key)
+
+    async def put_many(self, namespace: str, values: Dict[str, Any], ttl: float) -> None:
+        if not self.enabled or not values:
+            return
+        expires_at = time.time() + ttl
+        stmt = insert(SharedCacheEntry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["namespace", "key"],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        rows = [
+            {"namespace": namespace, "key": key, "value": json.dumps(value), "expires_at": expires_at}
+            for key, value in values.items()
+        ]
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, rows)
+            await db.commit()
+
+    async def put(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        await self.put_many(namespace, {key: value}, ttl)
+
+    async def purge_expired(self) -> None:
+        """Drop expired values and leases (leases of crashed workers included)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SharedCacheEntry).where(SharedCacheEntry.expires_at <= now))
+            await db.execute(delete(CacheLease).where(CacheLease.expires_at <= now))
+            await db.commit()
+
+    # ---------------------------
+    # Cross-process single-flight
+    # ---------------------------
+    async def coordinate(
+        self, namespace: str, keys: List[str], load: Loader, produce: Producer
+    ) -> Dict[str, Any]:
+        """Results for keys: loaded if another worker already has them, otherwise produced here.
+
+        `produce` must store its results where `load` finds them before returning, since
+        the lease is released right after and waiting workers then call `load`.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled:
+            return await produce(keys) if keys else {}
+
+        results: Dict[str, Any] = {}
+        pending = keys
+        while pending:
+            found = await load(pending)
+            results.update(found)
+            pending = [key for key in pending if key not in found]
+            if not pending:
+                break
+            owned = await self.acquire(namespace, pending)
+            if owned:
+                try:
+                    results.update(await produce(owned))
+                finally:
+                    await self.release(namespace, owned)
+                owned_set = set(owned)
+                pending = [key for key in pending if key not in owned_set]
+            if pending:
+                # Leased by another worker: poll for its result (or for its lease to lapse)
+                await asyncio.sleep(self.poll_interval)
+        return results
+
+    async def fill_many(self, namespace: str, keys: List[str], fetch: Producer, ttl: float) -> Dict[str, Any]:
+        """Shared values for keys, fetching the missing ones once across workers.
+
+        `fetch` maps keys to values; None values (failed lookups) are returned but not cached.
+        """
+
+        async def produce(owned: List[str]) -> Dict[str, Any]:
+            fetched = await fetch(owned)
+            await self.put_many(namespace, {key: value for key, value in fetched.items() if value is not None}, ttl)
+            return fetched
+
+        return await self.coordinate(namespace, keys, lambda pending: self.get_many(namespace, pending), produce)
+
+    # ---------------------------
+    # Leases
+    # ---------------------------
+    async def acquire(self, namespace: str, keys: List[str]) -> List[str]:
+        """Take the lease of every key that is free or expired; returns the keys now held.
+
+        Disabled, every key is granted: a single worker has nobody to coordinate with.
+        """
+        if not self.enabled:
+            return list(keys)
+        now = time.time()
+        stmt = insert(CacheLease)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"owner": stmt.excluded.owner, "expires_at": stmt.excluded.expires_at},
+            where=CacheLease.expires_at <= now,
+        )
+        lease_keys = {f"{namespace}:{key}": key for key in keys}
+        rows = [{"key": lease_key, "owner": self.owner, "expires_at": now + self.lease_ttl} for lease_key in lease_keys]
+        held: List[str] = []
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, rows)
+            for chunk in _chunks(list(lease_keys)):
+                result = await db.execute(
+                    select(CacheLease.key).where(CacheLease.key.in_(chunk), CacheLease.owner == self.owner)
+                )
+                held.extend(lease_keys[lease_key] for lease_key in result.scalars())
+            await db.commit()
+        return held
+
+    async def renew(self, namespace: str, keys: List[str]) -> None:
+        """Extend leases this worker holds, for work that outlives SHARED_LEASE_TTL"""
+        if not self.enabled:
+            return
+        async with AsyncSessionLocal() as db:
+            for chunk in _chunks([f"{namespace}:{key}" for key in keys]):
+                await db.execute(
+                    update(CacheLease)
+                    .where(CacheLease.key.in_(chunk), CacheLease.owner == self.owner)
+                    .values(expires_at=time.time() + self.lease_ttl)
+                )
+            await db.commit()
+
+    async def leased(self, namespace: str, keys: List[str]) -> Set[str]:
+        """Keys whose lease some worker currently holds"""
+        if not self.enabled or not keys:
+            return set()
+        prefix = f"{namespace}:"
+        held: Set[str] = set()
+        async with AsyncSessionLocal() as db:
+            for chunk in _chunks([prefix + key for key in keys]):
+                result = await db.execute(
+                    select(CacheLease.key).where(CacheLease.key.in_(chunk), CacheLease.expires_at > time.time())
+                )
+                held.update(lease_key[len(prefix):] for lease_key in result.scalars())
+        return held
+
+    async def release(self, namespace: str, keys: List[str]) -> None:
+        if not self.enabled:
+            return
+        async with AsyncSessionLocal() as db:
+            for chunk in _chunks([f"{namespace}:{key}" for key in keys]):
+                await db.execute(delete(CacheLease).where(CacheLease.key.in_(chunk), CacheLease.owner == self.owner))
+            await db.commit()
+
+
+def get_shared_cache(request: Request) -> SharedCache:
+    """Return the app-lifetime shared cache created in the lifespan hook"""
+    return request.app.state.shared_cache
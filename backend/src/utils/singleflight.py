@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent identical lookups into one in-flight call.
+
+    The shared work runs in its own task, so a caller that disconnects or is
+    cancelled does not cancel the lookup for everyone else waiting on it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def do_many(
+        self, keys: List[Hashable], fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """Batch variant: `fn` is called once with only the keys nobody else is already fetching"""
+        loop = asyncio.get_running_loop()
+        futures: Dict[Hashable, asyncio.Future] = {}
+        missing: List[Hashable] = []
+        for key in dict.fromkeys(keys):
+            future = self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[key] = future
+                missing.append(key)
+            futures[key] = future
+
+        if missing:
+            batch = asyncio.ensure_future(fn(missing))
+            batch.add_done_callback(lambda task: self._resolve(missing, task))
+
+        results = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+        return dict(zip(futures.keys(), results))
+
+    def _resolve(self, keys: List[Hashable], batch: asyncio.Future) -> None:
+        for key in keys:
+            future = self._inflight.pop(key)
+            if future.done():
+                continue
+            if batch.cancelled():
+                future.cancel()
+            elif batch.exception() is not None:
+                future.set_exception(batch.exception())
+            else:
+                future.set_result(batch.result().get(key))
+
+
+def get_singleflight(request: Request) -> SingleFlight:
+    """Return the app-lifetime single-flight group created in the lifespan hook"""
+    return request.app.state.singleflight
@@ -0,0 +1,184 @@
+import zlib
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+_BLOCK = 512
+_ZERO_BLOCK = bytes(_BLOCK)
+# Member types whose data is file content; everything else (directories, links, ...) is skipped
+_REGULAR = frozenset(b"0\x007")
+_PAX_HEADER, _PAX_GLOBAL, _GNU_LONG_NAME, _GNU_LONG_LINK = ord("x"), ord("g"), ord("L"), ord("K")
+
+
+class TarFormatError(ValueError):
+    pass
+
+
+class TarballExtractor:
+    """Extracts selected members of a gzipped tar archive from a byte stream.
+
+    Decompression and header parsing happen as chunks arrive; only the contents of
+    members accepted by `wanted` are kept, so memory stays proportional to the selected
+    files rather than the archive. Understands ustar, pax extended headers (`path`,
+    `size`) and GNU long names, which GitHub's archives use for deep paths.
+    `strip_components` drops leading path components, like `tar --strip-components`.
+    """
+
+    def __init__(self, wanted: Callable[[str], bool], strip_components: int = 0):
+        self.wanted = wanted
+        self.strip_components = strip_components
+        self.files: Dict[str, bytes] = {}
+        self.compressed_bytes = 0
+        self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        self._buffer = b""
+        self._skip = 0  # Bytes still to drop: unwanted member data and block padding
+        self._remaining = 0  # Bytes of the member being read still to come
+        self._kind: Optional[int] = None  # Type of the member being read, if its data is kept
+        self._path: Optional[str] = None
+        self._parts: List[bytes] = []
+        self._padding = 0
+        self._overrides: Dict[str, str] = {}  # pax / GNU values for the next member
+        self._finished = False
+
+    @property
+    def done(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next compressed chunk; returns True once the end of the archive is reached"""
+        if self._finished:
+            return True
+        self.compressed_bytes += len(chunk)
+        data = self._decompressor.decompress(chunk)
+        if data:
+            self._consume(self._buffer + data if self._buffer else data)
+        return self._finished
+
+    def _consume(self, data: bytes) -> None:
+        view = memoryview(data)
+        pos, end = 0, len(data)
+        while pos < end and not self._finished:
+            if self._skip:
+                step = min(self._skip, end - pos)
+                self._skip -= step
+                pos += step
+            elif self._remaining:
+                step = min(self._remaining, end - pos)
+                self._parts.append(bytes(view[pos:pos + step]))
+                self._remaining -= step
+                pos += step
+                if not self._remaining:
+                    self._finish_member()
+            elif end - pos >= _BLOCK:
+                self._read_header(bytes(view[pos:pos + _BLOCK]))
+                pos += _BLOCK
+            else:
+                break
+        # Only a partial header is ever carried over between chunks
+        self._buffer = bytes(view[pos:]) if not self._finished else b""
+
+    def _read_header(self, header: bytes) -> None:
+        if header == _ZERO_BLOCK:
+            self._finished = True
+            return
+        if _checksum(header) != _number(header[148:156]):
+            raise TarFormatError("Corrupt tar header")
+
+        kind = header[156]
+        size = _number(header[124:136])
+        if kind in (_PAX_HEADER, _GNU_LONG_NAME):
+            self._start(kind, None, size)
+            return
+        if kind in (_PAX_GLOBAL, _GNU_LONG_LINK):
+            self._skip = size + -size % _BLOCK
+            return
+
+        overrides, self._overrides = self._overrides, {}
+        if "size" in overrides:
+            size = int(overrides["size"])
+        if kind not in _REGULAR:
+            self._skip = size + -size % _BLOCK
+            return
+
+        path = overrides.get("path")
+        if path is None:
+            path = _string(header[0:100])
+            # POSIX ustar splits long paths into prefix + name; GNU uses that field for times
+            if header[257:263] == b"ustar\x00":
+                prefix = _string(header[345:500])
+                path = f"{prefix}/{path}" if prefix else path
+        parts = path.split("/")[self.strip_components:]
+        path = "/".join(parts)
+        if path and self.wanted(path):
+            self._start(kind, path, size)
+        else:
+            self._skip = size + -size % _BLOCK
+
+    def _start(self, kind: int, path: Optional[str], size: int) -> None:
+        self._kind, self._path, self._parts = kind, path, []
+        self._remaining = size
+        self._padding = -size % _BLOCK
+        if not size:
+            self._finish_member()
+
+    def _finish_member(self) -> None:
+        data = b"".join(self._parts)
+        self._parts = []
+        if self._kind == _PAX_HEADER:
+            self._overrides.update(_pax_records(data))
+        elif self._kind == _GNU_LONG_NAME:
+            self._overrides["path"] = _string(data)
+        else:
+            self.files[self._path] = data
+        self._kind = self._path = None
+        self._skip = self._padding
+
+
+def _string(field: bytes) -> str:
+    return field.split(b"\x00", 1)[0].decode("utf-8", "replace")
+
+
+def _number(field: bytes) -> int:
+    """Octal numeric field, or GNU base-256 when the high bit of the first byte is set"""
+    if field[0] & 0x80:
+        value = field[0] & 0x7F
+        for byte in field[1:]:
+            value = (value << 8) | byte
+        return value
+    digits = field.split(b"\x00", 1)[0].strip()
+    return int(digits, 8) if digits else 0
+
+
+def _checksum(header: bytes) -> int:
+    # The checksum field itself counts as eight spaces
+    return sum(header[:148]) + 8 * 32 + sum(header[156:])
+
+
+def _pax_records(data: bytes) -> Dict[str, str]:
+    """Parse `<length> <key>=<value>\\n` records"""
+    records: Dict[str, str] = {}
+    pos = 0
+    while pos < len(data):
+        space = data.find(b" ", pos)
+        if space < 0:
+            break
+        length = int(data[pos:space])
+        key, _, value = data[space + 1:pos + length - 1].partition(b"=")
+        records[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+        pos += length
+    return records
+
+
+async def extract_tarball(
+    chunks: AsyncIterator[bytes],
+    wanted: Callable[[str], bool],
+    strip_components: int = 0,
+    max_bytes: Optional[int] = None,
+) -> Dict[str, bytes]:
+    """Read a .tar.gz stream, keeping only wanted members, until its end or max_bytes compressed.
+
+    Stopping at max_bytes returns the members extracted so far.
+    """
+    extractor = TarballExtractor(wanted, strip_components)
+    async for chunk in chunks:
+        if extractor.feed(chunk) or (max_bytes and extractor.compressed_bytes >= max_bytes):
+            break
+    return extractor.files
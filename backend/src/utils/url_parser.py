@@ -21,7 +21,8 @@ def parse_github_url(url: str) -> Optional[Dict[str, str]]:
             result = match.groupdict()
             if result.get("repo"):
                 result["repo"] = result["repo"].replace(".git", "")
-            result["branch"] = result.get("branch") or "main"
+            # None means "the repository's default branch"
+            result["branch"] = result.get("branch") or None
             return result
 
     return None
@@ -30,4 +31,4 @@ def parse_github_url(url: str) -> Optional[Dict[str, str]]:
 # Example usage
 # url = "https://github.com/<github_username>/<repo_name>"
 # print(parse_github_url(url))
-# {'owner': '<github_username>', 'repo': '<repo_name>', 'branch': 'main', 'path': None}
\ No newline at end of file
+# {'owner': '<github_username>', 'repo': '<repo_name>', 'branch': None, 'path': None}
\ No newline at end of file
@@ -0,0 +1,581 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src.schemas import DependencyType
+
+# Comparable key of a parsed version; only keys from the same ecosystem are comparable
+VersionKey = Tuple
+# (operator, bound): "<", "<=", ">", ">=", "==", "!=" take a VersionKey,
+# "!in" takes a half-open (low, high) pair of VersionKeys
+Comparator = Tuple[str, Any]
+# A constraint is satisfied when every comparator of at least one set holds
+Constraint = Tuple[Tuple[Comparator, ...], ...]
+
+ANY: Constraint = ((),)
+# Parsed versions and constraints are interned: the same few thousand strings recur across analyses
+_INTERN_SIZE = 65536
+
+
+class _Scheme(NamedTuple):
+    key: Callable[[str], Optional[VersionKey]]
+    constraint: Callable[[str], Optional[Constraint]]
+
+
+# ---------------------------
+# Semantic versioning (npm, Cargo, Go)
+# ---------------------------
+_SEMVER = re.compile(r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.\-]+))?(?:\+[0-9A-Za-z.\-]+)?$")
+_SEMVER_PARTIAL = re.compile(
+    r"^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?(?:-([0-9A-Za-z.\-]+))?(?:\+[0-9A-Za-z.\-]+)?$"
+)
+_SEMVER_OPERATOR = re.compile(r"^(<=|>=|<|>|=|\^|~>|~)?\s*(.*)$")
+
+
+def _semver(major: int, minor: int, patch: int, pre: Optional[str] = None) -> VersionKey:
+    # A release sorts after all of its pre-releases; numeric identifiers sort before alphanumeric ones
+    if pre is None:
+        return major, minor, patch, (1,)
+    identifiers = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in pre.split("."))
+    return major, minor, patch, (0, identifiers)
+
+
+def _semver_floor(major: int, minor: int, patch: int) -> VersionKey:
+    """Lowest possible version with this release number (X.Y.Z-0)"""
+    return _semver(major, minor, patch, "0")
+
+
+def _semver_key(text: str) -> Optional[VersionKey]:
+    match = _SEMVER.match(text.strip())
+    if not match:
+        return None
+    major, minor, patch, pre = match.groups()
+    return _semver(int(major), int(minor or 0), int(patch or 0), pre)
+
+
+def _semver_partial(text: str) -> Optional[Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]]:
+    match = _SEMVER_PARTIAL.match(text.strip())
+    if not match:
+        return None
+    parts: List[Optional[int]] = []
+    for part in match.groups()[:3]:
+        # Everything after the first wildcard is a wildcard too ("1.x.3" == "1.x")
+        if part is None or part in ("x", "X", "*") or (parts and parts[-1] is None):
+            parts.append(None)
+        else:
+            parts.append(int(part))
+    return parts[0], parts[1], parts[2], match.group(4)
+
+
+def _semver_comparators(operator: str, text: str) -> Optional[List[Comparator]]:
+    """Desugar one npm/Cargo comparator (x-ranges, ^, ~, partial versions) into primitive bounds"""
+    if text in ("", "*", "x", "X"):
+        return []
+    parsed = _semver_partial(text)
+    if parsed is None:
+        return None
+    major, minor, patch, pre = parsed
+    if major is None:
+        return []
+    lower = _semver(major, minor or 0, patch or 0, pre)
+
+    if operator == "^":
+        if major > 0 or minor is None:
+            upper = _semver_floor(major + 1, 0, 0)
+        elif minor > 0 or patch is None:
+            upper = _semver_floor(0, minor + 1, 0)
+        else:
+            upper = _semver_floor(0, 0, patch + 1)
+        return [(">=", lower), ("<", upper)]
+    if operator in ("~", "~>"):
+        upper = _semver_floor(major + 1, 0, 0) if minor is None else _semver_floor(major, minor + 1, 0)
+        return [(">=", lower), ("<", upper)]
+    if operator == ">=":
+        return [(">=", lower)]
+    if operator == ">":
+        if minor is None:
+            return [(">=", _semver(major + 1, 0, 0))]
+        if patch is None:
+            return [(">=", _semver(major, minor + 1, 0))]
+        return [(">", lower)]
+    if operator == "<":
+        if minor is None:
+            return [("<", _semver_floor(major, 0, 0))]
+        if patch is None:
+            return [("<", _semver_floor(major, minor, 0))]
+        return [("<", lower)]
+    if operator == "<=":
+        if minor is None:
+            return [("<", _semver_floor(major + 1, 0, 0))]
+        if patch is None:
+            return [("<", _semver_floor(major, minor + 1, 0))]
+        return [("<=", lower)]
+    # "=" or bare: exact, or an x-range when partial
+    if minor is None:
+        return [(">=", lower), ("<", _semver_floor(major + 1, 0, 0))]
+    if patch is None:
+        return [(">=", lower), ("<", _semver_floor(major, minor + 1, 0))]
+    return [("==", lower)]
+
+
+def _npm_constraint(text: str) -> Optional[Constraint]:
+    if text.strip() in ("", "*", "latest"):
+        return ANY
+    sets: List[Tuple[Comparator, ...]] = []
+    for part in text.split("||"):
+        part = part.strip()
+        hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", part)
+        if hyphen:
+            lower = _semver_comparators(">=", hyphen.group(1))
+            upper = _semver_comparators("<=", hyphen.group(2))
+            if lower is None or upper is None:
+                return None
+            sets.append(tuple(lower + upper))
+            continue
+
+        comparators: List[Comparator] = []
+        # Operators may be separated from their version by spaces (">= 1.2.3")
+        for token in re.sub(r"(<=|>=|<|>|=|\^|~>|~)\s+", r"\1", part).split():
+            operator, version = _SEMVER_OPERATOR.match(token).groups()
+            desugared = _semver_comparators(operator or "=", version)
+            if desugared is None:
+                return None
+            comparators.extend(desugared)
+        sets.append(tuple(comparators))
+    return tuple(sets)
+
+
+def _cargo_constraint(text: str) -> Optional[Constraint]:
+    comparators: List[Comparator] = []
+    for token in text.split(","):
+        operator, version = _SEMVER_OPERATOR.match(token.strip()).groups()
+        # A bare Cargo requirement is a caret requirement ("1.2.3" == "^1.2.3")
+        desugared = _semver_comparators(operator or "^", version.strip())
+        if desugared is None:
+            return None
+        comparators.extend(desugared)
+    return (tuple(comparators),)
+
+
+def _go_key(text: str) -> Optional[VersionKey]:
+    # Pseudo-versions (v0.0.0-20210101120000-abcdef123456) are pre-releases whose
+    # timestamp identifier orders them chronologically; +incompatible is build metadata
+    return _semver_key(text)
+
+
+def _exact_constraint(key: Callable[[str], Optional[VersionKey]]) -> Callable[[str], Optional[Constraint]]:
+    """Ecosystems whose manifests name one version (go.mod minimums, Maven soft requirements)"""
+    def parse(text: str) -> Optional[Constraint]:
+        parsed = key(text)
+        return ((("==", parsed),),) if parsed is not None else None
+    return parse
+
+
+# ---------------------------
+# PEP 440 (PyPI)
+# ---------------------------
+_PEP440 = re.compile(
+    r"""^v?
+    (?:(?P<epoch>\d+)!)?
+    (?P<release>\d+(?:\.\d+)*)
+    (?:[-_.]?(?P<pre>alpha|beta|preview|pre|rc|a|b|c)[-_.]?(?P<pre_n>\d+)?)?
+    (?:-(?P<post_implicit>\d+)|[-_.]?(?P<post>post|rev|r)[-_.]?(?P<post_n>\d+)?)?
+    (?:[-_.]?(?P<dev>dev)[-_.]?(?P<dev_n>\d+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    $""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_PEP440_PRE = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+_PEP440_OPERATOR = re.compile(r"^(~=|===|==|!=|<=|>=|<|>)?\s*(\S+)$")
+
+
+def _pep440(
+    epoch: int,
+    release: Tuple[int, ...],
+    pre: Optional[Tuple[int, int]] = None,
+    post: Optional[int] = None,
+    dev: Optional[int] = None,
+    local: Tuple = (),
+) -> VersionKey:
+    while release and release[-1] == 0:
+        release = release[:-1]
+    # Ordering per PEP 440: X.devN < X.aN < X.bN < X.rcN < X < X.postN
+    if pre is not None:
+        pre_key: Tuple = (1, *pre)
+    elif dev is not None and post is None:
+        pre_key = (0,)
+    else:
+        pre_key = (2,)
+    post_key = (0,) if post is None else (1, post)
+    dev_key = (2,) if dev is None else (1, dev)
+    return epoch, release, pre_key, post_key, dev_key, local
+
+
+def _pep440_parts(text: str) -> Optional[Dict[str, Any]]:
+    match = _PEP440.match(text.strip())
+    if not match:
+        return None
+    parts = match.groupdict()
+    pre = None
+    if parts["pre"]:
+        pre = (_PEP440_PRE[parts["pre"].lower()], int(parts["pre_n"] or 0))
+    post = None
+    if parts["post_implicit"] is not None:
+        post = int(parts["post_implicit"])
+    elif parts["post"]:
+        post = int(parts["post_n"] or 0)
+    local: Tuple = ()
+    if parts["local"]:
+        local = tuple((1, int(s), "") if s.isdigit() else (0, 0, s.lower()) for s in re.split(r"[-_.]", parts["local"]))
+    return {
+        "epoch": int(parts["epoch"] or 0),
+        "release": tuple(int(p) for p in parts["release"].split(".")),
+        "pre": pre,
+        "post": post,
+        "dev": int(parts["dev_n"] or 0) if parts["dev"] else None,
+        "local": local,
+    }
+
+
+def _pep440_key(text: str) -> Optional[VersionKey]:
+    parts = _pep440_parts(text)
+    return _pep440(**parts) if parts else None
+
+
+def _pep440_prefix(epoch: int, release: Tuple[int, ...]) -> Tuple[VersionKey, VersionKey]:
+    """Half-open key range of every version starting with release (what "==1.2.*" matches)"""
+    bumped = release[:-1] + (release[-1] + 1,)
+    return _pep440(epoch, release, dev=0), _pep440(epoch, bumped, dev=0)
+
+
+def _pep440_constraint(text: str) -> Optional[Constraint]:
+    if text.strip() in ("", "*", "latest"):
+        return ANY
+    comparators: List[Comparator] = []
+    for specifier in text.split(","):
+        match = _PEP440_OPERATOR.match(specifier.strip())
+        if not match:
+            return None
+        operator, version = match.groups()
+        operator = {None: "==", "===": "=="}.get(operator, operator)
+
+        if version.endswith(".*"):
+            parts = _pep440_parts(version[:-2])
+            if parts is None or operator not in ("==", "!="):
+                return None
+            low, high = _pep440_prefix(parts["epoch"], parts["release"])
+            comparators.extend([(">=", low), ("<", high)] if operator == "==" else [("!in", (low, high))])
+            continue
+
+        parts = _pep440_parts(version)
+        if parts is None:
+            return None
+        if operator == "~=":
+            # ~=2.2.1 means >=2.2.1, ==2.2.*
+            if len(parts["release"]) < 2:
+                return None
+            comparators.append((">=", _pep440(**parts)))
+            comparators.append(("<", _pep440_prefix(parts["epoch"], parts["release"][:-1])[1]))
+        else:
+            comparators.append((operator, _pep440(**parts)))
+    return (tuple(comparators),)
+
+
+# ---------------------------
+# Maven (ComparableVersion ordering)
+# ---------------------------
+_MAVEN_QUALIFIERS = {
+    "alpha": 1, "a": 1, "beta": 2, "b": 2, "milestone": 3, "m": 3, "rc": 4, "cr": 4,
+    "snapshot": 5, "": 6, "ga": 6, "final": 6, "release": 6, "sp": 7,
+}
+_MAVEN_RELEASE = 6
+_MAVEN_RANGE = re.compile(r"([\[(])\s*([^,\[\]()]*?)\s*(,)?\s*([^,\[\]()]*?)\s*([\])])")
+
+
+def _trim_zeros(items: List[Tuple], zero: Tuple) -> List[Tuple]:
+    """Drop numeric zeros that end the version or precede a qualifier ("1.0.0-rc" == "1-rc")"""
+    trimmed: List[Tuple] = []
+    for item in items:
+        if item[0] != zero[0]:
+            while trimmed and trimmed[-1] == zero:
+                trimmed.pop()
+        trimmed.append(item)
+    while trimmed and trimmed[-1] == zero:
+        trimmed.pop()
+    return trimmed
+
+
+def _maven_key(text: str) -> Optional[VersionKey]:
+    tokens = re.findall(r"\d+|[a-z]+", text.strip().lower())
+    if not tokens or "$" in text:
+        return None
+    items: List[Tuple] = []
+    for token in tokens:
+        if token.isdigit():
+            items.append((1, int(token), ""))
+            continue
+        rank = _MAVEN_QUALIFIERS.get(token)
+        if rank == _MAVEN_RELEASE:
+            continue
+        # Unknown qualifiers sort after the known ones, alphabetically
+        items.append((0, rank, "") if rank is not None else (0, 8, token))
+    items = _trim_zeros(items, (1, 0, ""))
+    items.append((0, _MAVEN_RELEASE, ""))
+    return tuple(items)
+
+
+def _maven_constraint(text: str) -> Optional[Constraint]:
+    text = text.strip()
+    if not text.startswith(("[", "(")):
+        # A bare version is a soft requirement: that version unless something else forces another
+        return _exact_constraint(_maven_key)(text)
+    sets: List[Tuple[Comparator, ...]] = []
+    for opening, low, comma, high, closing in _MAVEN_RANGE.findall(text):
+        if not comma:
+            key = _maven_key(low)
+            if key is None:
+                return None
+            sets.append((("==", key),))
+            continue
+        comparators: List[Comparator] = []
+        for bound, operator in ((low, ">=" if opening == "[" else ">"), (high, "<=" if closing == "]" else "<")):
+            if bound:
+                key = _maven_key(bound)
+                if key is None:
+                    return None
+                comparators.append((operator, key))
+        sets.append(tuple(comparators))
+    return tuple(sets) or None
+
+
+# ---------------------------
+# Composer (Packagist)
+# ---------------------------
+_COMPOSER = re.compile(
+    r"^v?(\d+(?:\.\d+){0,3})(?:[.\-]?(dev|alpha|a|beta|b|rc|patch|pl|p|stable)[.\-]?(\d+)?)?$", re.IGNORECASE
+)
+_COMPOSER_STABILITY = {"dev": 0, "alpha": 1, "a": 1, "beta": 2, "b": 2, "rc": 3, "stable": 4, "patch": 5, "pl": 5, "p": 5}
+_COMPOSER_OPERATOR = re.compile(r"^(<=|>=|<>|!=|==|<|>|=|\^|~)?\s*(.+)$")
+
+
+def _composer(release: Tuple[int, ...], stability: int = 4, number: int = 0) -> VersionKey:
+    while release and release[-1] == 0:
+        release = release[:-1]
+    return release, stability, number
+
+
+def _composer_key(text: str) -> Optional[VersionKey]:
+    match = _COMPOSER.match(text.strip())
+    if not match:
+        return None
+    release, stability, number = match.groups()
+    rank = _COMPOSER_STABILITY[stability.lower()] if stability else 4
+    return _composer(tuple(int(p) for p in release.split(".")), rank, int(number or 0))
+
+
+def _composer_bump(release: Tuple[int, ...], position: int) -> VersionKey:
+    """Lowest version (dev stability) after every release sharing release[:position + 1]"""
+    bumped = release[:position] + (release[position] + 1,)
+    return _composer(bumped, 0, 0)
+
+
+def _composer_comparators(operator: str, version: str) -> Optional[List[Comparator]]:
+    if version in ("*", "x"):
+        return []
+    wildcard = re.match(r"^v?(\d+(?:\.\d+)*)\.[*x]$", version)
+    if wildcard:
+        release = tuple(int(p) for p in wildcard.group(1).split("."))
+        return [(">=", _composer(release, 0)), ("<", _composer_bump(release, len(release) - 1))]
+
+    key = _composer_key(version)
+    if key is None:
+        return None
+    release = tuple(int(p) for p in re.match(r"^v?([\d.]+?)(?:[.\-]?[a-zA-Z]|$)", version).group(1).split("."))
+    if operator == "^":
+        significant = next((i for i, part in enumerate(release) if part != 0), len(release) - 1)
+        return [(">=", key), ("<", _composer_bump(release, significant))]
+    if operator == "~":
+        # ~1.2 allows 1.x from 1.2; ~1.2.3 allows 1.2.x from 1.2.3
+        return [(">=", key), ("<", _composer_bump(release, max(len(release) - 2, 0)))]
+    if operator in ("<>", "!="):
+        return [("!=", key)]
+    return [({"": "==", "=": "==", "==": "=="}.get(operator, operator), key)]
+
+
+def _composer_constraint(text: str) -> Optional[Constraint]:
+    # Stability flags (@dev) and inline aliases (1.0.x-dev as 1.0.3) don't change the range
+    text = re.sub(r"@\w+", "", text.split(" as ")[0]).strip()
+    if text in ("", "*"):
+        return ANY
+    sets: List[Tuple[Comparator, ...]] = []
+    for part in re.split(r"\s*\|\|?\s*", text):
+        hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", part)
+        if hyphen:
+            lower = _composer_comparators(">=", hyphen.group(1))
+            upper_release = re.match(r"^v?(\d+(?:\.\d+)*)$", hyphen.group(2))
+            if lower is None or upper_release is None:
+                return None
+            release = tuple(int(p) for p in upper_release.group(1).split("."))
+            # A partial upper bound is a wildcard: "1.0 - 2.0" means >=1.0 <2.1
+            upper = [("<", _composer_bump(release, len(release) - 1))] if len(release) < 3 else [("<=", _composer(release))]
+            sets.append(tuple(lower + upper))
+            continue
+        comparators: List[Comparator] = []
+        for token in re.split(r"\s*,\s*|\s+", re.sub(r"(<=|>=|<>|!=|==|<|>|=|\^|~)\s+", r"\1", part)):
+            if not token:
+                continue
+            operator, version = _COMPOSER_OPERATOR.match(token).groups()
+            desugared = _composer_comparators(operator or "", version)
+            if desugared is None:
+                return None
+            comparators.extend(desugared)
+        sets.append(tuple(comparators))
+    return tuple(sets)
+
+
+# ---------------------------
+# RubyGems
+# ---------------------------
+_GEM = re.compile(r"^v?[0-9]+(?:\.[0-9a-zA-Z]+)*(?:-[0-9A-Za-z.\-]+)?$")
+_GEM_OPERATOR = re.compile(r"^(~>|>=|<=|!=|=|>|<)?\s*(\S+)$")
+
+
+def _gem_segments(text: str) -> List[str]:
+    return re.findall(r"\d+|[a-zA-Z]+", text.replace("-", ".pre."))
+
+
+def _gem_key(text: str) -> Optional[VersionKey]:
+    text = text.strip()
+    if not _GEM.match(text):
+        return None
+    # A string segment marks a pre-release: "1.0.a" < "1.0"; missing segments count as 0
+    items = [(1, int(s), "") if s.isdigit() else (0, 0, s) for s in _gem_segments(text)]
+    items = _trim_zeros(items, (1, 0, ""))
+    items.append((1, 0, ""))
+    return tuple(items)
+
+
+def _gem_constraint(text: str) -> Optional[Constraint]:
+    if text.strip() in ("", ">= 0"):
+        return ANY
+    comparators: List[Comparator] = []
+    for requirement in text.split(","):
+        match = _GEM_OPERATOR.match(requirement.strip())
+        if not match:
+            return None
+        operator, version = match.groups()
+        key = _gem_key(version)
+        if key is None:
+            return None
+        if operator == "~>":
+            # ~> 2.1 means >= 2.1, < 3; ~> 2.1.3 means >= 2.1.3, < 2.2
+            release = [int(s) for s in re.findall(r"\d+|[a-zA-Z]+", version.replace("-", ".pre.")) if s.isdigit()]
+            release = release[:-1] if len(release) > 1 else release
+            release[-1] += 1
+            comparators.extend([(">=", key), ("<", _gem_key(".".join(map(str, release)) + ".a"))])
+        else:
+            comparators.append(({None: "==", "=": "=="}.get(operator, operator), key))
+    return (tuple(comparators),)
+
+
+# ---------------------------
+# Fallback for ecosystems without a dedicated scheme
+# ---------------------------
+def _generic_key(text: str) -> Optional[VersionKey]:
+    """Numeric parts compare numerically and a release sorts after its pre-releases"""
+    tokens = re.findall(r"\d+|[a-z]+", text.strip().lower().lstrip("v"))
+    if not tokens or not tokens[0].isdigit():
+        return None
+    release: List[int] = []
+    while tokens and tokens[0].isdigit():
+        release.append(int(tokens.pop(0)))
+    while release and release[-1] == 0:
+        release.pop()
+    suffix = [(2, int(token), "") if token.isdigit() else (0, 0, token) for token in tokens]
+    suffix.append((1, 0, ""))
+    return tuple(release), tuple(suffix)
+
+
+_SCHEMES: Dict[Optional[DependencyType], _Scheme] = {
+    DependencyType.NPM: _Scheme(_semver_key, _npm_constraint),
+    DependencyType.CARGO: _Scheme(_semver_key, _cargo_constraint),
+    DependencyType.GO: _Scheme(_go_key, _exact_constraint(_go_key)),
+    DependencyType.PIP: _Scheme(_pep440_key, _pep440_constraint),
+    DependencyType.MAVEN: _Scheme(_maven_key, _maven_constraint),
+    DependencyType.GRADLE: _Scheme(_maven_key, _maven_constraint),
+    DependencyType.COMPOSER: _Scheme(_composer_key, _composer_constraint),
+    DependencyType.GEM: _Scheme(_gem_key, _gem_constraint),
+}
+_GENERIC = _Scheme(_generic_key, _exact_constraint(_generic_key))
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+@lru_cache(maxsize=_INTERN_SIZE)
+def parse_version(ecosystem: Optional[DependencyType], version: str) -> Optional[VersionKey]:
+    """Comparable key for a version in the ecosystem's scheme, or None if it is not a version"""
+    return _SCHEMES.get(ecosystem, _GENERIC).key(version)
+
+
+@lru_cache(maxsize=_INTERN_SIZE)
+def parse_constraint(ecosystem: Optional[DependencyType], constraint: str) -> Optional[Constraint]:
+    """Parsed version requirement, or None for specs we cannot evaluate (git URLs, dist-tags, ...)"""
+    return _SCHEMES.get(ecosystem, _GENERIC).constraint(constraint)
+
+
+def satisfies(ecosystem: Optional[DependencyType], version: str, constraint: str) -> Optional[bool]:
+    """Whether version meets constraint; None when either cannot be parsed"""
+    key = parse_version(ecosystem, version)
+    parsed = parse_constraint(ecosystem, constraint)
+    if key is None or parsed is None:
+        return None
+    return _matches(key, parsed)
+
+
+def is_outdated(
+    ecosystem: Optional[DependencyType], current_version: str, constraint: Optional[str], latest_version: str
+) -> bool:
+    """A range is outdated when the latest release falls outside it; a pin when it is older than latest"""
+    latest = parse_version(ecosystem, latest_version)
+    if latest is None:
+        return False
+    current = parse_version(ecosystem, current_version)
+    parsed = parse_constraint(ecosystem, constraint) if constraint is not None else None
+    if parsed is not None and not _is_pin(parsed):
+        return not _matches(latest, parsed) and (current is None or current < latest)
+    return current is not None and current < latest
+
+
+def base_version(constraint: str) -> Optional[str]:
+    """The first concrete version named in a constraint ("^1.2.3" -> "1.2.3", "==1.2.*" -> "1.2")"""
+    match = re.search(r"\d[\w.\-+*]*", constraint)
+    if not match:
+        return None
+    return re.sub(r"\.[xX*](\..*)?$", "", match.group(0)).rstrip(".")
+
+
+def _is_pin(constraint: Constraint) -> bool:
+    return len(constraint) == 1 and len(constraint[0]) == 1 and constraint[0][0][0] == "=="
+
+
+def _matches(key: VersionKey, constraint: Constraint) -> bool:
+    return any(all(_compare(key, operator, bound) for operator, bound in comparators) for comparators in constraint)
+
+
+def _compare(key: VersionKey, operator: str, bound: Any) -> bool:
+    if operator == "==":
+        return key == bound
+    if operator == "!=":
+        return key != bound
+    if operator == "<":
+        return key < bound
+    if operator == "<=":
+        return key <= bound
+    if operator == ">":
+        return key > bound
+    if operator == ">=":
+        return key >= bound
+    if operator == "!in":
+        return not (bound[0] <= key < bound[1])
+    raise ValueError(f"Unknown version operator {operator!r}")
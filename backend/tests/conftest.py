@@ -0,0 +1,109 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Point the app at a throwaway database before anything imports src.database
+_DATABASE_DIR = tempfile.mkdtemp(prefix="releaseradar-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DATABASE_DIR}/test.db")
+
+Handler = Callable[[Request], Response]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database():
+    """Create the schema; pooled connections are closed afterwards, as each test has its own event loop"""
+    from src.database import close_db, init_db
+
+    await init_db()
+    yield
+    await close_db()
+
+
+class FakeRegistry:
+    """Serves canned registry responses by path on a loopback port, recording every request"""
+
+    def __init__(self):
+        self.url = ""
+        self.routes: Dict[str, Union[Response, Handler]] = {}
+        self.requests: List[Request] = []
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, path: str, body: Any = None, status: int = 200, text: Optional[str] = None) -> None:
+        """Answer GET /<path> with JSON `body`, raw `text`, or an empty response with `status`"""
+        if text is not None:
+            self.routes[path] = Response(text, status_code=status)
+        elif body is not None:
+            self.routes[path] = JSONResponse(body, status_code=status)
+        else:
+            self.routes[path] = Response(status_code=status)
+
+    def add_handler(self, path: str, handler: Handler) -> None:
+        self.routes[path] = handler
+
+    def paths(self) -> List[str]:
+        return [request.url.path.lstrip("/") for request in self.requests]
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.requests.clear()
+
+    def start(self) -> None:
+        async def serve(request: Request) -> Response:
+            self.requests.append(request)
+            route = self.routes.get(request.path_params["path"])
+            if route is None:
+                return JSONResponse({"error": "not found"}, status_code=404)
+            return route(request) if callable(route) and not isinstance(route, Response) else route
+
+        app = Starlette(routes=[Route("/{path:path}", serve)])
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False, lifespan="off"))
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self._server.serve(sockets=[sock]),), name="fake-registry", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake registry did not start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+@pytest.fixture(scope="session")
+def _registry_server():
+    registry = FakeRegistry()
+    registry.start()
+    yield registry
+    registry.stop()
+
+
+@pytest.fixture
+def registry(_registry_server):
+    _registry_server.reset()
+    yield _registry_server
+    _registry_server.reset()
@@ -0,0 +1,348 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.schemas import DependencyType, SeverityLevel, VulnerabilityInfo
+from src import config
+from src.utils.analysis import (
+    AnalysisPipeline,
+    RepositoryContext,
+    _stored_results,
+    analysis_options,
+    dependency_key,
+)
+from src.utils.analysis_store import StoredAnalysis
+from src.utils.github import RepoSnapshot
+from src.utils.scheduler import RegistryScheduler
+
+pytestmark = pytest.mark.anyio
+
+OPTIONS = analysis_options(include_dev=True, check_vulnerabilities=True)
+
+
+class FakeDriver:
+    def __init__(self, latest, failing=()):
+        self.latest = latest
+        self.failing = set(failing)
+
+    async def check_outdated(self, name, version, constraint=None):
+        if name in self.failing:
+            raise ConnectionError(f"registry unavailable for {name}")
+        return {"latest_version": self.latest[name], "is_outdated": self.latest[name] != version}
+
+
+class FakeAnalyzer:
+    def __init__(self, driver, vulnerabilities=None, osv_down=False):
+        self.drivers = {DependencyType.NPM: driver}
+        self.scheduler = RegistryScheduler()
+        self.vulnerabilities = vulnerabilities or {}
+        self.osv_down = osv_down
+        self.queries = []
+
+    async def check_vulnerabilities_batch(self, queries):
+        self.queries.extend(name for name, _, _ in queries)
+        if self.osv_down:
+            return [None for _ in queries]
+        return [self.vulnerabilities.get(name, []) for name, _, _ in queries]
+
+
+def npm(name, version, transitive=False, **extra):
+    return {"name": name, "version": version, "type": DependencyType.NPM, "transitive": transitive,
+            "manifest_path": "package.json", **extra}
+
+
+def pipeline(analyzer):
+    return AnalysisPipeline(github_service=None, analyzer=analyzer, store=None)
+
+
+def advisory(vuln_id):
+    return VulnerabilityInfo(id=vuln_id, summary="", severity=SeverityLevel.HIGH, published_at="2024-01-01")
+
+
+async def test_failed_registry_check_is_unchecked_and_still_queried_for_vulnerabilities():
+    analyzer = FakeAnalyzer(
+        FakeDriver({"react": "18.0.0", "lodash": "4.17.21"}, failing={"lodash"}),
+        vulnerabilities={"lodash": [advisory("GHSA-lodash")]},
+    )
+    analyzed, checked = await pipeline(analyzer).check_dependencies([npm("react", "18.0.0"), npm("lodash", "4.17.0")])
+
+    react, lodash = analyzed
+    assert not react.check_failed and not react.is_outdated
+    assert lodash.check_failed and not lodash.is_outdated
+    assert [v.id for v in lodash.vulnerabilities] == ["GHSA-lodash"]
+    assert analyzer.queries == ["lodash"]
+
+
+async def test_osv_outage_marks_queried_dependencies_unchecked():
+    analyzer = FakeAnalyzer(FakeDriver({"react": "18.2.0"}), osv_down=True)
+    deps = [npm("react", "18.0.0"), npm("scheduler", "0.23.0", transitive=True)]
+    analyzed, _ = await pipeline(analyzer).check_dependencies(deps)
+
+    assert all(dep.check_failed and not dep.vulnerabilities for dep in analyzed)
+    response = pipeline(analyzer).summarize({"name": "app", "owner": {"login": "acme"}}, analyzed)
+    # Unchecked transitive packages are listed rather than counted as clean
+    assert response.unchecked_dependencies == 2
+    assert {dep.name for dep in response.dependencies} == {"react", "scheduler"}
+
+
+async def test_failed_results_are_neither_persisted_nor_reused():
+    analyzer = FakeAnalyzer(FakeDriver({"react": "18.2.0", "lodash": "4.17.21"}, failing={"lodash"}), osv_down=True)
+    deps = [npm("react", "18.2.0"), npm("lodash", "4.17.0"), npm("scheduler", "0.23.0", transitive=True)]
+    analyzed, checked = await pipeline(analyzer).check_dependencies(deps)
+    response = pipeline(analyzer).summarize({"name": "app", "owner": {"login": "acme"}}, analyzed)
+
+    assert set(_stored_results(checked)) == {dependency_key(deps[0])}
+
+    stored = StoredAnalysis(
+        repo_id=1,
+        analyzed_at=datetime.utcnow(),
+        options=OPTIONS,
+        manifest_shas={"package.json": "abc"},
+        dependencies_by_manifest={"package.json": deps},
+        response=response,
+    )
+    reusable = pipeline(analyzer)._reusable_results(stored, OPTIONS)
+    assert set(reusable) == {dependency_key(deps[0])}
+
+
+class FakeStore:
+    def __init__(self):
+        self.saved = {}
+
+    async def save(self, repo_link, repo_info, languages, branch, options, manifests, dependencies, response):
+        self.saved[repo_link] = dependencies
+
+
+class BulkPipeline(AnalysisPipeline):
+    """Serves prepared repositories instead of fetching them from GitHub"""
+
+    def __init__(self, analyzer, repositories):
+        super().__init__(github_service=None, analyzer=analyzer, store=FakeStore())
+        self.repositories = repositories
+
+    async def collect(self, owner, repo, branch=None, include_dev=True, check_vulnerabilities=True, report=True):
+        dependencies = self.repositories[repo]
+        return RepositoryContext(
+            owner, repo, "main", {"name": repo, "owner": {"login": owner}}, {}, f"https://github.com/{owner}/{repo}",
+            OPTIONS, all_dependencies=dependencies, dependencies=dependencies,
+        )
+
+
+async def test_bulk_results_keep_each_repositorys_own_provenance():
+    analyzer = FakeAnalyzer(
+        FakeDriver({"lodash": "4.17.21", "react": "18.2.0"}),
+        vulnerabilities={"lodash": [advisory("GHSA-lodash")]},
+    )
+    pipeline = BulkPipeline(analyzer, {
+        "web": [npm("react", "18.2.0"), npm("lodash", "4.17.0", transitive=True, introduced_by="react-utils")],
+        "api": [npm("lodash", "4.17.0", is_dev=True)],
+    })
+    deadlines = []
+    gather = analyzer.scheduler.gather
+
+    async def record_deadline(coros, deadline=config.ANALYSIS_DEADLINE):
+        deadlines.append(deadline)
+        return await gather(coros, deadline=deadline)
+
+    analyzer.scheduler.gather = record_deadline
+    response = await pipeline.analyze_many([("acme", "web", None), ("acme", "api", None)])
+
+    web, api = response.repositories
+    [web_lodash] = [dep for dep in web.dependencies if dep.name == "lodash"]
+    [api_lodash] = api.dependencies
+    assert web_lodash.is_transitive and web_lodash.introduced_by == "react-utils" and not web_lodash.is_outdated
+    # Declared directly in "api", so it gets its own registry check rather than the transitive result
+    assert not api_lodash.is_transitive and api_lodash.introduced_by is None and api_lodash.is_outdated
+    assert [v.id for v in web_lodash.vulnerabilities] == [v.id for v in api_lodash.vulnerabilities] == ["GHSA-lodash"]
+    assert response.unique_dependencies == 2
+    assert [dep["is_dev"] for dep in pipeline.store.saved["https://github.com/acme/api"]] == [True]
+    assert deadlines == [config.ANALYSIS_DEADLINE * 2]
+
+
+class FakeGitHub:
+    graphql_enabled = True
+
+    def __init__(self, tree, blobs, html_url):
+        self.tree = tree
+        self.blobs = blobs
+        self.html_url = html_url
+        self.snapshot_shas = []
+
+    async def get_tree(self, owner, repo, branch, recursive=True):
+        return {"tree": [{"type": "blob", "path": path, "sha": sha} for path, sha in self.tree.items()]}
+
+    async def get_repo_snapshot(self, owner, repo, blob_shas=()):
+        self.snapshot_shas.append(list(blob_shas))
+        repo_info = {"name": repo, "owner": {"login": owner}, "default_branch": "main", "html_url": self.html_url}
+        return RepoSnapshot(repo_info, {}, {sha: self.blobs[sha] for sha in blob_shas})
+
+    async def get_blob(self, owner, repo, sha):
+        raise AssertionError(f"Blob {sha} should have come with the snapshot")
+
+
+class ParsingAnalyzer(FakeAnalyzer):
+    async def parse_manifest(self, filename, content, include_dev=True):
+        name, _, version = content.strip().partition("==")
+        return [{"name": name, "version": version, "type": DependencyType.PIP}]
+
+
+class LoadingStore:
+    def __init__(self, analyses):
+        self.analyses = analyses
+        self.loaded = []
+
+    async def load(self, repo_link):
+        self.loaded.append(repo_link)
+        return self.analyses.get(repo_link)
+
+
+@pytest.mark.parametrize("html_url", ["https://github.com/acme/web", "https://github.com/Acme/Web"])
+async def test_graphql_snapshot_only_requests_blobs_changed_since_the_stored_analysis(html_url):
+    github = FakeGitHub(
+        tree={"package.json": "sha-unchanged", "api/requirements.txt": "sha-new"},
+        blobs={"sha-new": "requests==2.31.0", "sha-unchanged": "{}"},
+        html_url=html_url,
+    )
+    stored = StoredAnalysis(
+        repo_id=1,
+        analyzed_at=datetime.utcnow(),
+        options=OPTIONS,
+        manifest_shas={"package.json": "sha-unchanged", "api/requirements.txt": "sha-old"},
+        dependencies_by_manifest={"package.json": [npm("react", "18.2.0")]},
+    )
+    store = LoadingStore({html_url: stored})
+    pipeline = AnalysisPipeline(github, ParsingAnalyzer(FakeDriver({})), store)
+
+    context = await pipeline.collect("acme", "web")
+
+    if html_url == "https://github.com/acme/web":
+        assert github.snapshot_shas == [["sha-new"]]
+        assert store.loaded == [html_url]
+    else:
+        # Stored under the canonical URL: unknown until the snapshot answers, then reloaded
+        assert github.snapshot_shas == [["sha-unchanged", "sha-new"]]
+        assert store.loaded == ["https://github.com/acme/web", html_url]
+    assert sorted(dep["name"] for dep in context.dependencies) == ["react", "requests"]
+
+
+class NpmAnalyzer(FakeAnalyzer):
+    async def parse_manifest(self, filename, content, include_dev=True):
+        return [
+            {"name": name, "version": constraint.lstrip("^~"), "constraint": constraint,
+             "type": DependencyType.NPM, "is_dev": False}
+            for name, constraint in json.loads(content).get("dependencies", {}).items()
+        ]
+
+
+async def test_changed_manifest_keeps_the_pins_of_its_unchanged_lockfile():
+    lockfile = json.dumps({"lockfileVersion": 3, "packages": {
+        "": {"dependencies": {"lodash": "^4.17.0"}},
+        "node_modules/lodash": {"version": "4.17.15"},
+    }})
+    manifest = {"dependencies": {"lodash": "^4.17.0"}}
+    github = FakeGitHub(
+        tree={"package.json": "sha-manifest", "package-lock.json": "sha-lock"},
+        blobs={"sha-manifest": json.dumps(manifest), "sha-lock": lockfile},
+        html_url="https://github.com/acme/web",
+    )
+    pipeline = AnalysisPipeline(github, NpmAnalyzer(FakeDriver({})), LoadingStore({}))
+    first = await pipeline.collect("acme", "web")
+    assert [(dep["name"], dep["version"]) for dep in first.dependencies] == [("lodash", "4.17.15")]
+
+    by_manifest = {}
+    for dep in first.all_dependencies:
+        by_manifest.setdefault(dep["manifest_path"], []).append(dep)
+    stored = StoredAnalysis(
+        repo_id=1,
+        analyzed_at=datetime.utcnow(),
+        options=OPTIONS,
+        manifest_shas=dict(github.tree),
+        dependencies_by_manifest=by_manifest,
+    )
+    # Only package.json's scripts changed; package-lock.json is the same blob
+    github.tree["package.json"] = "sha-manifest-2"
+    github.blobs["sha-manifest-2"] = json.dumps({**manifest, "scripts": {"test": "jest"}})
+    pipeline.store = LoadingStore({"https://github.com/acme/web": stored})
+
+    second = await pipeline.collect("acme", "web")
+
+    assert [(dep["name"], dep["version"]) for dep in second.dependencies] == [("lodash", "4.17.15")]
+    assert github.snapshot_shas[-1] == ["sha-manifest-2", "sha-lock"]
+
+
+async def test_lockfile_pinned_versions_are_queried_for_vulnerabilities_even_within_range():
+    lockfile = json.dumps({"lockfileVersion": 3, "packages": {
+        "": {"dependencies": {"lodash": "^4.17.0"}},
+        "node_modules/lodash": {"version": "4.17.15"},
+    }})
+    manifests = [
+        {"path": "package.json", "content": json.dumps({"dependencies": {"lodash": "^4.17.0"}})},
+        {"path": "package-lock.json", "content": lockfile},
+        {"path": "tools/package.json", "content": json.dumps({"dependencies": {"react": "^18.0.0"}})},
+    ]
+    analyzer = NpmAnalyzer(
+        FakeDriver({"lodash": "4.17.15", "react": "18.0.0"}),
+        vulnerabilities={"lodash": [advisory("GHSA-lodash")], "react": [advisory("GHSA-react")]},
+    )
+    deps = await pipeline(analyzer).parse_manifests(manifests)
+    analyzed, _ = await pipeline(analyzer).check_dependencies(deps)
+
+    lodash, react = sorted(analyzed, key=lambda dep: dep.name)
+    assert not lodash.is_outdated and [v.id for v in lodash.vulnerabilities] == ["GHSA-lodash"]
+    # A range's version is only its floor: not queried unless outdated
+    assert not react.is_outdated and not react.vulnerabilities
+    assert analyzer.queries == ["lodash"]
+
+
+class TreeGitHub:
+    """Git Trees API over a flat path -> sha map; recursive listings of `truncated` refs come back partial"""
+
+    def __init__(self, files, truncated=()):
+        self.files = files
+        self.truncated = set(truncated)
+        self.calls = []
+
+    async def get_tree(self, owner, repo, ref, recursive=True):
+        self.calls.append((ref, recursive))
+        # Subtrees are listed by SHA; here a subtree's SHA is "tree:<its path>"
+        prefix = "" if ref == "main" else ref.removeprefix("tree:") + "/"
+        paths = {path[len(prefix):]: sha for path, sha in self.files.items() if path.startswith(prefix)}
+        if recursive:
+            entries = [{"type": "blob", "path": path, "sha": sha} for path, sha in paths.items()]
+            if ref in self.truncated:
+                return {"tree": entries[:1], "truncated": True}
+            return {"tree": entries, "truncated": False}
+        directories = {path.split("/", 1)[0] for path in paths if "/" in path}
+        return {"tree": [
+            *({"type": "blob", "path": path, "sha": sha} for path, sha in paths.items() if "/" not in path),
+            *({"type": "tree", "path": name, "sha": f"tree:{prefix}{name}"} for name in sorted(directories)),
+        ], "truncated": False}
+
+
+async def test_truncated_tree_listing_is_completed_by_walking_subtrees():
+    github = TreeGitHub(
+        {
+            "package.json": "sha-root",
+            "apps/web/package.json": "sha-web",
+            "apps/web/node_modules/left-pad/package.json": "sha-vendored",
+            "apps/README.md": "sha-readme",
+            "libs/core/Cargo.toml": "sha-core",
+            "node_modules/left-pad/package.json": "sha-hoisted",
+        },
+        truncated={"main", "tree:apps"},
+    )
+    discovered = await AnalysisPipeline(github, FakeAnalyzer(FakeDriver({})), None).discover_manifests("acme", "mono", "main")
+
+    assert sorted((m["path"], m["sha"]) for m in discovered) == [
+        ("apps/web/package.json", "sha-web"),
+        ("libs/core/Cargo.toml", "sha-core"),
+        ("package.json", "sha-root"),
+    ]
+    # Vendored directories are never listed
+    assert sorted(github.calls) == [
+        ("main", False), ("main", True),
+        ("tree:apps", False), ("tree:apps", True),
+        ("tree:apps/web", True),
+        ("tree:libs", True),
+    ]
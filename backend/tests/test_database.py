@@ -0,0 +1,32 @@
+from sqlalchemy import create_engine, inspect, text
+
+import src.models  # noqa: F401  Registers the tables on Base.metadata
+from src.database import _add_missing_columns
+
+
+def test_missing_columns_are_added_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # The dependencies table as it was before constraints, provenance and dev flags were stored
+        connection.exec_driver_sql(
+            "CREATE TABLE dependencies (id INTEGER PRIMARY KEY, repo_id INTEGER, name VARCHAR, "
+            "version VARCHAR, latest_version VARCHAR, author VARCHAR, outdated BOOLEAN, "
+            "dependency_type VARCHAR, manifest_path VARCHAR)"
+        )
+        connection.exec_driver_sql("INSERT INTO dependencies (repo_id, name, version) VALUES (1, 'react', '18.0.0')")
+
+    with engine.begin() as connection:
+        _add_missing_columns(connection)
+    with engine.begin() as connection:
+        # Running again finds nothing left to add
+        _add_missing_columns(connection)
+        columns = {column["name"] for column in inspect(connection).get_columns("dependencies")}
+        row = connection.execute(
+            text("SELECT name, version_constraint, is_dev, is_transitive, is_locked, introduced_by FROM dependencies")
+        ).one()
+        tables = set(inspect(connection).get_table_names())
+
+    assert {"version_constraint", "is_dev", "is_transitive", "is_locked", "introduced_by"} <= columns
+    assert tuple(row) == ("react", None, False, False, False, None)
+    # Only existing tables are altered; creating new ones is left to create_all
+    assert tables == {"dependencies"}
@@ -0,0 +1,259 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from starlette.responses import JSONResponse
+
+from src.utils.ecosystems import (
+    CargoDriver,
+    ComposerDriver,
+    GemDriver,
+    GoDriver,
+    MavenDriver,
+    NpmDriver,
+    PyPIDriver,
+)
+from src.utils.http_client import HTTPClientPool
+from src.utils.registry_cache import RegistryCache
+from src.utils.scheduler import RegistryScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def make_driver(registry, database):
+    """Drivers pointed at the fake registry, each under its own path prefix, with caching disabled"""
+    pool = HTTPClientPool()
+
+    def make(driver_class, prefix):
+        return driver_class(
+            f"{registry.url}/{prefix}",
+            pool,
+            RegistryScheduler(max_attempts=2, base_delay=0.01),
+            RegistryCache(ttl=0, stale_ttl=0),
+        )
+
+    yield make
+    await pool.aclose()
+
+
+def cargo_index(*releases):
+    return "\n".join(json.dumps({"name": "crate", "vers": vers, "yanked": yanked}) for vers, yanked in releases)
+
+
+# ---------------------------
+# npm
+# ---------------------------
+async def test_npm_reads_the_latest_dist_tag(registry, make_driver):
+    registry.add("npm/left-pad/latest", {"version": "1.3.0", "description": "pad"})
+    driver = make_driver(NpmDriver, "npm")
+
+    result = await driver.check_outdated("left-pad", "1.1.0", "^1.1.0")
+
+    assert result["latest_version"] == "1.3.0"
+    assert not result["is_outdated"]  # Still within ^1.1.0
+    assert (await driver.check_outdated("left-pad", "0.9.0", "~0.9.0"))["is_outdated"]
+
+
+async def test_npm_scoped_package_falls_back_to_the_packument_and_ignores_prerelease_tags(registry, make_driver):
+    registry.add(
+        "npm/@acme/widgets",
+        {"name": "@acme/widgets", "dist-tags": {"latest": "2.4.0", "next": "3.0.0-rc.1"}, "versions": {}},
+    )
+    driver = make_driver(NpmDriver, "npm")
+
+    result = await driver.check_outdated("@acme/widgets", "2.0.0", "^2.0.0")
+
+    assert result == {**result, "latest_version": "2.4.0", "is_outdated": False}
+    assert registry.paths() == ["npm/@acme/widgets/latest", "npm/@acme/widgets"]
+
+
+async def test_npm_unknown_package_is_not_outdated(registry, make_driver):
+    driver = make_driver(NpmDriver, "npm")
+
+    assert await driver.check_outdated("no-such-package", "1.0.0") == {"latest_version": "1.0.0", "is_outdated": False}
+
+
+async def test_npm_server_error_propagates_after_retries(registry, make_driver):
+    registry.add("npm/flaky/latest", status=503)
+    driver = make_driver(NpmDriver, "npm")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await driver.check_outdated("flaky", "1.0.0")
+    assert registry.paths() == ["npm/flaky/latest"] * 2
+
+
+# ---------------------------
+# PyPI
+# ---------------------------
+async def test_pypi_reads_info_version(registry, make_driver):
+    registry.add("pypi/pypi/requests/json", {"info": {"version": "2.32.3", "summary": "HTTP for Humans."}})
+    driver = make_driver(PyPIDriver, "pypi")
+
+    result = await driver.check_outdated("requests", "2.28.0", "==2.28.0")
+
+    assert result["latest_version"] == "2.32.3"
+    assert result["is_outdated"]
+    assert result["description"] == "HTTP for Humans."
+    assert not (await driver.check_outdated("requests", "2.32.0", "==2.32.*"))["is_outdated"]
+
+
+async def test_pypi_malformed_response_propagates(registry, make_driver):
+    registry.add("pypi/pypi/broken/json", text="<html>maintenance</html>")
+    driver = make_driver(PyPIDriver, "pypi")
+
+    with pytest.raises(ValueError):
+        await driver.check_outdated("broken", "1.0.0")
+
+
+# ---------------------------
+# Go
+# ---------------------------
+async def test_go_escapes_upper_case_module_paths(registry, make_driver):
+    registry.add("go/github.com/!azure/go-autorest/@latest", {"Version": "v14.2.0+incompatible"})
+    driver = make_driver(GoDriver, "go")
+
+    result = await driver.check_outdated("github.com/Azure/go-autorest", "v14.0.0+incompatible")
+
+    assert result["latest_version"] == "v14.2.0+incompatible"
+    assert result["is_outdated"]
+
+
+async def test_go_gone_module_is_not_outdated_but_server_errors_propagate(registry, make_driver):
+    registry.add("go/example.com/gone/@latest", status=410)
+    registry.add("go/example.com/down/@latest", status=500)
+    driver = make_driver(GoDriver, "go")
+
+    assert not (await driver.check_outdated("example.com/gone", "v1.0.0"))["is_outdated"]
+    with pytest.raises(httpx.HTTPStatusError):
+        await driver.check_outdated("example.com/down", "v1.0.0")
+
+
+# ---------------------------
+# RubyGems
+# ---------------------------
+async def test_gem_reads_the_gem_version(registry, make_driver):
+    registry.add("gem/api/v1/gems/rails.json", {"version": "7.1.3", "info": "Full-stack web framework"})
+    driver = make_driver(GemDriver, "gem")
+
+    assert not (await driver.check_outdated("rails", "7.1", "~> 7.1"))["is_outdated"]
+    result = await driver.check_outdated("rails", "6.1", "~> 6.1")
+    assert result["latest_version"] == "7.1.3"
+    assert result["is_outdated"]
+
+
+async def test_gem_server_error_propagates(registry, make_driver):
+    registry.add("gem/api/v1/gems/sinatra.json", status=502)
+    driver = make_driver(GemDriver, "gem")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await driver.check_outdated("sinatra", "3.0.0")
+
+
+# ---------------------------
+# Cargo
+# ---------------------------
+async def test_cargo_picks_the_newest_stable_unyanked_release(registry, make_driver):
+    registry.add(
+        "cargo/se/rd/serde",
+        text=cargo_index(("1.0.100", False), ("1.0.200", False), ("1.0.201", True), ("2.0.0-alpha.1", False)),
+    )
+    driver = make_driver(CargoDriver, "cargo")
+
+    result = await driver.check_outdated("serde", "1.0.100", "=1.0.100")
+
+    assert result["latest_version"] == "1.0.200"
+    assert result["is_outdated"]
+
+
+async def test_cargo_falls_back_to_prereleases_when_nothing_is_stable(registry, make_driver):
+    registry.add("cargo/3/n/new", text=cargo_index(("0.1.0-alpha.1", False), ("0.1.0-beta.2", False)))
+    driver = make_driver(CargoDriver, "cargo")
+
+    assert (await driver.check_outdated("new", "0.1.0-alpha.1", "=0.1.0-alpha.1"))["latest_version"] == "0.1.0-beta.2"
+
+
+async def test_cargo_server_error_propagates(registry, make_driver):
+    registry.add("cargo/2/ab", status=500)
+    driver = make_driver(CargoDriver, "cargo")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await driver.check_outdated("ab", "1.0.0")
+
+
+# ---------------------------
+# Composer
+# ---------------------------
+async def test_composer_skips_unstable_releases(registry, make_driver):
+    registry.add(
+        "composer/p2/monolog/monolog.json",
+        {"packages": {"monolog/monolog": [
+            {"version": "4.0.0-RC1", "version_normalized": "4.0.0.0-RC1", "description": "Logging"},
+            {"version": "3.7.0", "version_normalized": "3.7.0.0"},
+            {"version": "v3.6.0", "version_normalized": "3.6.0.0"},
+        ]}},
+    )
+    driver = make_driver(ComposerDriver, "composer")
+
+    result = await driver.check_outdated("monolog/monolog", "2.9.0", "^2.9")
+
+    assert result["latest_version"] == "3.7.0"
+    assert result["is_outdated"]
+    assert result["description"] == "Logging"
+
+
+async def test_composer_platform_requirements_are_never_looked_up(registry, make_driver):
+    driver = make_driver(ComposerDriver, "composer")
+
+    assert not (await driver.check_outdated("php", "8.1", ">=8.1"))["is_outdated"]
+    assert registry.paths() == []
+
+
+async def test_composer_server_error_propagates(registry, make_driver):
+    registry.add("composer/p2/acme/down.json", status=500)
+    driver = make_driver(ComposerDriver, "composer")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await driver.check_outdated("acme/down", "1.0.0")
+
+
+# ---------------------------
+# Maven
+# ---------------------------
+async def test_maven_resolves_concurrent_lookups_in_one_search_query(registry, make_driver):
+    def search(request):
+        # Every coordinate is OR-ed into a single Solr query
+        assert 'g:"com.google.guava" AND a:"guava"' in request.query_params["q"]
+        assert 'g:"junit" AND a:"junit"' in request.query_params["q"]
+        return JSONResponse({"response": {"docs": [
+            {"g": "com.google.guava", "a": "guava", "latestVersion": "33.2.1-jre"},
+            {"g": "junit", "a": "junit", "latestVersion": "4.13.2"},
+        ]}})
+
+    registry.add_handler("maven/solrsearch/select", search)
+    driver = make_driver(MavenDriver, "maven")
+
+    guava, junit, missing = await asyncio.gather(
+        driver.check_outdated("com.google.guava:guava", "31.0-jre"),
+        driver.check_outdated("junit:junit", "4.13.2"),
+        driver.check_outdated("org.example:missing", "1.0"),
+    )
+
+    assert guava["latest_version"] == "33.2.1-jre" and guava["is_outdated"]
+    assert junit["latest_version"] == "4.13.2" and not junit["is_outdated"]
+    assert missing == {"latest_version": "1.0", "is_outdated": False}
+    assert registry.paths() == ["maven/solrsearch/select"]
+
+
+async def test_maven_search_failure_propagates_to_every_lookup_in_the_batch(registry, make_driver):
+    registry.add("maven/solrsearch/select", status=500)
+    driver = make_driver(MavenDriver, "maven")
+
+    results = await asyncio.gather(
+        driver.check_outdated("org.example:one", "1.0"),
+        driver.check_outdated("org.example:two", "1.0"),
+        return_exceptions=True,
+    )
+
+    assert [type(result) for result in results] == [httpx.HTTPStatusError, httpx.HTTPStatusError]
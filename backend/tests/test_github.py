@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+
+from src.utils.github import GitHubService
+from src.utils.http_client import HTTPClientPool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def github(registry):
+    """GitHubService pointed at the fake registry, standing in for api.github.com"""
+    service = GitHubService(http_pool=HTTPClientPool())
+    service.base_url = registry.url
+    yield service
+    await service.http_pool.aclose()
+
+
+async def test_tree_of_an_unknown_branch_is_a_404(registry, github):
+    registry.add("repos/acme/web/git/trees/no-such-branch", {"message": "Not Found"}, status=404)
+
+    with pytest.raises(HTTPException) as error:
+        await github.get_tree("acme", "web", "no-such-branch")
+    assert error.value.status_code == 404
+
+
+async def test_tree_of_an_empty_repository_is_empty(registry, github):
+    registry.add("repos/acme/empty/git/trees/HEAD", {"message": "Git Repository is empty."}, status=409)
+
+    assert await github.get_tree("acme", "empty", "HEAD") == {"sha": None, "tree": [], "truncated": False}
+
+
+async def test_tree_is_listed_recursively_unless_asked_for_one_level(registry, github):
+    registry.add("repos/acme/web/git/trees/main", {"sha": "abc", "tree": [], "truncated": False})
+
+    await github.get_tree("acme", "web", "main")
+    await github.get_tree("acme", "web", "main", recursive=False)
+
+    assert [request.url.query for request in registry.requests] == ["recursive=1", ""]
@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import pytest
+
+from src.schemas import DependencyType
+from src.utils.lockfiles import parse_lockfile
+
+FIXTURES = Path(__file__).parent / "fixtures" / "lockfiles"
+
+
+def parse(fixture, filename, dependency_type=DependencyType.NPM, direct=(), dev=()):
+    """Locked packages of a fixture as (name, version) -> (transitive, introduced_by, is_dev)"""
+    manifest = [{"name": name, "type": dependency_type} for name in direct]
+    manifest += [{"name": name, "type": dependency_type, "is_dev": True} for name in dev]
+    deps = parse_lockfile(filename, (FIXTURES / fixture).read_text(), manifest)
+    assert all(dep["type"] == dependency_type and dep["locked"] for dep in deps)
+    return {(dep["name"], dep["version"]): (dep["transitive"], dep["introduced_by"], dep["is_dev"]) for dep in deps}
+
+
+def test_npm_v1_resolves_nested_scopes_and_takes_direct_dependencies_from_the_manifest():
+    assert parse("npm-v1.package-lock.json", "package-lock.json", direct=["express"], dev=["jest"]) == {
+        ("express", "4.18.2"): (False, None, False),
+        ("jest", "29.7.0"): (False, None, True),
+        ("debug", "2.6.9"): (True, "express", False),
+        # debug's own nested copy shadows the hoisted one
+        ("ms", "2.0.0"): (True, "express", False),
+        ("ms", "2.1.3"): (True, "jest", True),
+    }
+
+
+def test_npm_v2_reads_the_packages_map_over_the_legacy_dependencies():
+    assert parse("npm-v2.package-lock.json", "package-lock.json") == {("left-pad", "1.3.0"): (False, None, False)}
+
+
+def test_npm_v3_workspaces_declare_direct_dependencies_resolved_from_their_own_node_modules():
+    assert parse("npm-v3.package-lock.json", "package-lock.json") == {
+        ("react", "18.2.0"): (False, None, False),
+        ("typescript", "5.2.2"): (False, None, True),
+        # packages/ui requires lodash ^4.17.0, installed under its own node_modules
+        ("lodash", "4.17.21"): (False, None, False),
+        ("lodash", "3.10.1"): (True, "typescript", True),
+        ("loose-envify", "1.4.0"): (True, "react", False),
+        ("js-tokens", "4.0.0"): (True, "react", False),
+    }
+
+
+def test_yarn_v1_multi_spec_headers_keep_their_edges():
+    assert parse("yarn-v1.lock", "yarn.lock", direct=["@babel/code-frame", "lodash"]) == {
+        ("@babel/code-frame", "7.22.13"): (False, None, False),
+        ("@babel/highlight", "7.22.20"): (True, "@babel/code-frame", False),
+        ("chalk", "2.4.2"): (True, "@babel/code-frame", False),
+        ("js-tokens", "4.0.0"): (True, "@babel/code-frame", False),
+        ("lodash", "4.17.21"): (False, None, False),
+    }
+
+
+def test_yarn_berry_workspaces_declare_the_direct_dependencies():
+    assert parse("yarn-berry.lock", "yarn.lock") == {
+        ("@babel/code-frame", "7.22.13"): (False, None, False),
+        ("@babel/highlight", "7.22.20"): (True, "@babel/code-frame", False),
+        ("chalk", "2.4.2"): (False, None, False),  # Required by the packages/ui workspace
+    }
+
+
+@pytest.mark.parametrize("fixture", ["pnpm-v6.yaml", "pnpm-v9.yaml"])
+def test_pnpm_importers_and_snapshots(fixture):
+    expected = {
+        ("react", "18.2.0"): (False, None, False),
+        ("typescript", "5.2.2"): (False, None, True),
+        ("loose-envify", "1.4.0"): (True, "react", False),
+        ("js-tokens", "4.0.0"): (True, "react", False),
+    }
+    if fixture == "pnpm-v9.yaml":
+        # Declared by the packages/ui importer, with a peer suffix; its workspace link is skipped
+        expected[("react-dom", "18.2.0")] = (False, None, False)
+    assert parse(fixture, "pnpm-lock.yaml") == expected
+
+
+def test_poetry_lock_normalizes_names_and_reads_categories():
+    assert parse("poetry.lock", "poetry.lock", DependencyType.PIP) == {
+        ("requests", "2.31.0"): (False, None, False),
+        ("certifi", "2023.7.22"): (True, "requests", False),
+        ("charset-normalizer", "3.3.0"): (True, "requests", False),
+        ("pytest", "7.4.2"): (False, None, True),
+        ("iniconfig", "2.0.0"): (True, "pytest", True),
+    }
+
+
+def test_pipfile_lock_has_no_edges_so_every_versioned_package_is_direct():
+    assert parse("Pipfile.lock", "Pipfile.lock", DependencyType.PIP) == {
+        ("requests", "2.31.0"): (False, None, False),
+        ("urllib3", "2.0.7"): (False, None, False),
+        ("pytest", "7.4.2"): (False, None, True),
+    }
+
+
+def test_composer_lock_keeps_packages_dev_apart_and_skips_platform_requirements():
+    assert parse(
+        "composer.lock", "composer.lock", DependencyType.COMPOSER, direct=["monolog/monolog"], dev=["phpunit/phpunit"]
+    ) == {
+        ("monolog/monolog", "3.4.0"): (False, None, False),
+        ("psr/log", "3.0.0"): (True, "monolog/monolog", False),
+        ("phpunit/phpunit", "10.4.1"): (False, None, True),
+        ("sebastian/diff", "5.0.3"): (True, "phpunit/phpunit", True),
+    }
+
+
+def test_cargo_lock_roots_are_the_workspace_members_dependencies():
+    assert parse("Cargo.lock", "Cargo.lock", DependencyType.CARGO) == {
+        ("rand", "0.8.5"): (False, None, False),
+        ("serde", "1.0.188"): (False, None, False),
+        ("rand_core", "0.6.4"): (True, "rand", False),
+        ("serde_derive", "1.0.188"): (True, "serde", False),
+        # "rand 0.7.3 (registry+...)" picks the exact version of a name locked twice
+        ("rand", "0.7.3"): (True, "serde", False),
+    }
+
+
+def test_gemfile_lock_merges_platform_variants():
+    assert parse("Gemfile.lock", "Gemfile.lock", DependencyType.GEM) == {
+        ("nokogiri", "1.15.4"): (False, None, False),
+        ("rake", "13.0.6"): (False, None, False),
+        ("mini_portile2", "2.8.4"): (True, "nokogiri", False),
+        ("racc", "1.7.1"): (True, "nokogiri", False),
+    }
+
+
+def test_go_sum_skips_modules_only_consulted_for_their_go_mod():
+    assert parse("go.sum", "go.sum", DependencyType.GO, direct=["github.com/google/uuid"]) == {
+        ("github.com/google/uuid", "v1.3.0"): (False, None, False),
+        ("golang.org/x/text", "v0.13.0"): (True, None, False),
+    }
+
+
+def test_unparseable_lockfile_yields_nothing():
+    assert parse_lockfile("package-lock.json", "{not json") == []
+    assert parse_lockfile("Cargo.lock", "[[package]]\nname = ") == []
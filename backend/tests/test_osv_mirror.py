@@ -0,0 +1,60 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.schemas import DependencyType, SeverityLevel
+from src.utils.github_dependency import DependencyAnalyzer
+from src.utils.osv_mirror import OSVMirror, ingest
+
+pytestmark = pytest.mark.anyio
+
+FIXTURES = Path(__file__).parent / "fixtures" / "osv"
+
+# (query, advisory IDs expected from the fixture dump)
+CASES = [
+    (("lodash", "4.17.20", DependencyType.NPM), ["GHSA-test-lodash"]),
+    (("lodash", "4.17.21", DependencyType.NPM), []),  # Fixed; the withdrawn advisory never matches
+    (("requests", "2.28.1", DependencyType.PIP), ["PYSEC-test-requests"]),  # PyPI names are normalized
+    (("requests", "2.2.0", DependencyType.PIP), []),  # Before introduced
+    (("github.com/example/module", "v1.2.3", DependencyType.GO), ["GO-test-module"]),  # last_affected is inclusive
+    (("github.com/example/module", "v1.2.4", DependencyType.GO), []),
+    (("smallvec", "1.6.0", DependencyType.CARGO), ["RUSTSEC-test-smallvec"]),  # Enumerated versions
+    (("smallvec", "1.6.1", DependencyType.CARGO), []),
+    (("org.example:lib", "1.1.0", DependencyType.MAVEN), ["GHSA-test-maven"]),
+    (("org.example:lib", "1.5.0", DependencyType.MAVEN), []),  # Between the two affected intervals
+    (("org.example:lib", "2.0.5", DependencyType.MAVEN), ["GHSA-test-maven"]),
+    (("left-pad", "1.0.0", DependencyType.NPM), []),  # Unknown package
+]
+
+
+@pytest.fixture
+async def mirror(database, tmp_path):
+    """The fixture advisories packed like an OSV `all.zip` dump and ingested into the test database"""
+    dump = tmp_path / "all.zip"
+    with zipfile.ZipFile(dump, "w") as archive:
+        for advisory in sorted(FIXTURES.glob("*.json")):
+            archive.write(advisory, advisory.name)
+    stats = ingest([str(dump)])
+    assert stats == {"advisories": 5, "withdrawn": 1, "ranges": 6}
+    return OSVMirror()
+
+
+async def test_mirror_lookups_match_fixture_advisories(mirror):
+    ids = await mirror.query_batch([query for query, _ in CASES])
+
+    assert ids == [expected for _, expected in CASES]
+
+
+async def test_check_vulnerabilities_batch_hydrates_mirror_results(mirror):
+    analyzer = DependencyAnalyzer(osv_mirror=mirror)
+    results = await analyzer.check_vulnerabilities_batch([query for query, _ in CASES])
+
+    assert [[vuln.id for vuln in vulns] for vulns in results] == [expected for _, expected in CASES]
+    lodash = results[0][0]
+    assert lodash.severity == SeverityLevel.HIGH
+    assert lodash.patched_versions == ["4.17.21"]
+    assert lodash.references == ["https://example.com/GHSA-test-lodash"]
+    # Advisories without a summary fall back to their details
+    assert results[2][0].summary == "Proxy-Authorization header leaked on redirects"
+    await analyzer.http_pool.aclose()
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from src.utils.scheduler import WindowBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_within_the_window_share_batches_of_at_most_batch_size():
+    batches = []
+
+    async def fetch(requests):
+        batches.append(list(requests))
+        return [request * 10 for request in requests]
+
+    batcher = WindowBatcher(fetch, batch_size=3, window=0.01)
+    results = await asyncio.gather(*(batcher.get(i) for i in range(5)))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2], [3, 4]]
+    assert not batcher._tasks
+
+
+async def test_exception_results_fail_only_their_request():
+    async def fetch(requests):
+        return [ValueError(request) if request == "bad" else request for request in requests]
+
+    batcher = WindowBatcher(fetch, batch_size=10, window=0.01)
+    results = await asyncio.gather(batcher.get("good"), batcher.get("bad"), return_exceptions=True)
+
+    assert results[0] == "good"
+    assert isinstance(results[1], ValueError)
+
+
+async def test_failed_batch_fails_every_waiting_request():
+    async def fetch(requests):
+        raise RuntimeError("upstream down")
+
+    batcher = WindowBatcher(fetch, batch_size=10, window=0.01)
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.get(1), batcher.get(2), return_exceptions=True), timeout=1
+    )
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
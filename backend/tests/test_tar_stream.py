@@ -0,0 +1,123 @@
+import gzip
+import io
+import os
+import tarfile
+
+import pytest
+
+from src.utils.tar_stream import TarFormatError, extract_tarball
+
+pytestmark = pytest.mark.anyio
+
+# GitHub archives put everything under one "<owner>-<repo>-<sha>/" directory
+ROOT = "acme-web-1a2b3c4"
+DEEP = "/".join(["packages"] + [f"level-{i:02}" for i in range(12)])  # 130 characters
+
+
+def archive(members, format=tarfile.PAX_FORMAT, **options):
+    """A .tar.gz holding `members` (path -> content, None for a directory) under ROOT"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz", format=format, **options) as tar:
+        for path, content in members.items():
+            info = tarfile.TarInfo(f"{ROOT}/{path}")
+            if content is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def first_header(data):
+    return gzip.decompress(data)[:512]
+
+
+async def chunked(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def extract(data, wanted=lambda path: True, chunk_size=7, **options):
+    # Chunks far smaller than a block split every header and member across feeds
+    return await extract_tarball(chunked(data, chunk_size), wanted, strip_components=1, **options)
+
+
+MEMBERS = {
+    "packages": None,
+    "package.json": b'{"name": "web"}',
+    "empty.txt": b"",
+    "block.bin": b"x" * 512,  # Exactly one block: no padding
+    "odd.bin": b"y" * 513,  # One byte into a second block: 511 bytes of padding
+}
+
+
+@pytest.mark.parametrize("format", [tarfile.USTAR_FORMAT, tarfile.GNU_FORMAT, tarfile.PAX_FORMAT])
+async def test_members_and_padding(format):
+    files = await extract(archive(MEMBERS, format))
+
+    assert files == {path: content for path, content in MEMBERS.items() if content is not None}
+
+
+async def test_ustar_long_path_is_split_into_prefix_and_name():
+    path = f"{DEEP}/package.json"
+    data = archive({path: b"{}"}, tarfile.USTAR_FORMAT)
+    assert first_header(data)[345:500].rstrip(b"\x00")  # The prefix field is in use
+
+    assert await extract(data) == {path: b"{}"}
+
+
+async def test_gnu_long_name():
+    path = f"{DEEP}/{'very-long-name-' * 20}/Cargo.toml"
+    data = archive({path: b"[package]"}, tarfile.GNU_FORMAT)
+    assert first_header(data)[156:157] == tarfile.GNUTYPE_LONGNAME
+
+    assert await extract(data) == {path: b"[package]"}
+
+
+async def test_pax_path_and_global_header():
+    path = f"{DEEP}/{'ünïcode-' * 40}/go.mod"
+    data = archive({path: b"module x"}, tarfile.PAX_FORMAT, pax_headers={"comment": "1a2b3c4"})
+    assert first_header(data)[156:157] == tarfile.XGLTYPE
+
+    assert await extract(data) == {path: b"module x"}
+
+
+async def test_pax_size_overrides_the_header():
+    # Members past the 8 GiB ustar limit carry their size in a pax record instead
+    content = b'{"name": "web"}'
+    record = f" size={len(content)}\n"
+    record = f"{len(record) + len(str(len(record) + 2))}{record}".encode()
+    pax = tarfile.TarInfo(f"{ROOT}/PaxHeader")
+    pax.type, pax.size = tarfile.XHDTYPE, len(record)
+    member = tarfile.TarInfo(f"{ROOT}/package.json")  # Size 0 in the header itself
+    data = b"".join([
+        pax.tobuf(tarfile.USTAR_FORMAT), record.ljust(512, b"\x00"),
+        member.tobuf(tarfile.USTAR_FORMAT), content.ljust(512, b"\x00"),
+        bytes(1024),
+    ])
+
+    assert await extract(gzip.compress(data)) == {"package.json": content}
+
+
+async def test_only_wanted_members_are_kept():
+    files = await extract(archive(MEMBERS), wanted=lambda path: path.endswith(".json"))
+
+    assert files == {"package.json": b'{"name": "web"}'}
+
+
+async def test_stops_at_max_bytes_with_the_members_read_so_far():
+    # Random content does not compress, so the big member runs far past the limit
+    data = archive({"package.json": b"{}", "blob.bin": os.urandom(256 * 1024), "go.mod": b"module x"})
+
+    files = await extract(data, chunk_size=1024, max_bytes=8 * 1024)
+
+    assert files == {"package.json": b"{}"}
+
+
+async def test_corrupt_header_is_rejected():
+    data = bytearray(tarfile.TarInfo("package.json").tobuf(tarfile.USTAR_FORMAT))
+    data[0:1] = b"q"  # The checksum no longer matches
+
+    with pytest.raises(TarFormatError):
+        await extract(gzip.compress(bytes(data)))
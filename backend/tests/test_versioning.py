@@ -0,0 +1,36 @@
+import pytest
+
+from src.schemas import DependencyType
+from src.utils.versioning import base_version, is_outdated, satisfies
+
+
+@pytest.mark.parametrize(
+    "constraint, expected",
+    [
+        ("^1.2.3", "1.2.3"),
+        ("~> 2.1", "2.1"),
+        (">=2.0.0, <3", "2.0.0"),
+        ("~=3.4.0", "3.4.0"),
+        ("==1.2.*", "1.2"),
+        ("1.2.*", "1.2"),
+        ("1.*", "1"),
+        ("1.2.x", "1.2"),
+        ("1.X", "1"),
+        ("*", None),
+        ("latest", None),
+    ],
+)
+def test_base_version(constraint, expected):
+    assert base_version(constraint) == expected
+
+
+def test_wildcard_pep440_constraint():
+    assert satisfies(DependencyType.PIP, "1.2.9", "==1.2.*")
+    assert not satisfies(DependencyType.PIP, "1.3.0", "==1.2.*")
+    assert is_outdated(DependencyType.PIP, base_version("==1.2.*"), "==1.2.*", "1.3.0")
+    assert not is_outdated(DependencyType.PIP, base_version("==1.2.*"), "==1.2.*", "1.2.7")
+
+
+def test_caret_range_is_outdated_only_past_its_bound():
+    assert not is_outdated(DependencyType.NPM, "1.2.3", "^1.2.3", "1.9.0")
+    assert is_outdated(DependencyType.NPM, "1.2.3", "^1.2.3", "2.0.0")
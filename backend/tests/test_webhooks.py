@@ -0,0 +1,172 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src import config
+from src.routers import webhooks
+from src.schemas import AnalysisJobResponse, AnalysisJobStatus
+from src.utils.analysis_store import get_analysis_store
+from src.utils.github_webhook import parse_push
+from src.utils.jobs import JobQueue, get_job_queue
+
+pytestmark = pytest.mark.anyio
+
+SECRET = "webhook-secret"
+REPO_URL = "https://github.com/acme/web"
+
+
+class FakeStore:
+    def __init__(self, branches):
+        self.branches = branches
+
+    async def tracked_branch(self, repo_link):
+        return self.branches.get(repo_link)
+
+
+class FakeQueue:
+    def __init__(self):
+        self.pushes = []
+
+    async def submit_push(self, repo_url, branch, paths):
+        self.pushes.append((repo_url, branch, paths))
+        return AnalysisJobResponse(
+            job_id="job", kind="push", status=AnalysisJobStatus.QUEUED, repo_url=repo_url, created_at=datetime.utcnow()
+        )
+
+
+def push(ref="refs/heads/main", commits=(), **fields):
+    return {
+        "ref": ref,
+        "repository": {"name": "web", "owner": {"login": "acme"}, "html_url": REPO_URL},
+        "commits": list(commits),
+        **fields,
+    }
+
+
+def commit(added=(), modified=(), removed=()):
+    return {"added": list(added), "modified": list(modified), "removed": list(removed)}
+
+
+def sign(body, secret=SECRET):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def queue():
+    return FakeQueue()
+
+
+@pytest.fixture
+async def deliver(monkeypatch, queue):
+    """POST a payload to the webhook, signed with SECRET unless another signature is given"""
+    monkeypatch.setattr(config, "GITHUB_WEBHOOK_SECRET", SECRET)
+    app = FastAPI()
+    app.include_router(webhooks.router, prefix="/webhooks")
+    app.dependency_overrides[get_analysis_store] = lambda: FakeStore({REPO_URL: "main"})
+    app.dependency_overrides[get_job_queue] = lambda: queue
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def send(payload, event="push", signature=None):
+            body = json.dumps(payload).encode()
+            headers = {"X-GitHub-Event": event, "Content-Type": "application/json"}
+            if signature is not False:
+                headers["X-Hub-Signature-256"] = signature or sign(body)
+            return await client.post("/webhooks/github", content=body, headers=headers)
+
+        yield send
+
+
+@pytest.mark.parametrize("signature", [False, "sha256=" + "0" * 64, sign(b"{}", "other-secret"), "sha1=abc"])
+async def test_unsigned_or_badly_signed_deliveries_are_rejected(deliver, queue, signature):
+    response = await deliver(push(commits=[commit(modified=["package.json"])]), signature=signature)
+
+    assert response.status_code == 401
+    assert queue.pushes == []
+
+
+async def test_ping_is_answered(deliver):
+    response = await deliver({"zen": "Keep it logically awesome."}, event="ping")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pong"
+
+
+@pytest.mark.parametrize(
+    "event, payload",
+    [
+        ("issues", {"action": "opened"}),
+        ("push", push(deleted=True)),  # Branch deleted
+        ("push", push(ref="refs/tags/v1.0.0")),
+        ("push", push(ref="refs/heads/feature", commits=[commit(modified=["package.json"])])),  # Not the tracked branch
+        ("push", push(commits=[commit(modified=["README.md"])])),  # No manifest touched
+    ],
+)
+async def test_deliveries_that_change_no_tracked_manifest_are_ignored(deliver, queue, event, payload):
+    response = await deliver(payload, event=event)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "ignored"
+    assert queue.pushes == []
+
+
+async def test_push_queues_a_refresh_of_the_changed_manifests(deliver, queue):
+    response = await deliver(push(commits=[
+        commit(modified=["package.json", "src/app.js"]),
+        commit(added=["api/poetry.lock"], removed=["legacy/Gemfile"]),
+    ]))
+
+    assert response.json()["status"] == "queued"
+    assert response.json()["manifests"] == ["api/poetry.lock", "legacy/Gemfile", "package.json"]
+    assert queue.pushes == [(REPO_URL, "main", {"package.json", "api/poetry.lock", "legacy/Gemfile"})]
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"commits": [commit(modified=["README.md"])] * 2048},  # GitHub's commit limit
+        {"size": 3},  # More commits pushed than listed
+        {"distinct_size": 3},
+        {"forced": True},
+    ],
+)
+async def test_truncated_or_forced_push_refreshes_every_manifest(deliver, queue, fields):
+    payload = push(commits=[commit(modified=["README.md"])])
+    payload.update(fields)
+
+    response = await deliver(payload)
+
+    assert response.json()["status"] == "queued"
+    assert response.json()["manifests"] is None
+    assert queue.pushes == [(REPO_URL, "main", None)]
+
+
+def test_complete_push_lists_its_manifests():
+    event = parse_push(push(commits=[commit(modified=["package.json"])] * 2, size=2, distinct_size=2))
+
+    assert (event.owner, event.repo, event.branch, event.manifest_paths) == ("acme", "web", "main", {"package.json"})
+
+
+async def test_pushes_within_the_coalesce_window_share_one_job(database, monkeypatch):
+    # Long enough that no job is released to a worker during the test
+    monkeypatch.setattr(config, "WEBHOOK_COALESCE_WINDOW", 3600)
+    jobs = JobQueue(state=None, workers=0)
+
+    first = await jobs.submit_push(REPO_URL, "main", {"package.json"})
+    second = await jobs.submit_push(REPO_URL, "main", {"yarn.lock", "package.json"})
+    other_branch = await jobs.submit_push(REPO_URL, "release", {"package.json"})
+
+    assert second.job_id == first.job_id
+    assert other_branch.job_id != first.job_id
+    assert json.loads((await jobs._load(first.job_id)).payload) == {
+        "branch": "main", "paths": ["package.json", "yarn.lock"]
+    }
+
+    # A push whose paths are unknown widens the queued job to every manifest
+    third = await jobs.submit_push(REPO_URL, "main", None)
+    assert third.job_id == first.job_id
+    assert json.loads((await jobs._load(first.job_id)).payload)["paths"] is None